@@ -2,7 +2,8 @@
 0x.ship MVP - Main Flask Application
 """
 import os
-from flask import Flask, jsonify, send_from_directory
+import hmac
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_compress import Compress
 
@@ -57,6 +58,18 @@ def create_app(config_name=None):
     # Register blueprints (this also imports models through routes)
     register_blueprints(app)
 
+    # Flush cache invalidations once per request, after commit
+    from utils.cache import CacheService
+    CacheService.init_app(app)
+
+    # Periodically recompute trending scores in the background
+    from utils import trending_job
+    trending_job.init_app(app)
+
+    # Flush write-behind votes (VOTE_WRITE_BEHIND) in the background
+    from services import vote_buffer
+    vote_buffer.init_app(app)
+
     # Import models BEFORE creating tables
     import_models()
 
@@ -81,7 +94,23 @@ def create_app(config_name=None):
     # Health check
     @app.route('/health', methods=['GET'])
     def health_check():
-        return jsonify({'status': 'ok', 'message': '0x.ship backend is running'}), 200
+        breaker = CacheService.get_breaker_stats()
+        # Still serving while Redis is down, just without the shared cache
+        status = 'ok' if breaker['state'] == 'closed' else 'degraded'
+        return jsonify({
+            'status': status,
+            'message': '0x.ship backend is running',
+            'cache': {'redis_breaker': breaker},
+        }), 200
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        # Scrapers can't log in, so /metrics uses its own token and is off without one
+        token = app.config.get('METRICS_TOKEN')
+        supplied = request.headers.get('Authorization', '')
+        if not token or not hmac.compare_digest(supplied, f'Bearer {token}'):
+            return jsonify({'status': 'error', 'message': 'Not found'}), 404
+        return Response(CacheService.get_prometheus_metrics(), mimetype='text/plain; version=0.0.4')
 
     # Note: File uploads now handled via Pinata IPFS
     # Files are served directly from IPFS gateway (https://gateway.pinata.cloud/ipfs/...)
@@ -41,6 +41,74 @@ class Config:
     # Redis
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+    # Redis Connection Pooling (one long-lived pool per gunicorn worker)
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 20))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 2.0))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', 2.0))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))  # Seconds between PINGs on idle connections
+    REDIS_RETRY_ATTEMPTS = int(os.getenv('REDIS_RETRY_ATTEMPTS', 3))
+    REDIS_RETRY_BACKOFF_BASE = float(os.getenv('REDIS_RETRY_BACKOFF_BASE', 0.05))  # Exponential backoff between reconnects
+    REDIS_RETRY_BACKOFF_CAP = float(os.getenv('REDIS_RETRY_BACKOFF_CAP', 1.0))
+
+    # Circuit breaker: after THRESHOLD connection failures within WINDOW seconds,
+    # skip Redis for COOLDOWN seconds, then probe it with a single PING
+    REDIS_BREAKER_THRESHOLD = int(os.getenv('REDIS_BREAKER_THRESHOLD', 5))
+    REDIS_BREAKER_WINDOW = float(os.getenv('REDIS_BREAKER_WINDOW', 30))
+    REDIS_BREAKER_COOLDOWN = float(os.getenv('REDIS_BREAKER_COOLDOWN', 15))
+    # Per-worker cache used while the breaker is open (not shared, so keep it short)
+    CACHE_DEGRADED_TTL = int(os.getenv('CACHE_DEGRADED_TTL', 10))
+    CACHE_DEGRADED_MAX_ENTRIES = int(os.getenv('CACHE_DEGRADED_MAX_ENTRIES', 500))
+
+    # In-process L1 cache in front of Redis (invalidated across workers via pub/sub)
+    CACHE_L1_ENABLED = os.getenv('CACHE_L1_ENABLED', 'false').lower() == 'true'
+    CACHE_L1_MAX_ENTRIES = int(os.getenv('CACHE_L1_MAX_ENTRIES', 1000))
+    CACHE_L1_TTL = int(os.getenv('CACHE_L1_TTL', 30))  # Upper bound on how long a worker keeps a value
+    CACHE_L1_PREFIXES = tuple(os.getenv('CACHE_L1_PREFIXES', 'feed:,leaderboard,project:,fragment:').split(','))
+    CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')
+
+    # Stampede protection: one recompute per key, other workers wait for the result
+    CACHE_LOCK_TTL = float(os.getenv('CACHE_LOCK_TTL', 30))  # Seconds before a crashed winner's lock expires
+    CACHE_LOCK_WAIT = float(os.getenv('CACHE_LOCK_WAIT', 5))  # Seconds a waiter polls before computing itself
+
+    # Stale-while-revalidate: how long past its soft TTL an entry may still be served
+    CACHE_SWR_GRACE = int(os.getenv('CACHE_SWR_GRACE', 3600))
+    CACHE_REFRESH_WORKERS = int(os.getenv('CACHE_REFRESH_WORKERS', 2))  # Background refresh threads per worker
+
+    # Cached value encoding: json (orjson when installed) or msgpack, compressed
+    # with none/zlib/zstd/lz4 above a size threshold. Per key family overrides as
+    # "prefix=serializer+compression,...", e.g. "fragment:=msgpack+zstd"
+    CACHE_SERIALIZER = os.getenv('CACHE_SERIALIZER', 'json')
+    CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'zlib')
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))
+    CACHE_CODEC_FAMILIES = dict(
+        item.split('=', 1) for item in os.getenv('CACHE_CODEC_FAMILIES', '').split(',') if '=' in item
+    )
+
+    # Cache hit/miss/latency instrumentation, aggregated across workers in Redis
+    CACHE_METRICS_ENABLED = os.getenv('CACHE_METRICS_ENABLED', 'true').lower() == 'true'
+    CACHE_METRICS_FLUSH_INTERVAL = float(os.getenv('CACHE_METRICS_FLUSH_INTERVAL', 10))  # Seconds between per-worker flushes
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # Bearer token for /metrics (endpoint disabled when unset)
+
+    # Delta-maintained global counters are reseeded from the database at least this often
+    COUNTERS_TTL = int(os.getenv('COUNTERS_TTL', 86400))
+
+    # Background bulk recompute of trending_score (one worker per interval; 0 disables)
+    TRENDING_RECOMPUTE_INTERVAL = float(os.getenv('TRENDING_RECOMPUTE_INTERVAL', 600))
+
+    # Search backend: postgres (full-text search), memory (in-process BM25 index)
+    # or auto (postgres on PostgreSQL, memory otherwise)
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+    SEARCH_INDEX_SNAPSHOT = os.getenv('SEARCH_INDEX_SNAPSHOT', 'search_index.snapshot.json')  # Empty disables
+    SEARCH_INDEX_SYNC_INTERVAL = float(os.getenv('SEARCH_INDEX_SYNC_INTERVAL', 30))  # Catch up on other workers' writes
+    SEARCH_INDEX_RECONCILE_INTERVAL = float(os.getenv('SEARCH_INDEX_RECONCILE_INTERVAL', 600))  # Full ID scan for hard deletes
+    SEARCH_INDEX_SNAPSHOT_INTERVAL = float(os.getenv('SEARCH_INDEX_SNAPSHOT_INTERVAL', 300))
+
+    # Write-behind voting: votes are acknowledged from Redis and written to the database in batches
+    VOTE_WRITE_BEHIND = os.getenv('VOTE_WRITE_BEHIND', 'false').lower() == 'true'
+    VOTE_FLUSH_INTERVAL_MS = int(os.getenv('VOTE_FLUSH_INTERVAL_MS', 500))
+    VOTE_FLUSH_BATCH = int(os.getenv('VOTE_FLUSH_BATCH', 500))  # Projects per flush
+    VOTE_FLUSH_LOCK_TTL = float(os.getenv('VOTE_FLUSH_LOCK_TTL', 30))  # Seconds a stalled flusher holds the lock
+
     # AWS/S3
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -94,6 +162,9 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
+    TRENDING_RECOMPUTE_INTERVAL = 0
+    SEARCH_INDEX_SNAPSHOT = None
+    VOTE_WRITE_BEHIND = False
 
 
 class ProductionConfig(Config):
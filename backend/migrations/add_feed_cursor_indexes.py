@@ -0,0 +1,58 @@
+"""
+Migration: Add composite indexes for keyset (cursor) feed pagination
+Run this with: python migrations/add_feed_cursor_indexes.py
+
+Each index matches Project.feed_sort_keys() for one feed sort, so a cursor
+page is a single index range scan.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from sqlalchemy import text
+
+def migrate():
+    """Add feed cursor indexes to database"""
+    app = create_app()
+
+    with app.app_context():
+        print("=== Adding Feed Cursor Indexes ===\n")
+
+        with db.engine.connect() as conn:
+            indexes = [
+                ("idx_projects_feed_trending", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_feed_trending
+                    ON projects(trending_score DESC, created_at DESC, id DESC)
+                    WHERE is_deleted=false
+                """),
+                ("idx_projects_feed_score", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_feed_score
+                    ON projects(proof_score DESC, created_at DESC, id DESC)
+                    WHERE is_deleted=false
+                """),
+                ("idx_projects_feed_newest", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_feed_newest
+                    ON projects(created_at DESC, id DESC)
+                    WHERE is_deleted=false
+                """),
+                ("idx_projects_feed_most_voted", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_feed_most_voted
+                    ON projects((upvotes + downvotes) DESC, created_at DESC, id DESC)
+                    WHERE is_deleted=false
+                """),
+            ]
+
+            for idx_name, idx_sql in indexes:
+                try:
+                    conn.execute(text(idx_sql))
+                    conn.commit()
+                    print(f"   [SUCCESS] {idx_name}")
+                except Exception as e:
+                    print(f"   [INFO] {idx_name}: {str(e)[:50]}")
+
+        print("\n=== Indexes Added! ===")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,57 @@
+"""
+Migration: Add full-text search vectors to projects and users
+Run this with: python migrations/add_search_vectors.py
+
+Adds a generated, weighted search_vector column to each table (Postgres keeps
+it up to date on every write) and a GIN index over it. Requires Postgres 12+.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from sqlalchemy import text
+from models.project import SEARCH_VECTOR_SQL as PROJECT_SEARCH_VECTOR_SQL
+from models.user import SEARCH_VECTOR_SQL as USER_SEARCH_VECTOR_SQL
+
+def migrate():
+    """Add search vector columns and indexes to database"""
+    app = create_app()
+
+    with app.app_context():
+        print("=== Adding Full-Text Search Vectors ===\n")
+
+        with db.engine.connect() as conn:
+            steps = [
+                ("projects.search_vector", f"""
+                    ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+                    GENERATED ALWAYS AS ({PROJECT_SEARCH_VECTOR_SQL}) STORED
+                """),
+                ("idx_projects_search_vector", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_search_vector
+                    ON projects USING GIN (search_vector)
+                """),
+                ("users.search_vector", f"""
+                    ALTER TABLE users ADD COLUMN IF NOT EXISTS search_vector tsvector
+                    GENERATED ALWAYS AS ({USER_SEARCH_VECTOR_SQL}) STORED
+                """),
+                ("idx_users_search_vector", """
+                    CREATE INDEX IF NOT EXISTS idx_users_search_vector
+                    ON users USING GIN (search_vector)
+                """),
+            ]
+
+            for step_name, step_sql in steps:
+                try:
+                    conn.execute(text(step_sql))
+                    conn.commit()
+                    print(f"   [SUCCESS] {step_name}")
+                except Exception as e:
+                    conn.rollback()
+                    print(f"   [INFO] {step_name}: {str(e)[:50]}")
+
+        print("\n=== Search Vectors Added! ===")
+
+if __name__ == "__main__":
+    migrate()
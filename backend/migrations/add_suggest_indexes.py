@@ -0,0 +1,57 @@
+"""
+Migration: Add trigram and prefix indexes for typeahead suggestions
+Run this with: python migrations/add_suggest_indexes.py
+
+/api/search/suggest matches project titles and usernames by substring and
+similarity (pg_trgm GIN indexes) and, for 1-2 character prefixes, with
+lower(...) LIKE 'ab%' (text_pattern_ops btree indexes).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from sqlalchemy import text
+
+def migrate():
+    """Add typeahead indexes to database"""
+    app = create_app()
+
+    with app.app_context():
+        print("=== Adding Typeahead Indexes ===\n")
+
+        with db.engine.connect() as conn:
+            indexes = [
+                ("pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+                ("idx_projects_title_trgm", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_title_trgm
+                    ON projects USING GIN (title gin_trgm_ops)
+                """),
+                ("idx_projects_title_prefix", """
+                    CREATE INDEX IF NOT EXISTS idx_projects_title_prefix
+                    ON projects (lower(title) text_pattern_ops)
+                """),
+                ("idx_users_username_trgm", """
+                    CREATE INDEX IF NOT EXISTS idx_users_username_trgm
+                    ON users USING GIN (username gin_trgm_ops)
+                """),
+                ("idx_users_username_prefix", """
+                    CREATE INDEX IF NOT EXISTS idx_users_username_prefix
+                    ON users (lower(username) text_pattern_ops)
+                """),
+            ]
+
+            for idx_name, idx_sql in indexes:
+                try:
+                    conn.execute(text(idx_sql))
+                    conn.commit()
+                    print(f"   [SUCCESS] {idx_name}")
+                except Exception as e:
+                    conn.rollback()
+                    print(f"   [INFO] {idx_name}: {str(e)[:50]}")
+
+        print("\n=== Indexes Added! ===")
+
+if __name__ == "__main__":
+    migrate()
@@ -3,14 +3,26 @@ Project Model
 """
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import defer, deferred
 from extensions import db
 
+# Weighted full-text document: title > tagline > description > hackathon name
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(tagline, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(hackathon_name, '')), 'D')"
+)
+
 
 class Project(db.Model):
     """Project model"""
 
     __tablename__ = 'projects'
+    __table_args__ = (
+        db.Index('idx_projects_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -69,6 +81,9 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Full-text search (generated by Postgres, only used in WHERE/ORDER BY so never loaded)
+    search_vector = deferred(db.Column(TSVECTOR, db.Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
     # Relationships
     screenshots = db.relationship('ProjectScreenshot', backref='project', lazy='dynamic',
                                    cascade='all, delete-orphan')
@@ -80,6 +95,29 @@ class Project(db.Model):
     event_associations = db.relationship('EventProject', backref='project', lazy='dynamic',
                                           cascade='all, delete-orphan')
 
+    # Long-form TEXT columns only the detail page shows - left out of (and never
+    # loaded for) the card view used by lists
+    CARD_DEFERRED_COLUMNS = ('project_story', 'inspiration', 'market_comparison', 'novelty_factor')
+
+    @classmethod
+    def card_options(cls) -> list:
+        """Query options that skip loading the columns the card view leaves out"""
+        return [defer(getattr(cls, column)) for column in cls.CARD_DEFERRED_COLUMNS]
+
+    @classmethod
+    def resolve_view(cls, view: str, fields=None) -> str:
+        """Use the card view whenever the requested fields don't need the long-form columns"""
+        if view == 'full' and fields and not set(fields) & set(cls.CARD_DEFERRED_COLUMNS):
+            return 'card'
+        return view
+
+    @classmethod
+    def as_card(cls, data: dict) -> dict:
+        """Copy of an already-serialized full-view dict reduced to the card view"""
+        card = {k: v for k, v in data.items() if k not in cls.CARD_DEFERRED_COLUMNS}
+        card['badges'] = [{k: v for k, v in b.items() if k != 'rationale'} for b in data.get('badges', [])]
+        return card
+
     def calculate_proof_score(self):
         """Recalculate proof score from components"""
         self.proof_score = (
@@ -90,6 +128,35 @@ class Project(db.Model):
         )
         return self.proof_score
 
+    def feed_sort_values(self) -> dict:
+        """Values each feed ordering depends on, keyed by canonical sort"""
+        return {
+            'trending': self.trending_score,
+            'newest': self.created_at,
+            'top-rated': self.proof_score,
+            'most-voted': (self.upvotes or 0) + (self.downvotes or 0),
+        }
+
+    @classmethod
+    def feed_sort_keys(cls, sort: str) -> list:
+        """Columns a canonical feed sort orders by, all descending
+
+        Always ends with (created_at, id) so the order is total and can be paged
+        with a keyset cursor. Matches the idx_projects_feed_* indexes.
+        """
+        leading = {
+            'trending': [cls.trending_score],
+            'newest': [],
+            'top-rated': [cls.proof_score],
+            'most-voted': [cls.upvotes + cls.downvotes],
+        }[sort]
+        return leading + [cls.created_at, cls.id]
+
+    @staticmethod
+    def changed_feed_sorts(before: dict, after: dict) -> list:
+        """Feed orderings a change could have reordered (compare feed_sort_values snapshots)"""
+        return [sort for sort, value in after.items() if before.get(sort) != value]
+
     def get_upvote_ratio(self):
         """Calculate upvote ratio as percentage"""
         total_votes = self.upvotes + self.downvotes
@@ -97,23 +164,92 @@ class Project(db.Model):
             return 0
         return (self.upvotes / total_votes) * 100
 
-    def to_dict(self, include_creator=False, user_id=None):
+    def to_dict(self, include_creator=False, user_id=None, view='full'):
         """Convert to dictionary
 
         Args:
             include_creator: Include creator/author information
             user_id: If provided, includes user's vote on this project
+            view: 'full', or 'card' to leave out long-form text and badge rationales
+
+        Runs several queries per project - serialize lists with bulk_to_dict().
+        """
+        user_vote = None
+        if user_id:
+            from models.vote import Vote
+            vote = Vote.query.filter_by(user_id=user_id, project_id=self.id).first()
+            user_vote = vote.vote_type if vote else None
+
+        from models.badge import ValidationBadge
+        return self._serialize(
+            screenshots=self.screenshots.order_by(ProjectScreenshot.order_index, ProjectScreenshot.created_at).all(),
+            badges=self.badges.order_by(ValidationBadge.created_at).all(),
+            creator=self.creator if include_creator else None,
+            include_creator=include_creator,
+            user_vote=user_vote,
+            view=view
+        )
+
+    @classmethod
+    def bulk_to_dict(cls, projects, include_creator=False, user_id=None, view='full') -> list:
+        """Convert a list of projects to dictionaries in a fixed number of queries
+
+        Same output as to_dict() for each project, but screenshots, badges with
+        their validators, creators and the viewer's votes are each loaded with a
+        single IN query for the whole list.
         """
+        from models.user import User
+        from models.vote import Vote
+        from models.badge import ValidationBadge
+        from sqlalchemy.orm import joinedload
+
+        projects = list(projects)
+        if not projects:
+            return []
+        ids = [p.id for p in projects]
+
+        screenshots = {pid: [] for pid in ids}
+        for ss in ProjectScreenshot.query.filter(ProjectScreenshot.project_id.in_(ids)).order_by(
+                ProjectScreenshot.order_index, ProjectScreenshot.created_at):
+            screenshots[ss.project_id].append(ss)
+
+        badges = {pid: [] for pid in ids}
+        for badge in ValidationBadge.query.options(joinedload(ValidationBadge.validator)).filter(
+                ValidationBadge.project_id.in_(ids)).order_by(ValidationBadge.created_at):
+            badges[badge.project_id].append(badge)
+
+        creators = {}
+        if include_creator:
+            creator_ids = list({p.user_id for p in projects})
+            creators = {u.id: u for u in User.query.filter(User.id.in_(creator_ids))}
+
+        votes = {}
+        if user_id:
+            votes = dict(
+                db.session.query(Vote.project_id, Vote.vote_type)
+                .filter(Vote.user_id == user_id, Vote.project_id.in_(ids))
+            )
+
+        return [
+            p._serialize(
+                screenshots=screenshots[p.id],
+                badges=badges[p.id],
+                creator=creators.get(p.user_id),
+                include_creator=include_creator,
+                user_vote=votes.get(p.id),
+                view=view
+            )
+            for p in projects
+        ]
+
+    def _serialize(self, screenshots, badges, creator, include_creator, user_vote, view='full'):
+        """Build the dictionary from already-loaded related rows"""
         data = {
             'id': self.id,
             'title': self.title,
             'tagline': self.tagline,
             'description': self.description,
-            'project_story': self.project_story,
-            'inspiration': self.inspiration,
             'pitch_deck_url': self.pitch_deck_url,
-            'market_comparison': self.market_comparison,
-            'novelty_factor': self.novelty_factor,
             'demo_url': self.demo_url,
             'github_url': self.github_url,
             'hackathon_name': self.hackathon_name,
@@ -139,24 +275,25 @@ class Project(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'user_id': self.user_id,
-            'screenshots': [ss.to_dict() for ss in self.screenshots],
-            'badge_count': self.badges.count(),
-            'badges': [b.to_dict(include_validator=True) for b in self.badges],
+            'screenshots': [ss.to_dict() for ss in screenshots],
+            'badge_count': len(badges),
+            'badges': [b.to_dict(include_validator=True) for b in badges],
         }
 
+        if view == 'card':
+            for badge in data['badges']:
+                del badge['rationale']
+        else:
+            # Not touched for cards, so deferred columns are never loaded
+            for column in self.CARD_DEFERRED_COLUMNS:
+                data[column] = getattr(self, column)
+
         if include_creator:
-            creator_data = self.creator.to_dict() if self.creator else None
+            creator_data = creator.to_dict() if creator else None
             data['creator'] = creator_data
             data['author'] = creator_data  # Alias for frontend compatibility
 
-        # Include user's vote if user_id is provided
-        if user_id:
-            from models.vote import Vote
-            vote = Vote.query.filter_by(user_id=user_id, project_id=self.id).first()
-            data['user_vote'] = vote.vote_type if vote else None
-        else:
-            data['user_vote'] = None
-
+        data['user_vote'] = user_vote
         return data
 
     def __repr__(self):
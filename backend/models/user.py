@@ -3,14 +3,26 @@ User Model
 """
 from datetime import datetime
 from uuid import uuid4
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from werkzeug.security import generate_password_hash, check_password_hash
 from extensions import db
 
+# Weighted full-text document: username > display name > bio ('simple' - names aren't stemmed)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(username, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(display_name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(bio, '')), 'C')"
+)
+
 
 class User(db.Model):
     """User model for authentication and profile"""
 
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('idx_users_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
@@ -49,6 +61,9 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Full-text search (generated by Postgres, only used in WHERE/ORDER BY so never loaded)
+    search_vector = deferred(db.Column(TSVECTOR, db.Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
     # Relationships
     projects = db.relationship('Project', backref='creator', lazy='dynamic', foreign_keys='Project.user_id')
     votes = db.relationship('Vote', backref='user', lazy='dynamic', cascade='all, delete-orphan')
@@ -0,0 +1,29 @@
+"""
+Script to rebuild the Redis ranking index from the database, or check it
+Usage: python rebuild_ranking_index.py [--check]
+"""
+import sys
+
+from app import create_app
+from utils.ranking_index import RankingIndex
+
+# Create app context
+app = create_app()
+
+with app.app_context():
+    try:
+        if '--check' in sys.argv:
+            report = RankingIndex.check()
+            print(f"Ready: {report['ready']}, rankings: {report['rankings']}")
+            print(f"Missing: {report['missing']}, extra: {report['extra']}, wrong score: {report['wrong_score']}")
+            for example in report['examples']:
+                print(f"  {example['problem']}: {example['project_id']} in {example['ranking']}")
+            print("Ranking index is consistent" if report['consistent'] else "Ranking index is INCONSISTENT - rebuild it")
+            sys.exit(0 if report['consistent'] else 1)
+
+        stats = RankingIndex.rebuild()
+        print(f"Successfully rebuilt ranking index ({stats['projects']} projects, {stats['rankings']} rankings)!")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -1,38 +1,106 @@
 """
 Script to recalculate proof scores for all projects
 This ensures all projects have accurate scores based on current data
+
+Scores are recomputed set-based in SQL (ProofScoreCalculator.recompute_scores),
+one chunk of project IDs per transaction. Progress is saved after every chunk,
+so an interrupted run continues with --resume.
+
+Usage:
+    python recalculate_all_scores.py [--chunk-size 1000] [--dry-run] [--resume]
 """
+import argparse
+import os
+
 from extensions import db
 from app import create_app
 from models.project import Project
 from utils.scores import ProofScoreCalculator
 
-# Create app context
-app = create_app()
+STATE_FILE = 'recalculate_scores.state'  # Last project ID committed by an interrupted run
+
+
+def _next_chunk(after_id: str, chunk_size: int):
+    """(last ID, size) of the next chunk of live projects after after_id; (None, 0) when done"""
+    ids = db.session.query(Project.id).filter(
+        Project.is_deleted == False, Project.id > after_id
+    ).order_by(Project.id).limit(chunk_size).all()
+    return (ids[-1].id, len(ids)) if ids else (None, 0)
+
+
+def _refresh_caches(changed_ids):
+    """Drop the changed projects' cards and rewrite their rankings"""
+    from utils.cache import CacheService
+    from utils.ranking_index import RankingIndex
+
+    CacheService.delete(*[key for pid in changed_ids for key in (f"project:{pid}", f"fragment:project:{pid}")])
+    RankingIndex.refresh_projects(changed_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recalculate proof scores for all projects')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Projects per transaction')
+    parser.add_argument('--dry-run', action='store_true', help='Show score changes without writing them')
+    parser.add_argument('--resume', action='store_true', help=f'Continue after the ID saved in {STATE_FILE}')
+    args = parser.parse_args()
+
+    after_id = ''
+    if args.resume and os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            after_id = f.read().strip()
+        print(f"Resuming after project {after_id}")
+
+    total = db.session.query(Project.id).filter(Project.is_deleted == False, Project.id > after_id).count()
+    print(f"Found {total} projects to recalculate scores for...")
+
+    processed = changed = 0
+    while True:
+        through_id, size = _next_chunk(after_id, args.chunk_size)
+        if through_id is None:
+            break
+
+        try:
+            rows = ProofScoreCalculator.recompute_scores(after_id, through_id, dry_run=args.dry_run)
+            if args.dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if args.dry_run:
+            for row in rows:
+                print(f"  {row.id}: proof {row.old_proof} -> {row.new_proof}, "
+                      f"trending {row.old_trending} -> {row.new_trending}")
+        else:
+            if rows:
+                _refresh_caches([row.id for row in rows])
+            with open(STATE_FILE, 'w') as f:
+                f.write(through_id)
 
-with app.app_context():
-    try:
-        # Get all projects
-        projects = Project.query.filter_by(is_deleted=False).all()
-        print(f"Found {len(projects)} projects to recalculate scores for...")
+        after_id = through_id
+        processed += size
+        changed += len(rows)
+        print(f"  Processed {processed}/{total} projects ({changed} changed)...")
 
-        updated_count = 0
-        for i, project in enumerate(projects, 1):
-            try:
-                # Recalculate all score components
-                ProofScoreCalculator.update_project_scores(project)
-                updated_count += 1
+    if args.dry_run:
+        print(f"\nDry run: {changed}/{processed} projects would change")
+        return
 
-                if i % 100 == 0:
-                    print(f"  Processed {i} projects...")
+    # Also covers chunks committed by an interrupted run
+    from utils.cache import CacheService
+    from utils.facets import Facets
 
-            except Exception as e:
-                print(f"  Error processing project {project.id}: {e}")
+    CacheService.invalidate_project_feed(['trending', 'top-rated'])
+    CacheService.invalidate_leaderboard()
+    Facets.invalidate()  # Score buckets moved
+    if os.path.exists(STATE_FILE):
+        os.remove(STATE_FILE)
+    print(f"\nSuccessfully recalculated scores: {changed}/{processed} projects changed!")
 
-        # Commit all changes
-        db.session.commit()
-        print(f"\nSuccessfully recalculated scores for {updated_count}/{len(projects)} projects!")
 
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error: {e}")
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        main()
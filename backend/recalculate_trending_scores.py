@@ -0,0 +1,17 @@
+"""
+Script to recompute trending scores for every live project
+Same job the app runs in the background - useful from cron or after a deploy
+"""
+from app import create_app
+from utils.trending_job import run_trending_recompute
+
+# Create app context
+app = create_app()
+
+with app.app_context():
+    try:
+        updated = run_trending_recompute()
+        print(f"Successfully recomputed trending scores ({updated} projects changed)!")
+
+    except Exception as e:
+        print(f"Error: {e}")
@@ -11,6 +11,10 @@ from models.investor_request import InvestorRequest
 from models.validator_permissions import ValidatorPermissions
 from utils.decorators import admin_required
 from utils.cache import CacheService
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
+from utils.search_index import SearchIndex
+from utils.counters import Counters
 from services.socket_service import SocketService
 from utils.scores import ProofScoreCalculator
 
@@ -115,6 +119,7 @@ def toggle_user_active(admin_id, user_id):
 
         user.is_active = not user.is_active
         db.session.commit()
+        CacheService.invalidate_suggestions()  # Banned users aren't suggested
 
         action = 'activated' if user.is_active else 'banned'
         return jsonify({
@@ -142,8 +147,16 @@ def delete_user(admin_id, user_id):
             return jsonify({'status': 'error', 'message': 'Cannot delete yourself'}), 400
 
         username = user.username
+        project_ids = [p.id for p in user.projects]  # Deleted along with the user
         db.session.delete(user)
         db.session.commit()
+        for project_id in project_ids:
+            RankingIndex.remove_project(project_id)
+            Facets.remove_project(project_id)
+            SearchIndex.remove_project(project_id)
+        if project_ids:
+            Counters.invalidate()  # Projects and their badges went with the user
+        CacheService.invalidate_suggestions()  # Their username and projects
 
         return jsonify({
             'status': 'success',
@@ -389,7 +402,7 @@ def get_all_projects(user_id):
         return jsonify({
             'status': 'success',
             'data': {
-                'projects': [project.to_dict(include_creator=True) for project in projects.items],
+                'projects': Project.bulk_to_dict(projects.items, include_creator=True),
                 'total': projects.total,
                 'pages': projects.pages,
                 'current_page': page,
@@ -422,6 +435,9 @@ def update_project(user_id, project_id):
 
         # Invalidate cache
         CacheService.invalidate_project(project_id)
+        CacheService.invalidate_suggestions()
+        SearchIndex.update_project(project)
+        Facets.update_project(project)  # Demo/GitHub links are facets
 
         return jsonify({
             'status': 'success',
@@ -444,11 +460,25 @@ def delete_project(user_id, project_id):
             return jsonify({'status': 'error', 'message': 'Project not found'}), 404
 
         title = project.title
+        deltas = {
+            'projects:total': -1,
+            'projects:live': 0 if project.is_deleted else -1,
+            'projects:featured': -1 if project.is_featured else 0,
+        }
+        for badge_type, count in db.session.query(ValidationBadge.badge_type, db.func.count(ValidationBadge.id))\
+                .filter(ValidationBadge.project_id == project_id).group_by(ValidationBadge.badge_type):
+            deltas['badges:total'] = deltas.get('badges:total', 0) - count
+            deltas[f'badges:{badge_type}'] = -count
         db.session.delete(project)
         db.session.commit()
 
         # Invalidate cache
         CacheService.invalidate_project(project_id)
+        CacheService.invalidate_suggestions()
+        RankingIndex.remove_project(project_id)
+        Facets.remove_project(project_id)
+        SearchIndex.remove_project(project_id)
+        Counters.adjust(deltas)
 
         return jsonify({
             'status': 'success',
@@ -474,6 +504,8 @@ def feature_project(user_id, project_id):
 
         # Invalidate cache
         CacheService.invalidate_project(project_id)
+        Counters.adjust({'projects:featured': 1 if project.is_featured else -1})
+        Facets.update_project(project)
 
         action = 'featured' if project.is_featured else 'unfeatured'
         return jsonify({
@@ -580,27 +612,29 @@ def reject_investor_request(user_id, request_id):
 def get_platform_stats(user_id):
     """Get platform statistics"""
     try:
-        # User stats
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        admins = User.query.filter_by(is_admin=True).count()
-        validators = User.query.filter_by(is_validator=True).count()
-        investors = User.query.filter_by(is_investor=True).count()
-
-        # Project stats
-        total_projects = Project.query.count()
-        featured_projects = Project.query.filter_by(is_featured=True).count()
-
-        # Badge stats
-        total_badges = ValidationBadge.query.count()
-        badge_breakdown = {}
-        for badge_type in ['stone', 'silver', 'gold', 'platinum', 'demerit', 'custom']:
-            count = ValidationBadge.query.filter_by(badge_type=badge_type).count()
-            badge_breakdown[badge_type] = count
-
-        # Investor request stats
-        pending_investor_requests = InvestorRequest.query.filter_by(status='pending').count()
-        approved_investor_requests = InvestorRequest.query.filter_by(status='approved').count()
+        count = db.func.count
+
+        # User stats (one aggregate query)
+        total_users, active_users, admins, validators, investors = db.session.query(
+            count(User.id),
+            count(User.id).filter(User.is_active == True),
+            count(User.id).filter(User.is_admin == True),
+            count(User.id).filter(User.is_validator == True),
+            count(User.id).filter(User.is_investor == True)
+        ).one()
+
+        # Project and badge stats (delta-maintained counters, no COUNT(*))
+        counters = Counters.get_all()
+        total_projects = counters['projects:total']
+        featured_projects = counters['projects:featured']
+        total_badges = counters['badges:total']
+        badge_breakdown = {badge_type: counters.get(f'badges:{badge_type}', 0) for badge_type in Counters.BADGE_TYPES}
+
+        # Investor request stats (one aggregate query)
+        pending_investor_requests, approved_investor_requests = db.session.query(
+            count(InvestorRequest.id).filter(InvestorRequest.status == 'pending'),
+            count(InvestorRequest.id).filter(InvestorRequest.status == 'approved')
+        ).one()
 
         return jsonify({
             'status': 'success',
@@ -928,6 +962,7 @@ def update_badge(user_id, badge_id):
             return jsonify({'status': 'error', 'message': 'Badge not found'}), 404
 
         # Update fields
+        old_type = badge.badge_type
         if 'badge_type' in data:
             if data['badge_type'] not in ValidationBadge.BADGE_POINTS:
                 return jsonify({'status': 'error', 'message': 'Invalid badge type'}), 400
@@ -940,13 +975,18 @@ def update_badge(user_id, badge_id):
         # Update project scores
         project = Project.query.get(badge.project_id)
         if project:
-            ProofScoreCalculator.update_project_scores(project)
+            ProofScoreCalculator.update_for_event(project, 'badge')
 
         db.session.commit()
 
         # Invalidate caches
         CacheService.invalidate_project(badge.project_id)
         CacheService.invalidate_leaderboard()
+        if project:
+            RankingIndex.update_project(project)
+            Facets.update_project(project)
+        if badge.badge_type != old_type:
+            Counters.adjust({f'badges:{old_type}': -1, f'badges:{badge.badge_type}': 1})
 
         # Emit real-time update
         SocketService.emit_badge_updated(badge.project_id, badge.to_dict(include_validator=True))
@@ -972,6 +1012,7 @@ def delete_badge(user_id, badge_id):
             return jsonify({'status': 'error', 'message': 'Badge not found'}), 404
 
         project_id = badge.project_id
+        badge_type = badge.badge_type
 
         db.session.delete(badge)
         db.session.flush()  # Flush to get accurate count
@@ -992,13 +1033,17 @@ def delete_badge(user_id, badge_id):
         # Update project scores
         project = Project.query.get(project_id)
         if project:
-            ProofScoreCalculator.update_project_scores(project)
+            ProofScoreCalculator.update_for_event(project, 'badge')
 
         db.session.commit()
 
         # Invalidate caches
         CacheService.invalidate_project(project_id)
         CacheService.invalidate_leaderboard()
+        if project:
+            RankingIndex.update_project(project)
+            Facets.update_project(project)
+        Counters.adjust(Counters.badge_deltas(badge_type, -1))
 
         # Emit real-time update
         SocketService.emit_badge_removed(project_id, badge_id)
@@ -1053,13 +1098,16 @@ def award_badge_as_admin(user_id):
         db.session.add(badge)
 
         # Update project scores
-        ProofScoreCalculator.update_project_scores(project)
+        ProofScoreCalculator.update_for_event(project, 'badge', badge_points=badge.points)
 
         db.session.commit()
 
         # Invalidate cache and emit real-time update
         CacheService.invalidate_project(project_id)
         CacheService.invalidate_leaderboard()
+        RankingIndex.update_project(project)
+        Facets.update_project(project)
+        Counters.adjust(Counters.badge_deltas(badge_type, 1))
         SocketService.emit_badge_awarded(project_id, badge.to_dict(include_validator=True))
 
         return jsonify({
@@ -1100,3 +1148,52 @@ def get_project_badges(user_id, project_id):
 
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@admin_required
+def get_cache_stats(user_id):
+    """Get Redis pool, circuit breaker and L1 cache statistics for the worker serving this request"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'pool': CacheService.get_pool_stats(),
+                'breaker': CacheService.get_breaker_stats(),
+                'local': CacheService.get_local_stats(),
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@admin_bp.route('/cache/metrics', methods=['GET'])
+@admin_required
+def get_cache_metrics(user_id):
+    """Get cache hit ratios, counters, latency and payload size histograms per key family"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'data': CacheService.get_metrics_report()
+        }), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@admin_bp.route('/cache/metrics', methods=['DELETE'])
+@admin_required
+def reset_cache_metrics(user_id):
+    """Reset cache metric totals (e.g. before measuring a TTL change)"""
+    try:
+        if not CacheService.reset_metrics():
+            return jsonify({'status': 'error', 'message': 'Cache unavailable'}), 503
+        return jsonify({'status': 'success', 'message': 'Cache metrics reset'}), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -13,6 +13,9 @@ from utils.decorators import admin_required, token_required
 from utils.helpers import success_response, error_response
 from utils.scores import ProofScoreCalculator
 from utils.cache import CacheService
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
+from utils.counters import Counters
 
 badges_bp = Blueprint('badges', __name__)
 
@@ -42,11 +45,14 @@ def award_badge(user_id):
         db.session.add(badge)
 
         # Recalculate project scores
-        ProofScoreCalculator.update_project_scores(project)
+        ProofScoreCalculator.update_for_event(project, 'badge', badge_points=badge.points)
 
         db.session.commit()
         CacheService.invalidate_project(validated_data['project_id'])
         CacheService.invalidate_leaderboard()  # Badges affect leaderboard
+        RankingIndex.update_project(project)
+        Facets.update_project(project)
+        Counters.adjust(Counters.badge_deltas(badge.badge_type, 1))
 
         # Emit Socket.IO event for real-time badge notifications
         from services.socket_service import SocketService
@@ -12,6 +12,8 @@ from utils.validators import validate_ethereum_address
 from utils.helpers import success_response, error_response
 from utils.scores import ProofScoreCalculator
 from utils.cache import CacheService
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
 
 blockchain_bp = Blueprint('blockchain', __name__)
 
@@ -60,11 +62,15 @@ def verify_cert(user_id):
         # Get all projects to update scores
         if result['has_cert']:
             for project in user.projects:
-                ProofScoreCalculator.update_project_scores(project)
+                ProofScoreCalculator.update_for_event(project, 'user_verification', user=user)
                 CacheService.invalidate_project(project.id)
 
         db.session.commit()
         CacheService.invalidate_user(user_id)
+        if result['has_cert']:
+            for project in user.projects:
+                RankingIndex.update_project(project)
+                Facets.update_project(project)
 
         return success_response({
             'wallet_address': wallet_address,
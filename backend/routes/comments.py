@@ -11,6 +11,10 @@ from models.project import Project
 from schemas.comment import CommentCreateSchema, CommentUpdateSchema
 from utils.decorators import token_required, optional_auth
 from utils.helpers import success_response, error_response, paginated_response, get_pagination_params
+from utils.counters import count_query, get_count_mode
+from utils.scores import ProofScoreCalculator
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
 
 comments_bp = Blueprint('comments', __name__)
 
@@ -32,12 +36,12 @@ def get_comments(user_id):
 
         # Get root-level comments (not replies)
         query = Comment.query.filter_by(project_id=project_id, parent_id=None, is_deleted=False)
-        total = query.count()
+        total, count_mode = count_query(query, get_count_mode(request))
         comments = query.order_by(Comment.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
 
         data = [c.to_dict(include_author=True) for c in comments]
 
-        return paginated_response(data, total, page, per_page)
+        return paginated_response(data, total, page, per_page, count_mode=count_mode)
     except Exception as e:
         return error_response('Error', str(e), 500)
 
@@ -63,13 +67,21 @@ def create_comment(user_id):
         )
 
         project.comment_count += 1
+        ranking, old_score = project.feed_sort_values(), project.proof_score
+        ProofScoreCalculator.update_for_event(project, 'comment')
+        feed_sorts = Project.changed_feed_sorts(ranking, project.feed_sort_values())
+        new_score = project.proof_score
 
         db.session.add(comment)
         db.session.commit()
 
-        # Invalidate project cache (comment count changed)
+        # Invalidate project cache (comment count changed; feeds only if the community score moved)
         from utils.cache import CacheService
-        CacheService.invalidate_project(validated_data['project_id'])
+        CacheService.invalidate_project(validated_data['project_id'], feed_sorts=feed_sorts)
+        if feed_sorts:
+            CacheService.invalidate_leaderboard()
+            RankingIndex.update_project(project)
+            Facets.update_score(project.id, old_score, new_score)
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
@@ -107,7 +119,7 @@ def update_comment(user_id, comment_id):
 
         # Invalidate project cache
         from utils.cache import CacheService
-        CacheService.invalidate_project(comment.project_id)
+        CacheService.invalidate_project(comment.project_id, feed_sorts=[])
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
@@ -139,7 +151,7 @@ def delete_comment(user_id, comment_id):
 
         # Invalidate project cache
         from utils.cache import CacheService
-        CacheService.invalidate_project(comment.project_id)
+        CacheService.invalidate_project(comment.project_id, feed_sorts=[])
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
@@ -174,7 +186,7 @@ def vote_comment(user_id, comment_id):
 
         # Invalidate project cache (comment votes changed)
         from utils.cache import CacheService
-        CacheService.invalidate_project(comment.project_id)
+        CacheService.invalidate_project(comment.project_id, feed_sorts=[])
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
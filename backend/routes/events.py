@@ -3,6 +3,7 @@ Event Routes - Organizer-based event pages with product listings
 """
 from flask import Blueprint, request, jsonify
 from sqlalchemy import or_, func, desc
+from sqlalchemy.orm import contains_eager
 from datetime import datetime, timedelta
 from models.event import Event, EventProject, EventSubscriber
 from models.project import Project
@@ -164,7 +165,7 @@ def get_event_projects(user_id, event_slug):
         # Base query - join with projects
         query = EventProject.query.filter_by(event_id=event.id).join(
             Project, EventProject.project_id == Project.id
-        ).filter(Project.is_deleted == False)
+        ).options(contains_eager(EventProject.project)).filter(Project.is_deleted == False)
 
         # Filter by track
         track = request.args.get('track')
@@ -195,7 +196,12 @@ def get_event_projects(user_id, event_slug):
         return jsonify({
             'status': 'success',
             'data': {
-                'projects': [ep.to_dict(include_project=True) for ep in event_projects],
+                'projects': [
+                    dict(ep.to_dict(), project=project_dict)
+                    for ep, project_dict in zip(event_projects, Project.bulk_to_dict(
+                        [ep.project for ep in event_projects], include_creator=True
+                    ))
+                ],
                 'tracks': track_list,
                 'pagination': {
                     'page': page,
@@ -13,6 +13,7 @@ from models.user import User
 from schemas.intro import IntroCreateSchema, IntroUpdateSchema
 from utils.decorators import token_required
 from utils.helpers import success_response, error_response, paginated_response, get_pagination_params
+from utils.counters import count_query, get_count_mode
 
 intros_bp = Blueprint('intros', __name__)
 
@@ -144,12 +145,12 @@ def get_received_intros(user_id):
                 joinedload(Intro.recipient),
                 joinedload(Intro.project)
             ).order_by(Intro.created_at.desc())
-        total = query.count()
+        total, count_mode = count_query(query, get_count_mode(request))
         intros = query.limit(per_page).offset((page - 1) * per_page).all()
 
         data = [i.to_dict(include_users=True) for i in intros]
 
-        return paginated_response(data, total, page, per_page)
+        return paginated_response(data, total, page, per_page, count_mode=count_mode)
     except Exception as e:
         return error_response('Error', str(e), 500)
 
@@ -168,11 +169,11 @@ def get_sent_intros(user_id):
                 joinedload(Intro.recipient),
                 joinedload(Intro.project)
             ).order_by(Intro.created_at.desc())
-        total = query.count()
+        total, count_mode = count_query(query, get_count_mode(request))
         intros = query.limit(per_page).offset((page - 1) * per_page).all()
 
         data = [i.to_dict(include_users=True) for i in intros]
 
-        return paginated_response(data, total, page, per_page)
+        return paginated_response(data, total, page, per_page, count_mode=count_mode)
     except Exception as e:
         return error_response('Error', str(e), 500)
@@ -5,7 +5,8 @@ from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 from datetime import datetime, timedelta
-from sqlalchemy import func, or_
+from sqlalchemy import cast, func, or_, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import joinedload
 
 from extensions import db
@@ -13,9 +14,17 @@ from models.project import Project, ProjectScreenshot
 from models.user import User
 from schemas.project import ProjectSchema, ProjectCreateSchema, ProjectUpdateSchema
 from utils.decorators import token_required, admin_required, optional_auth
-from utils.helpers import success_response, error_response, paginated_response, get_pagination_params
+from utils.helpers import (success_response, error_response, paginated_response, get_pagination_params,
+                           get_view_params, select_fields, encode_cursor, decode_cursor, pagination_meta)
 from utils.scores import ProofScoreCalculator
 from utils.cache import CacheService
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
+from utils.counters import Counters, count_query, get_count_mode
+from utils.search_engine import SearchEngine
+from utils.search_index import SearchIndex
+from services.vote_service import VoteService
+from services.vote_buffer import VoteBuffer
 
 projects_bp = Blueprint('projects', __name__)
 
@@ -27,140 +36,296 @@ def list_projects(user_id):
     try:
         page, per_page = get_pagination_params(request)
         sort = request.args.get('sort', 'trending')  # trending, newest, top-rated, most-voted
+        view, fields = get_view_params(request)
+        view = Project.resolve_view(view, fields)
 
         # Advanced filters
-        search = request.args.get('search', '').strip()
-        tech_stack = request.args.getlist('tech')
-        hackathon = request.args.get('hackathon', '').strip()
-        min_score = request.args.get('min_score', type=int)
-        has_demo = request.args.get('has_demo', type=lambda v: v.lower() == 'true') if request.args.get('has_demo') else None
-        has_github = request.args.get('has_github', type=lambda v: v.lower() == 'true') if request.args.get('has_github') else None
-        featured_only = request.args.get('featured', type=lambda v: v.lower() == 'true') if request.args.get('featured') else None
-        badge_type = request.args.get('badge', '').strip()
+        filters = {
+            'search': request.args.get('search', '').strip(),
+            'tech_stack': request.args.getlist('tech'),
+            'hackathon': request.args.get('hackathon', '').strip(),
+            'min_score': request.args.get('min_score', type=int),
+            'has_demo': request.args.get('has_demo', type=lambda v: v.lower() == 'true') if request.args.get('has_demo') else None,
+            'has_github': request.args.get('has_github', type=lambda v: v.lower() == 'true') if request.args.get('has_github') else None,
+            'featured_only': request.args.get('featured', type=lambda v: v.lower() == 'true') if request.args.get('featured') else None,
+            'badge_type': request.args.get('badge', '').strip(),
+            # Exact scopes - also served from the ranking index
+            'hackathon_name': request.args.get('hackathon_name', '').strip(),
+            'category': request.args.get('category', '').strip(),
+        }
 
         # Check cache ONLY if no filters (pure feed requests)
-        has_filters = any([search, tech_stack, hackathon, min_score is not None,
-                          has_demo is not None, has_github is not None,
-                          featured_only, badge_type])
-
-        if not has_filters:
-            cached = CacheService.get_cached_feed(page, sort)
-            if cached:
-                from flask import jsonify
-                return jsonify(cached), 200
-
-        # Build query
-        query = Project.query.filter_by(is_deleted=False)
-
-        # Search in title, description, tagline
-        if search:
-            search_term = f'%{search}%'
-            query = query.filter(
-                or_(
-                    Project.title.ilike(search_term),
-                    Project.description.ilike(search_term),
-                    Project.tagline.ilike(search_term)
-                )
+        has_filters = any([filters['search'], filters['tech_stack'], filters['hackathon'],
+                           filters['min_score'] is not None, filters['has_demo'] is not None,
+                           filters['has_github'] is not None, filters['featured_only'],
+                           filters['badge_type']])
+        scopes = [(kind, filters[name]) for kind, name in (('hackathon', 'hackathon_name'), ('category', 'category'))
+                  if filters[name]]
+
+        # Unfiltered or single-scope pages come straight from the Redis ranking index when it's built
+        ranked = None
+        if 'cursor' not in request.args and not has_filters and len(scopes) <= 1:
+            sort = _canonical_sort(sort)
+            ranked = RankingIndex.get_page(sort, page, per_page, scopes[0] if scopes else None)
+
+        if 'cursor' in request.args:
+            # Keyset pagination: ?cursor= (empty) for the first page, then next_cursor.
+            # Seeks straight to the position instead of scanning earlier rows, stays
+            # stable while scores change, and needs no COUNT(*).
+            sort = _canonical_sort(sort)
+            try:
+                after = _decode_feed_cursor(request.args['cursor'], sort)
+            except ValueError:
+                return error_response('Validation error', 'Invalid cursor', 400)
+
+            ids, next_cursor = _keyset_page(_feed_query(sort, **filters), sort, after, per_page)
+            response_data = {
+                'status': 'success',
+                'message': 'Success',
+                'data': _feed_cards(ids, view, user_id),
+                'pagination': {
+                    'per_page': per_page,
+                    'next_cursor': next_cursor,
+                    'has_more': next_cursor is not None,
+                }
+            }
+        elif ranked is not None:
+            ids, total = ranked
+            response_data = {
+                'status': 'success',
+                'message': 'Success',
+                'data': _feed_cards(ids, view, user_id),
+                'pagination': pagination_meta(total, page, per_page),
+            }
+        elif has_filters or scopes:
+            # Filtered totals are exact up to 1000, then "1000+" (?count=exact|estimated to override)
+            query = _feed_query(sort, **filters)
+            total, count_mode = count_query(query, get_count_mode(request, 'capped'))
+            response_data = _feed_page(query, total, page, per_page, user_id, view=view, count_mode=count_mode)
+        else:
+            # Pure feed requests are cached (Instagram-style: 1 hour, invalidated on changes).
+            # Only the ordered project IDs are cached per page; cards come from per-project
+            # fragments, so a vote that doesn't reorder a feed keeps its pages. After a reorder
+            # the stale page keeps being served while one worker rebuilds it.
+            sort = _canonical_sort(sort)
+            feed_page = CacheService.get_feed_page(
+                page, per_page, sort,
+                lambda: _build_feed_page(sort, page, per_page),
+                ttl=3600
             )
+            response_data = {
+                'status': 'success',
+                'message': 'Success',
+                'data': _feed_cards(feed_page['ids'], view, user_id),
+                'pagination': feed_page['pagination'],
+            }
 
-        # Tech stack filter (contains all specified techs)
-        if tech_stack:
-            for tech in tech_stack:
-                query = query.filter(Project.tech_stack.contains([tech]))
+        response_data['data'] = select_fields(response_data['data'], fields)
 
-        # Hackathon filter
-        if hackathon:
-            query = query.filter(Project.hackathon_name.ilike(f'%{hackathon}%'))
+        # ?facets=true: how many projects each filter value would match
+        if request.args.get('facets', '').lower() == 'true':
+            if has_filters or scopes:
+                response_data['facets'] = Facets.for_query(_feed_query(sort, **filters))
+            else:
+                response_data['facets'] = Facets.get_all()
 
-        # Score filter
-        if min_score is not None:
-            query = query.filter(Project.proof_score >= min_score)
+        from flask import jsonify
+        return jsonify(response_data), 200
+    except Exception as e:
+        return error_response('Error', str(e), 500)
 
-        # Has demo link
-        if has_demo is not None:
-            if has_demo:
-                query = query.filter(Project.demo_url.isnot(None), Project.demo_url != '')
-            else:
-                query = query.filter(or_(Project.demo_url.is_(None), Project.demo_url == ''))
 
-        # Has GitHub link
-        if has_github is not None:
-            if has_github:
-                query = query.filter(Project.github_url.isnot(None), Project.github_url != '')
-            else:
-                query = query.filter(or_(Project.github_url.is_(None), Project.github_url == ''))
+def _feed_query(sort, search='', tech_stack=(), hackathon='', min_score=None, has_demo=None,
+                has_github=None, featured_only=None, badge_type='', hackathon_name='', category=''):
+    """Build the filtered, sorted project feed query"""
+    query = Project.query.filter_by(is_deleted=False)
 
-        # Featured only
-        if featured_only:
-            query = query.filter(Project.is_featured == True)
+    # Full-text search (title, tagline, description, hackathon name) via the GIN-indexed search_vector
+    if search:
+        query = query.filter(SearchEngine.matches('projects', search))
 
-        # Badge filter
-        if badge_type:
-            from models.badge import ValidationBadge
-            query = query.join(ValidationBadge).filter(
-                ValidationBadge.badge_type == badge_type.lower()
-            )
+    # Tech stack filter (contains all specified techs)
+    if tech_stack:
+        for tech in tech_stack:
+            query = query.filter(Project.tech_stack.contains([tech]))
 
-        # Sorting
-        if sort == 'trending' or sort == 'hot':
-            # Trending: combination of score and recent activity
-            query = query.order_by(
-                Project.proof_score.desc(),
-                Project.created_at.desc()
-            )
-        elif sort == 'newest' or sort == 'new':
-            query = query.order_by(Project.created_at.desc())
-        elif sort == 'top-rated' or sort == 'top':
-            query = query.order_by(Project.proof_score.desc())
-        elif sort == 'most-voted':
-            query = query.order_by(
-                (Project.upvotes + Project.downvotes).desc()
-            )
+    # Hackathon filter
+    if hackathon:
+        query = query.filter(Project.hackathon_name.ilike(f'%{hackathon}%'))
+
+    # Exact hackathon / category scopes
+    if hackathon_name:
+        query = query.filter(Project.hackathon_name == hackathon_name)
+    if category:
+        query = query.filter(cast(Project.categories, JSONB).contains([category]))
+
+    # Score filter
+    if min_score is not None:
+        query = query.filter(Project.proof_score >= min_score)
+
+    # Has demo link
+    if has_demo is not None:
+        if has_demo:
+            query = query.filter(Project.demo_url.isnot(None), Project.demo_url != '')
         else:
-            # Default to trending
-            query = query.order_by(
-                Project.proof_score.desc(),
-                Project.created_at.desc()
-            )
+            query = query.filter(or_(Project.demo_url.is_(None), Project.demo_url == ''))
 
-        # OPTIMIZED COUNT: Use cached count if no filters (avoids slow COUNT(*) on large tables)
-        if not has_filters:
-            total = CacheService.get_projects_count(sort)
-            if total is None:
-                # Cache miss - do actual count and cache it
-                total = query.count()
-                CacheService.set_projects_count(total, sort, ttl=3600)  # 1 hour cache
+    # Has GitHub link
+    if has_github is not None:
+        if has_github:
+            query = query.filter(Project.github_url.isnot(None), Project.github_url != '')
         else:
-            # With filters, must do real count (but indexes make it fast)
-            total = query.count()
+            query = query.filter(or_(Project.github_url.is_(None), Project.github_url == ''))
 
-        # Eager load creator to avoid N+1 queries
-        projects = query.options(joinedload(Project.creator)).limit(per_page).offset((page - 1) * per_page).all()
+    # Featured only
+    if featured_only:
+        query = query.filter(Project.is_featured == True)
 
-        data = [p.to_dict(include_creator=True, user_id=user_id) for p in projects]
+    # Badge filter
+    if badge_type:
+        from models.badge import ValidationBadge
+        query = query.join(ValidationBadge).filter(
+            ValidationBadge.badge_type == badge_type.lower()
+        )
 
-        # Build response data
-        total_pages = (total + per_page - 1) // per_page
-        response_data = {
-            'status': 'success',
-            'message': 'Success',
-            'data': data,
-            'pagination': {
-                'total': total,
-                'page': page,
-                'per_page': per_page,
-                'total_pages': total_pages,
-            }
-        }
+    # Sorting (ties broken by created_at, id so keyset cursors see a total order)
+    query = query.order_by(*[key.desc() for key in Project.feed_sort_keys(_canonical_sort(sort))])
 
-        # Cache response if no filters (Instagram-style: 1 hour, invalidated on changes)
-        if not has_filters:
-            CacheService.cache_feed(page, sort, response_data, ttl=3600)
+    return query
+
+
+def _feed_page(query, total, page, per_page, viewer_id=None, view='full', count_mode='exact'):
+    """Fetch one page of a feed query and build the response data"""
+    # Eager load creator to avoid N+1 queries
+    query = query.options(joinedload(Project.creator))
+    if view == 'card':
+        query = query.options(*Project.card_options())
+    projects = query.limit(per_page).offset((page - 1) * per_page).all()
+
+    data = Project.bulk_to_dict(projects, include_creator=True, user_id=viewer_id, view=view)
+
+    return {
+        'status': 'success',
+        'message': 'Success',
+        'data': data,
+        'pagination': pagination_meta(total, page, per_page, count_mode)
+    }
+
+
+def _canonical_sort(sort):
+    """Map sort aliases onto the feed orderings CacheService keeps namespaces for"""
+    aliases = {'hot': 'trending', 'new': 'newest', 'top': 'top-rated'}
+    sort = aliases.get(sort, sort)
+    return sort if sort in CacheService.FEED_SORTS else 'trending'
+
+
+def _build_feed_page(sort, page, per_page):
+    """Build a cacheable page of the unfiltered feed: ordered IDs only (runs outside the request on refresh)"""
+    query = _feed_query(sort)
+
+    # Every sort covers all live projects - a delta-maintained counter, no COUNT(*)
+    total = Counters.get('projects:live')
+
+    rows = query.with_entities(Project.id).limit(per_page).offset((page - 1) * per_page).all()
+
+    return {
+        'ids': [row.id for row in rows],
+        'pagination': pagination_meta(total, page, per_page)
+    }
+
+
+def _keyset_page(query, sort, after, per_page):
+    """IDs of the next page of a sorted feed query after a cursor position, plus the next cursor"""
+    keys = Project.feed_sort_keys(sort)
+    if after is not None:
+        # Every key sorts descending, so "after" is a single row-value comparison
+        query = query.filter(tuple_(*keys) < tuple_(*after))
+
+    rows = query.with_entities(*keys).limit(per_page + 1).all()
+    next_cursor = _encode_feed_cursor(sort, rows[per_page - 1]) if len(rows) > per_page else None
+    return [row[-1] for row in rows[:per_page]], next_cursor
 
-        from flask import jsonify
-        return jsonify(response_data), 200
-    except Exception as e:
-        return error_response('Error', str(e), 500)
+
+def _encode_feed_cursor(sort, row):
+    """Cursor pointing just past a row of feed sort key values"""
+    values = list(row)
+    values[-2] = values[-2].isoformat()  # created_at
+    return encode_cursor({'sort': sort, 'after': values})
+
+
+def _decode_feed_cursor(cursor, sort):
+    """Sort key values a cursor points past, or None for the first page"""
+    if not cursor:
+        return None
+    payload = decode_cursor(cursor)
+    values = payload.get('after')
+    if payload.get('sort') != sort or not isinstance(values, list) \
+            or len(values) != len(Project.feed_sort_keys(sort)):
+        raise ValueError('Invalid cursor')
+    try:
+        values[-2] = datetime.fromisoformat(values[-2])
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    return values
+
+
+def _feed_cards(project_ids, view, user_id):
+    """Feed cards for a page of project IDs in the requested view, with the viewer's votes"""
+    data = _render_project_cards(project_ids)
+    if view == 'card':
+        data = [Project.as_card(p) for p in data]
+    if user_id:
+        data = _with_user_votes(data, user_id)
+    return VoteBuffer.overlay(data, user_id)
+
+
+def _render_project_cards(project_ids):
+    """Rendered feed cards in ID order, from the project and creator fragment caches
+
+    Each fragment family is fetched with one MGET; only misses are loaded from
+    the database and written back. The ID list may be stale, so projects deleted
+    since it was cached are left out.
+    """
+    fragments = {pid: fragment for pid, fragment in CacheService.get_project_fragments(project_ids).items()
+                 if not fragment.get('is_deleted')}
+    missing = [pid for pid in project_ids if pid not in fragments]
+    if missing:
+        loaded = {p['id']: p for p in Project.bulk_to_dict(
+            Project.query.filter(Project.id.in_(missing), Project.is_deleted == False).all())}
+        CacheService.cache_project_fragments(loaded)
+        fragments.update(loaded)
+
+    creator_ids = list({f['user_id'] for f in fragments.values()})
+    creators = CacheService.get_user_fragments(creator_ids)
+    missing = [uid for uid in creator_ids if uid not in creators]
+    if missing:
+        loaded = {u.id: u.to_dict() for u in User.query.filter(User.id.in_(missing)).all()}
+        CacheService.cache_user_fragments(loaded)
+        creators.update(loaded)
+
+    cards = []
+    for project_id in project_ids:
+        fragment = fragments.get(project_id)
+        if fragment is None:
+            continue  # Deleted since the ID list was cached
+        creator = creators.get(fragment['user_id'])
+        cards.append(dict(fragment, creator=creator, author=creator))  # author: alias for frontend compatibility
+    return cards
+
+
+def _with_user_votes(projects_data, user_id):
+    """Copy serialized projects with the viewer's votes filled in (one query)"""
+    from models.vote import Vote
+
+    project_ids = [p['id'] for p in projects_data]
+    if not project_ids:
+        return projects_data
+
+    votes = dict(db.session.query(Vote.project_id, Vote.vote_type).filter(
+        Vote.user_id == user_id,
+        Vote.project_id.in_(project_ids)
+    ).all())
+    return [dict(p, user_vote=votes.get(p['id'])) for p in projects_data]
 
 
 @projects_bp.route('/<project_id>', methods=['GET'])
@@ -179,6 +344,7 @@ def get_project(user_id, project_id):
                     db.session.commit()
             except:
                 pass  # Don't fail if view increment fails
+            cached = dict(cached, data=VoteBuffer.overlay([cached['data']], user_id)[0])
             from flask import jsonify
             return jsonify(cached), 200
 
@@ -199,6 +365,8 @@ def get_project(user_id, project_id):
 
         # Cache for 5 minutes
         CacheService.cache_project(project_id, response_data, ttl=3600)  # 1 hour cache (auto-invalidates on changes)
+        # After caching, on a copy: buffered votes aren't in the database yet
+        response_data = dict(response_data, data=VoteBuffer.overlay([response_data['data']], user_id)[0])
 
         from flask import jsonify
         return jsonify(response_data), 200
@@ -265,7 +433,11 @@ def create_project(user_id):
         CacheService.invalidate_project_feed()
         CacheService.invalidate_leaderboard()  # Leaderboard rankings change
         CacheService.invalidate_user_projects(user_id)  # User's project list changed
-        CacheService.invalidate_counts()  # Project count changed
+        CacheService.invalidate_suggestions()
+        Counters.adjust({'projects:total': 1, 'projects:live': 1})
+        RankingIndex.update_project(project)
+        Facets.update_project(project)
+        SearchIndex.update_project(project)
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
@@ -296,6 +468,8 @@ def update_project(user_id, project_id):
         data = request.get_json()
         schema = ProjectUpdateSchema()
         validated_data = schema.load(data)
+        ranking = project.feed_sort_values()
+        suggested = (project.title, project.hackathon_name, list(project.tech_stack or []))
 
         # Update fields
         for key, value in validated_data.items():
@@ -303,12 +477,17 @@ def update_project(user_id, project_id):
                 setattr(project, key, value)
 
         project.updated_at = datetime.utcnow()
-        ProofScoreCalculator.update_project_scores(project)
+        ProofScoreCalculator.update_for_event(project, 'edit')
 
         db.session.commit()
-        CacheService.invalidate_project(project_id)
-        CacheService.invalidate_project_feed()  # Updated project affects feed
+        # Feeds are only reordered if the edit moved the project's score
+        CacheService.invalidate_project(project_id, feed_sorts=Project.changed_feed_sorts(ranking, project.feed_sort_values()))
         CacheService.invalidate_user_projects(user_id)  # User's project list changed
+        if suggested != (project.title, project.hackathon_name, list(project.tech_stack or [])):
+            CacheService.invalidate_suggestions()
+        RankingIndex.update_project(project)  # Also moves it if hackathon or categories changed
+        Facets.update_project(project)
+        SearchIndex.update_project(project)
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
@@ -335,12 +514,17 @@ def delete_project(user_id, project_id):
         if project.user_id != user_id:
             return error_response('Forbidden', 'You can only delete your own projects', 403)
 
+        was_live = not project.is_deleted
         project.is_deleted = True
         db.session.commit()
         CacheService.invalidate_project(project_id)
         CacheService.invalidate_leaderboard()  # Leaderboard rankings change
         CacheService.invalidate_user_projects(user_id)  # User's project list changed
-        CacheService.invalidate_counts()  # Project count changed
+        CacheService.invalidate_suggestions()
+        Counters.adjust({'projects:live': -1 if was_live else 0})
+        RankingIndex.update_project(project)  # Soft-deleted: removed from every ranking
+        Facets.update_project(project)
+        SearchIndex.update_project(project)
 
         # Emit Socket.IO event for real-time updates
         from services.socket_service import SocketService
@@ -363,13 +547,15 @@ def feature_project(user_id, project_id):
             return error_response('Not found', 'Project not found', 404)
 
         from datetime import datetime as dt
+        newly_featured = not project.is_featured
         project.is_featured = True
         project.featured_at = dt.utcnow()
         project.featured_by = user_id
 
         db.session.commit()
-        CacheService.invalidate_project(project_id)
-        CacheService.invalidate_project_feed()  # Featured status affects feed
+        CacheService.invalidate_project(project_id, feed_sorts=[])  # Featured status doesn't reorder feeds
+        Counters.adjust({'projects:featured': 1 if newly_featured else 0})
+        Facets.update_project(project)
 
         # Emit Socket.IO event for real-time feature notification
         from services.socket_service import SocketService
@@ -384,92 +570,32 @@ def feature_project(user_id, project_id):
 @projects_bp.route('/<project_id>/upvote', methods=['POST'])
 @token_required
 def upvote_project(user_id, project_id):
-    """Upvote a project"""
-    try:
-        from models.vote import Vote
-
-        project = Project.query.get(project_id)
-        if not project or project.is_deleted:
-            return error_response('Not found', 'Project not found', 404)
-
-        # Check if vote exists
-        existing_vote = Vote.query.filter_by(user_id=user_id, project_id=project_id).first()
-
-        if existing_vote:
-            # If already upvoted, remove vote
-            if existing_vote.vote_type == 'up':
-                project.upvotes = max(0, project.upvotes - 1)
-                db.session.delete(existing_vote)
-            else:
-                # Change from downvote to upvote
-                project.downvotes = max(0, project.downvotes - 1)
-                project.upvotes += 1
-                existing_vote.vote_type = 'up'
-        else:
-            # Create new upvote
-            vote = Vote(user_id=user_id, project_id=project_id, vote_type='up')
-            project.upvotes += 1
-            db.session.add(vote)
-
-        # Recalculate scores
-        ProofScoreCalculator.update_project_scores(project)
-        db.session.commit()
-        CacheService.invalidate_project(project_id)
-        CacheService.invalidate_leaderboard()  # Vote affects leaderboard
-
-        # Emit Socket.IO event for real-time vote updates
-        from services.socket_service import SocketService
-        SocketService.emit_vote_cast(project_id, 'up')
-        SocketService.emit_leaderboard_updated()
-
-        return success_response(project.to_dict(include_creator=True), 'Project upvoted', 200)
-    except Exception as e:
-        db.session.rollback()
-        return error_response('Error', str(e), 500)
+    """Upvote a project (upvoting again removes the vote)"""
+    return _vote(user_id, project_id, 'up', 'Project upvoted')
 
 
 @projects_bp.route('/<project_id>/downvote', methods=['POST'])
 @token_required
 def downvote_project(user_id, project_id):
-    """Downvote a project"""
-    try:
-        from models.vote import Vote
+    """Downvote a project (downvoting again removes the vote)"""
+    return _vote(user_id, project_id, 'down', 'Project downvoted')
 
+
+def _vote(user_id, project_id, vote_type, message):
+    try:
         project = Project.query.get(project_id)
         if not project or project.is_deleted:
             return error_response('Not found', 'Project not found', 404)
 
-        # Check if vote exists
-        existing_vote = Vote.query.filter_by(user_id=user_id, project_id=project_id).first()
-
-        if existing_vote:
-            # If already downvoted, remove vote
-            if existing_vote.vote_type == 'down':
-                project.downvotes = max(0, project.downvotes - 1)
-                db.session.delete(existing_vote)
-            else:
-                # Change from upvote to downvote
-                project.upvotes = max(0, project.upvotes - 1)
-                project.downvotes += 1
-                existing_vote.vote_type = 'down'
-        else:
-            # Create new downvote
-            vote = Vote(user_id=user_id, project_id=project_id, vote_type='down')
-            project.downvotes += 1
-            db.session.add(vote)
-
-        # Recalculate scores
-        ProofScoreCalculator.update_project_scores(project)
-        db.session.commit()
-        CacheService.invalidate_project(project_id)
-        CacheService.invalidate_leaderboard()  # Vote affects leaderboard
+        result, project = VoteService.vote(user_id, project_id, vote_type)
+        if result is None:
+            return error_response('Not found', 'Project not found', 404)
 
         # Emit Socket.IO event for real-time vote updates
-        from services.socket_service import SocketService
-        SocketService.emit_vote_cast(project_id, 'down')
-        SocketService.emit_leaderboard_updated()
+        VoteService.broadcast(project_id, result)
 
-        return success_response(project.to_dict(include_creator=True), 'Project downvoted', 200)
+        data = VoteBuffer.overlay([project.to_dict(include_creator=True)], user_id)[0]
+        return success_response(data, message, 200)
     except Exception as e:
         db.session.rollback()
         return error_response('Error', str(e), 500)
@@ -480,33 +606,16 @@ def downvote_project(user_id, project_id):
 def remove_vote(user_id, project_id):
     """Remove vote from project"""
     try:
-        from models.vote import Vote
-
         project = Project.query.get(project_id)
         if not project or project.is_deleted:
             return error_response('Not found', 'Project not found', 404)
 
-        # Find and remove vote
-        vote = Vote.query.filter_by(user_id=user_id, project_id=project_id).first()
-
-        if not vote:
+        result, project = VoteService.vote(user_id, project_id, None)
+        if result is None or result['previous'] is None:
             return error_response('Not found', 'No vote to remove', 404)
 
-        if vote.vote_type == 'up':
-            project.upvotes = max(0, project.upvotes - 1)
-        else:
-            project.downvotes = max(0, project.downvotes - 1)
-
-        db.session.delete(vote)
-        ProofScoreCalculator.update_project_scores(project)
-        db.session.commit()
-        CacheService.invalidate_project(project_id)
-        CacheService.invalidate_leaderboard()  # Vote removal affects leaderboard
-
         # Emit Socket.IO event for real-time vote updates
-        from services.socket_service import SocketService
-        SocketService.emit_vote_removed(project_id)
-        SocketService.emit_leaderboard_updated()
+        VoteService.broadcast(project_id, result)
 
         return success_response(None, 'Vote removed', 200)
     except Exception as e:
@@ -522,80 +631,22 @@ def get_leaderboard(user_id):
         timeframe = request.args.get('timeframe', 'month')  # week/month/all
         limit = request.args.get('limit', 10, type=int)
         limit = min(limit, 50)  # Cap at 50
-
-        # Check cache (5 min TTL)
-        cache_key = f"leaderboard:{timeframe}:{limit}"
-        cached = CacheService.get(cache_key)
-        if cached:
-            from flask import jsonify
-            return jsonify(cached), 200
-
-        # Calculate date filter
-        if timeframe == 'week':
-            since = datetime.utcnow() - timedelta(days=7)
-        elif timeframe == 'month':
-            since = datetime.utcnow() - timedelta(days=30)
-        else:
-            since = None
-
-        # Top projects
-        query = Project.query.filter_by(is_deleted=False)
-        if since:
-            query = query.filter(Project.created_at >= since)
-
-        top_projects = query.options(joinedload(Project.creator)).order_by(
-            Project.proof_score.desc()
-        ).limit(limit).all()
-
-        # Top builders (by total karma/proof score)
-        builder_query = db.session.query(
-            User.id,
-            User.username,
-            User.display_name,
-            User.avatar_url,
-            func.sum(Project.proof_score).label('total_score'),
-            func.count(Project.id).label('project_count')
-        ).join(Project, User.id == Project.user_id).filter(
-            Project.is_deleted == False
+        view, fields = get_view_params(request)
+        view = Project.resolve_view(view, fields)
+
+        # Cached for 5 minutes; stale rankings are served while one worker recomputes
+        response_data = CacheService.get_leaderboard(
+            f"{timeframe}:{limit}:{view}",
+            lambda: _build_leaderboard(timeframe, limit, view),
+            ttl=300
         )
-
-        if since:
-            builder_query = builder_query.filter(Project.created_at >= since)
-
-        top_builders = builder_query.group_by(
-            User.id, User.username, User.display_name, User.avatar_url
-        ).order_by(
-            func.sum(Project.proof_score).desc()
-        ).limit(limit).all()
-
-        # Featured projects
-        featured = Project.query.options(joinedload(Project.creator)).filter_by(
-            is_deleted=False,
-            is_featured=True
-        ).order_by(Project.featured_at.desc()).limit(limit).all()
-
-        # Build response data
-        response_data = {
-            'status': 'success',
-            'message': 'Leaderboard retrieved',
-            'data': {
-                'top_projects': [p.to_dict(include_creator=True) for p in top_projects],
-                'top_builders': [{
-                    'id': str(b.id),
-                    'username': b.username,
-                    'display_name': b.display_name,
-                    'avatar_url': b.avatar_url,
-                    'total_score': int(b.total_score or 0),
-                    'project_count': b.project_count
-                } for b in top_builders],
-                'featured': [p.to_dict(include_creator=True) for p in featured],
-                'timeframe': timeframe,
-                'limit': limit
-            }
-        }
-
-        # Cache for 5 minutes
-        CacheService.set(cache_key, response_data, ttl=300)
+        if fields:
+            data = response_data['data']
+            response_data = dict(response_data, data=dict(
+                data,
+                top_projects=select_fields(data['top_projects'], fields),
+                featured=select_fields(data['featured'], fields)
+            ))
 
         from flask import jsonify
         return jsonify(response_data), 200
@@ -604,6 +655,82 @@ def get_leaderboard(user_id):
         return error_response('Error', str(e), 500)
 
 
+def _build_leaderboard(timeframe, limit, view='full'):
+    """Compute the leaderboard response for a timeframe"""
+    # Calculate date filter
+    if timeframe == 'week':
+        since = datetime.utcnow() - timedelta(days=7)
+    elif timeframe == 'month':
+        since = datetime.utcnow() - timedelta(days=30)
+    else:
+        since = None
+
+    # Top projects
+    query = Project.query.filter_by(is_deleted=False)
+    if since:
+        query = query.filter(Project.created_at >= since)
+
+    query = query.options(joinedload(Project.creator))
+    if view == 'card':
+        query = query.options(*Project.card_options())
+
+    top_projects = query.order_by(
+        Project.proof_score.desc()
+    ).limit(limit).all()
+
+    # Top builders (by total karma/proof score)
+    builder_query = db.session.query(
+        User.id,
+        User.username,
+        User.display_name,
+        User.avatar_url,
+        func.sum(Project.proof_score).label('total_score'),
+        func.count(Project.id).label('project_count')
+    ).join(Project, User.id == Project.user_id).filter(
+        Project.is_deleted == False
+    )
+
+    if since:
+        builder_query = builder_query.filter(Project.created_at >= since)
+
+    top_builders = builder_query.group_by(
+        User.id, User.username, User.display_name, User.avatar_url
+    ).order_by(
+        func.sum(Project.proof_score).desc()
+    ).limit(limit).all()
+
+    # Featured projects
+    featured_query = Project.query.options(joinedload(Project.creator))
+    if view == 'card':
+        featured_query = featured_query.options(*Project.card_options())
+    featured = featured_query.filter_by(
+        is_deleted=False,
+        is_featured=True
+    ).order_by(Project.featured_at.desc()).limit(limit).all()
+
+    # Build response data
+    response_data = {
+        'status': 'success',
+        'message': 'Leaderboard retrieved',
+        'data': {
+            'top_projects': Project.bulk_to_dict(top_projects, include_creator=True, view=view),
+            'top_builders': [{
+                'id': str(b.id),
+                'username': b.username,
+                'display_name': b.display_name,
+                'avatar_url': b.avatar_url,
+                'total_score': int(b.total_score or 0),
+                'project_count': b.project_count
+            } for b in top_builders],
+            'featured': Project.bulk_to_dict(featured, include_creator=True, view=view),
+            'timeframe': timeframe,
+            'limit': limit
+        }
+    }
+
+    return response_data
+
+
 @projects_bp.route('/<project_id>/view', methods=['POST'])
 @optional_auth
 def track_view(user_id, project_id):
@@ -7,6 +7,7 @@ from models.saved_project import SavedProject
 from models.project import Project
 from utils.decorators import token_required
 from utils.helpers import success_response, error_response, paginated_response, get_pagination_params
+from utils.counters import count_query, get_count_mode
 from utils.cache import CacheService
 
 saved_projects_bp = Blueprint('saved_projects', __name__, url_prefix='/api/saved')
@@ -114,18 +115,16 @@ def get_my_saved_projects(user_id):
             )\
             .order_by(SavedProject.created_at.desc())
 
-        total = query.count()
+        total, count_mode = count_query(query, get_count_mode(request))
         saved_items = query.limit(per_page).offset((page - 1) * per_page).all()
 
         # OPTIMIZED: Use eager-loaded project instead of querying again
-        projects = []
-        for saved in saved_items:
-            if saved.project:  # Use already-loaded project
-                project_dict = saved.project.to_dict(include_creator=True, user_id=user_id)
-                project_dict['saved_at'] = saved.created_at.isoformat()
-                projects.append(project_dict)
-
-        return paginated_response(projects, total, page, per_page, 'Saved projects retrieved')
+        saved_items = [saved for saved in saved_items if saved.project]  # Use already-loaded project
+        projects = Project.bulk_to_dict([saved.project for saved in saved_items], include_creator=True, user_id=user_id)
+        for saved, project_dict in zip(saved_items, projects):
+            project_dict['saved_at'] = saved.created_at.isoformat()
+
+        return paginated_response(projects, total, page, per_page, 'Saved projects retrieved', count_mode=count_mode)
 
     except Exception as e:
         return error_response('Error', str(e), 500)
@@ -2,21 +2,31 @@
 Search routes
 """
 from flask import Blueprint, request
-from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
-from extensions import db
 from models.project import Project
 from models.user import User
 from utils.decorators import optional_auth
-from utils.helpers import success_response, error_response
+from utils.helpers import success_response, error_response, get_view_params, select_fields
+from utils.search_engine import SearchEngine
 
 search_bp = Blueprint('search', __name__)
 
+PAGE_LIMITS = {'projects': 20, 'users': 10}
+
 
 @search_bp.route('', methods=['GET'])
 @optional_auth
 def search(user_id):
-    """Search for projects and users"""
+    """Search for projects and users
+
+    Results are ordered by relevance and carry a 'search' entry with the rank
+    and highlighted title/snippet. Query params:
+    - q: search text (plain words, the last one matched as a prefix, or
+      web-search syntax: "phrase", -exclude, or)
+    - type: all (default), projects or users
+    - cursor: next_cursor from a previous page, for type=projects or type=users
+    - limit: page size (defaults to 20 projects / 10 users)
+    """
     try:
         query = request.args.get('q', '').strip()
 
@@ -26,37 +36,97 @@ def search(user_id):
         if len(query) < 2:
             return error_response('Validation error', 'Search query must be at least 2 characters', 400)
 
-        # Search projects - eager load creator to avoid N+1 queries
-        search_pattern = f'%{query}%'
-        projects = Project.query.options(joinedload(Project.creator)).filter(
-            Project.is_deleted == False,
-            or_(
-                Project.title.ilike(search_pattern),
-                Project.tagline.ilike(search_pattern),
-                Project.description.ilike(search_pattern),
-                Project.hackathon_name.ilike(search_pattern)
-            )
-        ).order_by(Project.created_at.desc()).limit(20).all()
-
-        # Search users
-        users = User.query.filter(
-            User.is_active == True,
-            or_(
-                User.username.ilike(search_pattern),
-                User.display_name.ilike(search_pattern),
-                User.bio.ilike(search_pattern)
-            )
-        ).limit(10).all()
-
-        # Format results
-        project_results = [p.to_dict(include_creator=True, user_id=user_id) for p in projects]
-        user_results = [u.to_dict(include_email=False) for u in users]
+        search_type = request.args.get('type', 'all')
+        if search_type not in ('all',) + SearchEngine.TYPES:
+            return error_response('Validation error', 'type must be all, projects or users', 400)
+        cursor = request.args.get('cursor')
+        if cursor and search_type == 'all':
+            return error_response('Validation error', 'cursor requires type=projects or type=users', 400)
+
+        view, fields = get_view_params(request)
+        view = Project.resolve_view(view, fields)
+
+        results = {'projects': [], 'users': []}
+        next_cursor = {}
+        for name in SearchEngine.TYPES:
+            if search_type not in ('all', name):
+                continue
+            limit = min(request.args.get('limit', PAGE_LIMITS[name], type=int), 50)
+            try:
+                hits, next_cursor[name] = SearchEngine.search(name, query, limit=max(limit, 1), cursor=cursor)
+            except ValueError:
+                return error_response('Validation error', 'Invalid cursor', 400)
+            results[name] = _project_results(hits, view, fields, user_id) if name == 'projects' \
+                else _user_results(hits)
 
         return success_response({
-            'projects': project_results,
-            'users': user_results,
-            'total': len(project_results) + len(user_results)
+            'projects': results['projects'],
+            'users': results['users'],
+            'total': len(results['projects']) + len(results['users']),
+            'next_cursor': next_cursor,
         }, 'Search completed', 200)
 
     except Exception as e:
         return error_response('Error', str(e), 500)
+
+
+@search_bp.route('/suggest', methods=['GET'])
+def suggest():
+    """Typeahead suggestions as tiny {id, label, type} entries
+
+    Query params:
+    - q: what has been typed so far
+    - types: comma-separated subset of project,user,hackathon,tech (default all)
+    - limit: suggestions per type (default 5, max 10)
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return success_response([], 'Suggestions', 200)
+
+        types = request.args.get('types')
+        types = [t.strip() for t in types.split(',')] if types else SearchEngine.SUGGEST_TYPES
+        if not set(types) <= set(SearchEngine.SUGGEST_TYPES):
+            return error_response('Validation error', 'types must be among project, user, hackathon, tech', 400)
+        limit = max(1, min(request.args.get('limit', 5, type=int), 10))
+
+        return success_response(SearchEngine.suggest(query, types, limit), 'Suggestions', 200)
+
+    except Exception as e:
+        return error_response('Error', str(e), 500)
+
+
+def _search_info(hit):
+    return {'rank': hit['rank'], 'title': hit['title'], 'snippet': hit['snippet']}
+
+
+def _project_results(hits, view, fields, user_id):
+    """Serialize project hits in rank order"""
+    if not hits:
+        return []
+    # Eager load creator to avoid N+1 queries
+    project_query = Project.query.options(joinedload(Project.creator))
+    if view == 'card':
+        project_query = project_query.options(*Project.card_options())
+    projects = {p.id: p for p in project_query.filter(Project.id.in_([hit['id'] for hit in hits]))}
+    hits = [hit for hit in hits if hit['id'] in projects]
+
+    data = Project.bulk_to_dict([projects[hit['id']] for hit in hits], include_creator=True,
+                                user_id=user_id, view=view)
+    for item, hit in zip(data, hits):
+        item['search'] = _search_info(hit)
+    return select_fields(data, fields, always=('id', 'search'))
+
+
+def _user_results(hits):
+    """Serialize user hits in rank order"""
+    if not hits:
+        return []
+    users = {u.id: u for u in User.query.filter(User.id.in_([hit['id'] for hit in hits]))}
+    results = []
+    for hit in hits:
+        if hit['id'] in users:
+            data = users[hit['id']].to_dict(include_email=False)
+            data['search'] = _search_info(hit)
+            results.append(data)
+    return results
@@ -10,7 +10,8 @@ from models.user import User
 from models.project import Project
 from schemas.user import UserProfileUpdateSchema
 from utils.decorators import token_required, optional_auth
-from utils.helpers import success_response, error_response, paginated_response, get_pagination_params
+from utils.helpers import (success_response, error_response, paginated_response, get_pagination_params,
+                           get_view_params, select_fields)
 from utils.cache import CacheService
 
 users_bp = Blueprint('users', __name__)
@@ -21,37 +22,38 @@ users_bp = Blueprint('users', __name__)
 def get_user_profile(user_id, username):
     """Get user profile by username"""
     try:
-        # Check cache (5 min TTL)
-        cache_key = f"user_profile:{username}"
-        cached = CacheService.get(cache_key)
-        if cached:
-            from flask import jsonify
-            return jsonify(cached), 200
-
-        user = User.query.filter_by(username=username).first()
-        if not user:
+        # Cached for 5 minutes; after a profile update the old copy is served while it refreshes
+        response_data = CacheService.get_user_profile(
+            username,
+            lambda: _build_user_profile(username),
+            ttl=300
+        )
+        if response_data is None:
             return error_response('Not found', 'User not found', 404)
 
-        profile = user.to_dict()
-        profile['project_count'] = user.projects.count()
-        profile['karma'] = user.karma
-
-        # Build response data
-        response_data = {
-            'status': 'success',
-            'message': 'User profile retrieved',
-            'data': profile
-        }
-
-        # Cache for 5 minutes
-        CacheService.set(cache_key, response_data, ttl=300)
-
         from flask import jsonify
         return jsonify(response_data), 200
     except Exception as e:
         return error_response('Error', str(e), 500)
 
 
+def _build_user_profile(username):
+    """Build the public profile response (None if the user doesn't exist)"""
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        return None
+
+    profile = user.to_dict()
+    profile['project_count'] = user.projects.count()
+    profile['karma'] = user.karma
+
+    return {
+        'status': 'success',
+        'message': 'User profile retrieved',
+        'data': profile
+    }
+
+
 @users_bp.route('/profile', methods=['PUT'])
 @token_required
 def update_profile(user_id):
@@ -72,7 +74,7 @@ def update_profile(user_id):
         db.session.commit()
 
         # Invalidate user cache
-        CacheService.delete(f"user_profile:{user.username}")
+        CacheService.invalidate_user_profile(user.username)
         CacheService.invalidate_user(user_id)
 
         # Emit Socket.IO event for real-time profile updates
@@ -121,7 +123,7 @@ def get_user_projects(current_user_id, user_id):
         page, per_page = get_pagination_params(request)
 
         # Check cache (5 min TTL)
-        cache_key = f"user_projects:{user_id}:page:{page}"
+        cache_key = CacheService.user_projects_key(user_id, page)
         cached = CacheService.get(cache_key)
         if cached:
             from flask import jsonify
@@ -134,7 +136,7 @@ def get_user_projects(current_user_id, user_id):
         total = query.count()
         projects = query.limit(per_page).offset((page - 1) * per_page).all()
 
-        data = [p.to_dict(include_creator=True) for p in projects]
+        data = Project.bulk_to_dict(projects, include_creator=True)
 
         # Build response data
         total_pages = (total + per_page - 1) // per_page
@@ -165,25 +167,27 @@ def get_projects_leaderboard(user_id):
     """Get top projects leaderboard sorted by upvotes"""
     try:
         limit = request.args.get('limit', 50, type=int)
+        view, fields = get_view_params(request)
+        view = Project.resolve_view(view, fields)
 
         # Check cache (5 min TTL)
-        cache_key = f"leaderboard_projects:{limit}"
+        cache_key = CacheService.leaderboard_key(f"projects:{limit}:{view}")
         cached = CacheService.get(cache_key)
         if cached:
             from flask import jsonify
-            return jsonify(cached), 200
+            return jsonify(dict(cached, data=select_fields(cached['data'], fields, always=('id', 'rank')))), 200
 
         # Get top projects by upvotes (eager load creator to avoid N+1 queries)
         from sqlalchemy.orm import joinedload
-        projects = Project.query.filter_by(is_deleted=False)\
-            .options(joinedload(Project.creator))\
-            .order_by(Project.upvotes.desc())\
+        query = Project.query.filter_by(is_deleted=False).options(joinedload(Project.creator))
+        if view == 'card':
+            query = query.options(*Project.card_options())
+        projects = query.order_by(Project.upvotes.desc())\
             .limit(limit)\
             .all()
 
         data = []
-        for rank, project in enumerate(projects, start=1):
-            project_dict = project.to_dict(include_creator=True)
+        for rank, project_dict in enumerate(Project.bulk_to_dict(projects, include_creator=True, view=view), start=1):
             project_dict['rank'] = rank
             data.append(project_dict)
 
@@ -198,7 +202,7 @@ def get_projects_leaderboard(user_id):
         CacheService.set(cache_key, response_data, ttl=3600)  # 1 hour cache (auto-invalidates on changes)
 
         from flask import jsonify
-        return jsonify(response_data), 200
+        return jsonify(dict(response_data, data=select_fields(data, fields, always=('id', 'rank')))), 200
     except Exception as e:
         return error_response('Error', str(e), 500)
 
@@ -211,7 +215,7 @@ def get_builders_leaderboard(user_id):
         limit = request.args.get('limit', 50, type=int)
 
         # Check cache (5 min TTL)
-        cache_key = f"leaderboard_builders:{limit}"
+        cache_key = CacheService.leaderboard_key(f"builders:{limit}")
         cached = CacheService.get(cache_key)
         if cached:
             from flask import jsonify
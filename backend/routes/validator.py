@@ -11,6 +11,9 @@ from models.validator_permissions import ValidatorPermissions
 from models.validator_assignment import ValidatorAssignment
 from utils.decorators import validator_required, admin_or_validator_required
 from utils.cache import CacheService
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
+from utils.counters import Counters
 from services.socket_service import SocketService
 from utils.scores import ProofScoreCalculator
 
@@ -137,13 +140,17 @@ def validate_assigned_project(user_id, assignment_id):
             db.session.add(badge)
 
             # Update project validation score
-            ProofScoreCalculator.update_project_scores(project)
+            ProofScoreCalculator.update_for_event(project, 'badge', badge_points=badge.points)
 
         db.session.commit()
 
         # Invalidate caches
         CacheService.invalidate_project(assignment.project_id)
         CacheService.invalidate_leaderboard()
+        if project:
+            RankingIndex.update_project(project)
+            Facets.update_project(project)
+            Counters.adjust(Counters.badge_deltas(badge_type, 1))
 
         # Emit real-time update
         SocketService.emit_badge_awarded(assignment.project_id, badge.to_dict(include_validator=True))
@@ -276,7 +283,7 @@ def get_validator_projects(user_id):
         return jsonify({
             'status': 'success',
             'data': {
-                'projects': [project.to_dict(include_creator=True, include_badges=True) for project in projects.items],
+                'projects': Project.bulk_to_dict(projects.items, include_creator=True),  # Includes badges
                 'total': projects.total,
                 'pages': projects.pages,
                 'current_page': page,
@@ -419,12 +426,15 @@ def award_badge(user_id):
                 other.review_notes = f'Validated by another validator ({user_id})'
 
         # Update project scores
-        ProofScoreCalculator.update_project_scores(project)
+        ProofScoreCalculator.update_for_event(project, 'badge', badge_points=badge.points)
 
         db.session.commit()
 
         # Invalidate cache and emit real-time update
         CacheService.invalidate_project(project_id)
+        RankingIndex.update_project(project)
+        Facets.update_project(project)
+        Counters.adjust(Counters.badge_deltas(badge.badge_type, 1))
         SocketService.emit_badge_awarded(project_id, badge.to_dict(include_validator=True))
 
         return jsonify({
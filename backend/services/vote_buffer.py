@@ -0,0 +1,393 @@
+"""
+Vote Buffer - Opt-in write-behind voting (VOTE_WRITE_BEHIND)
+
+Votes are acknowledged from Redis and written to Postgres in batches:
+
+- vwb:pending:{project_id}  hash user_id -> the user's latest vote ('up', 'down', '' for none)
+- vwb:delta:{project_id}    hash up/down -> counter change not yet in the database
+- vwb:dirty                 set of projects with pending votes
+
+Every VOTE_FLUSH_INTERVAL_MS one worker (holding vwb:flush_lock) claims dirty
+projects by moving their pending hashes to vwb:flushing:*, upserts/deletes the
+votes and recounts the projects' counters in one transaction, then drops the
+flushing hashes and bumps vwb:gen:{project_id}. Scores, caches, indexes and
+the socket broadcast are refreshed once per project per flush.
+
+Reads overlay pending deltas and the viewer's pending vote (overlay()), so a
+user sees their own vote immediately. A failed flush leaves the flushing
+hashes in place; the next claim merges newer votes into them and retries,
+which is safe because vote upserts and recounts are idempotent.
+"""
+import os
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+from flask import current_app
+
+_state = {'pid': None, 'thread': None, 'stop': None}
+_state_lock = threading.Lock()
+
+DIRTY_KEY = 'vwb:dirty'
+LOCK_KEY = 'vwb:flush_lock'
+
+
+def _keys(project_id: str) -> dict:
+    return {
+        'pending': f'vwb:pending:{project_id}',
+        'delta': f'vwb:delta:{project_id}',
+        'flushing': f'vwb:flushing:{project_id}',
+        'flushing_delta': f'vwb:flushing_delta:{project_id}',
+        'gen': f'vwb:gen:{project_id}',
+    }
+
+
+# Record a vote. ARGV: user, requested type ('' removes), toggle (1/0), the
+# user's vote in the database, the flush generation it was read at, project id.
+# Returns 'retry' if a flush finished since the database read.
+_RECORD_SCRIPT = """
+if (redis.call('get', KEYS[5]) or '0') ~= ARGV[5] then
+    return {'retry'}
+end
+local previous = redis.call('hget', KEYS[1], ARGV[1]) or redis.call('hget', KEYS[2], ARGV[1]) or ARGV[4]
+local current = ARGV[2]
+if ARGV[3] == '1' and previous == current then
+    current = ''
+end
+if previous ~= current then
+    redis.call('hset', KEYS[1], ARGV[1], current)
+    local up = (current == 'up' and 1 or 0) - (previous == 'up' and 1 or 0)
+    local down = (current == 'down' and 1 or 0) - (previous == 'down' and 1 or 0)
+    if up ~= 0 then redis.call('hincrby', KEYS[3], 'up', up) end
+    if down ~= 0 then redis.call('hincrby', KEYS[3], 'down', down) end
+    redis.call('sadd', KEYS[6], ARGV[6])
+end
+local up = tonumber(redis.call('hget', KEYS[3], 'up') or '0') + tonumber(redis.call('hget', KEYS[4], 'up') or '0')
+local down = tonumber(redis.call('hget', KEYS[3], 'down') or '0') + tonumber(redis.call('hget', KEYS[4], 'down') or '0')
+return {previous, current, up, down}
+"""
+
+# Move a project's pending votes and deltas into its flushing hashes (merging
+# into what a failed flush left behind) and return the votes to write
+_CLAIM_SCRIPT = """
+local function merge(source, target, increment)
+    if redis.call('exists', source) == 0 then
+        return
+    end
+    if redis.call('exists', target) == 0 then
+        redis.call('rename', source, target)
+        return
+    end
+    local entries = redis.call('hgetall', source)
+    for i = 1, #entries, 2 do
+        if increment then
+            redis.call('hincrby', target, entries[i], entries[i + 1])
+        else
+            redis.call('hset', target, entries[i], entries[i + 1])
+        end
+    end
+    redis.call('del', source)
+end
+merge(KEYS[1], KEYS[3], false)
+merge(KEYS[2], KEYS[4], true)
+return redis.call('hgetall', KEYS[3])
+"""
+
+# Flushed votes are in the database: drop them and invalidate in-flight reads of the old state
+_FINALIZE_SCRIPT = """
+redis.call('del', KEYS[1], KEYS[2])
+return redis.call('incr', KEYS[3])
+"""
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class VoteBuffer:
+    """Redis-buffered votes with batched database writes"""
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get('VOTE_WRITE_BEHIND'))
+
+    @staticmethod
+    def record(user_id: str, project, vote_type, toggle: bool = True):
+        """Record a vote in Redis; same result shape as VoteService.apply(), or None to write it directly
+
+        project is the (already loaded) Project; the returned counts are its
+        database counts plus everything still buffered.
+        """
+        from utils.cache import CacheService
+
+        client = CacheService.get_redis_client()
+        if client is None:
+            return None
+        keys = _keys(project.id)
+        try:
+            for _ in range(3):
+                pipe = client.pipeline(transaction=False)
+                pipe.get(keys['gen'])
+                pipe.hexists(keys['pending'], user_id)
+                pipe.hexists(keys['flushing'], user_id)
+                generation, in_pending, in_flushing = pipe.execute()
+
+                stored = '' if in_pending or in_flushing else VoteBuffer._stored_vote(user_id, project.id)
+
+                outcome = client.eval(
+                    _RECORD_SCRIPT, 6,
+                    keys['pending'], keys['flushing'], keys['delta'], keys['flushing_delta'], keys['gen'], DIRTY_KEY,
+                    user_id, vote_type or '', 1 if toggle else 0, stored, _text(generation) or '0', project.id
+                )
+                if _text(outcome[0]) != 'retry':
+                    previous, current, up, down = outcome
+                    return {
+                        'previous': _text(previous) or None,
+                        'current': _text(current) or None,
+                        'upvotes': max(0, (project.upvotes or 0) + int(up)),
+                        'downvotes': max(0, (project.downvotes or 0) + int(down)),
+                        'buffered': True,
+                    }
+        except Exception as e:
+            CacheService._redis_error('vote buffer record', e)
+        return None
+
+    @staticmethod
+    def _stored_vote(user_id: str, project_id: str) -> str:
+        """The user's vote in the database ('' for none)"""
+        from extensions import db
+        from models.vote import Vote
+
+        return db.session.query(Vote.vote_type).filter_by(user_id=user_id, project_id=project_id).scalar() or ''
+
+    @staticmethod
+    def overlay(items: list, user_id: str = None) -> list:
+        """Copy serialized projects with buffered votes applied: counts, ratio and the viewer's vote
+
+        The inputs are left untouched - they may be shared cache entries.
+        """
+        if not items or not VoteBuffer.enabled():
+            return items
+        from utils.cache import CacheService
+
+        client = CacheService.get_redis_client()
+        if client is None:
+            return items
+        try:
+            pipe = client.pipeline(transaction=False)
+            for item in items:
+                keys = _keys(item['id'])
+                pipe.hgetall(keys['delta'])
+                pipe.hgetall(keys['flushing_delta'])
+                if user_id:
+                    pipe.hget(keys['pending'], user_id)
+                    pipe.hget(keys['flushing'], user_id)
+            results = iter(pipe.execute())
+        except Exception as e:
+            CacheService._redis_error('vote buffer overlay', e)
+            return items
+
+        overlaid = []
+        for item in items:
+            item = dict(item)
+            overlaid.append(item)
+            deltas = [next(results), next(results)]
+            pending = [next(results), next(results)] if user_id else [None, None]
+            up = sum(int(d.get(b'up', 0)) for d in deltas)
+            down = sum(int(d.get(b'down', 0)) for d in deltas)
+            if up or down:
+                item['upvotes'] = max(0, (item.get('upvotes') or 0) + up)
+                item['downvotes'] = max(0, (item.get('downvotes') or 0) + down)
+                total = item['upvotes'] + item['downvotes']
+                item['upvote_ratio'] = round(item['upvotes'] / total * 100, 2) if total else 0
+            vote = next((v for v in pending if v is not None), None)
+            if vote is not None:
+                item['user_vote'] = _text(vote) or None
+        return overlaid
+
+    @staticmethod
+    def flush(batch: int = 500) -> int:
+        """Write up to `batch` dirty projects' buffered votes to the database; returns projects flushed"""
+        from utils.cache import CacheService
+
+        client = CacheService.get_redis_client()
+        if client is None:
+            return 0
+        project_ids = [_text(pid) for pid in client.spop(DIRTY_KEY, batch) or []]
+        if not project_ids:
+            return 0
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for project_id in project_ids:
+                keys = _keys(project_id)
+                pipe.eval(_CLAIM_SCRIPT, 4, keys['pending'], keys['delta'], keys['flushing'], keys['flushing_delta'])
+            claimed = pipe.execute()
+
+            votes = {}
+            for project_id, entries in zip(project_ids, claimed):
+                for i in range(0, len(entries), 2):
+                    votes[(_text(entries[i]), project_id)] = _text(entries[i + 1])
+
+            VoteBuffer._write(votes, project_ids)
+        except Exception:
+            client.sadd(DIRTY_KEY, *project_ids)  # Retried next interval
+            raise
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for project_id in project_ids:
+                keys = _keys(project_id)
+                pipe.eval(_FINALIZE_SCRIPT, 3, keys['flushing'], keys['flushing_delta'], keys['gen'])
+            pipe.execute()
+        except Exception as e:
+            # The votes are in the database but their flushing hashes may remain and be
+            # counted twice; re-flushing rewrites the same votes and then drops them
+            CacheService._redis_error('vote buffer finalize', e)
+            try:
+                client.sadd(DIRTY_KEY, *project_ids)
+            except Exception:
+                pass
+
+        VoteBuffer._after_flush(project_ids)
+        return len(project_ids)
+
+    @staticmethod
+    def _write(votes: dict, project_ids: list):
+        """Upsert/delete the final votes, recount the projects' counters (set-based, idempotent) and commit"""
+        from sqlalchemy import case, func, select, tuple_, update
+        from sqlalchemy.dialects.postgresql import insert
+        from extensions import db
+        from models.project import Project
+        from models.vote import Vote
+
+        now = datetime.utcnow()
+        upserts = [
+            {'id': str(uuid4()), 'user_id': user_id, 'project_id': project_id, 'vote_type': vote_type,
+             'created_at': now, 'updated_at': now}
+            for (user_id, project_id), vote_type in votes.items() if vote_type
+        ]
+        removals = [key for key, vote_type in votes.items() if not vote_type]
+
+        counts = select(
+            Project.id.label('id'),
+            func.count(case((Vote.vote_type == 'up', 1))).label('up'),
+            func.count(case((Vote.vote_type == 'down', 1))).label('down'),
+        ).select_from(Project).outerjoin(Vote, Vote.project_id == Project.id).where(
+            Project.id.in_(project_ids)).group_by(Project.id).subquery()
+        try:
+            if upserts:
+                statement = insert(Vote).values(upserts)
+                db.session.execute(statement.on_conflict_do_update(
+                    index_elements=['user_id', 'project_id'],
+                    set_={'vote_type': statement.excluded.vote_type, 'updated_at': statement.excluded.updated_at}
+                ))
+            if removals:
+                db.session.execute(Vote.__table__.delete().where(tuple_(Vote.user_id, Vote.project_id).in_(removals)))
+            db.session.execute(
+                update(Project).where(Project.id == counts.c.id)
+                .values(upvotes=counts.c.up, downvotes=counts.c.down),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def _after_flush(project_ids: list):
+        """Refresh scores, caches, indexes and listeners once per flushed project"""
+        from extensions import db
+        from models.project import Project
+        from services.socket_service import SocketService
+        from utils.cache import CacheService
+        from utils.facets import Facets
+        from utils.ranking_index import RankingIndex
+        from utils.scores import ProofScoreCalculator
+
+        projects = Project.query.filter(Project.id.in_(project_ids)).populate_existing().all()
+        changes = []
+        for project in projects:
+            ranking, old_score = project.feed_sort_values(), project.proof_score
+            ProofScoreCalculator.update_for_event(project, 'vote')
+            # The ranking was taken after the recount, so most-voted is always refreshed
+            sorts = set(Project.changed_feed_sorts(ranking, project.feed_sort_values())) | {'most-voted'}
+            changes.append((project.id, sorted(sorts), old_score, project.proof_score,
+                            project.upvotes - project.downvotes))
+        db.session.commit()
+
+        for project_id, sorts, old_score, new_score, vote_score in changes:
+            CacheService.invalidate_project(project_id, feed_sorts=sorts)
+            Facets.update_score(project_id, old_score, new_score)
+            SocketService.emit_vote_cast(project_id, None, vote_score)
+        CacheService.invalidate_leaderboard()
+        RankingIndex.refresh_projects(project_ids)
+        SocketService.emit_leaderboard_updated()
+
+
+def _claim_flush(client, ttl_ms: int):
+    """Lock token if this worker should flush now, else None"""
+    token = uuid4().hex
+    return token if client.set(LOCK_KEY, token, nx=True, px=ttl_ms) else None
+
+
+def _loop(app, interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        with app.app_context():
+            from utils.cache import CacheService
+            client = CacheService.get_redis_client()
+            token = None
+            try:
+                if client is None:
+                    continue
+                token = _claim_flush(client, int(app.config.get('VOTE_FLUSH_LOCK_TTL', 30) * 1000))
+                if token:
+                    VoteBuffer.flush(app.config.get('VOTE_FLUSH_BATCH', 500))
+            except Exception as e:
+                print(f"Vote flush error: {e}")
+            finally:
+                if token:
+                    try:
+                        client.eval(_RELEASE_LOCK_SCRIPT, 1, LOCK_KEY, token)
+                    except Exception:
+                        pass
+                from extensions import db
+                db.session.remove()
+
+
+def ensure_started(app):
+    """Start this process's flush thread (restarted after a fork, off unless VOTE_WRITE_BEHIND)"""
+    pid = os.getpid()
+    if _state['pid'] == pid:
+        return
+
+    with _state_lock:
+        if _state['pid'] == pid:
+            return
+        _state['pid'] = pid
+        if not app.config.get('VOTE_WRITE_BEHIND'):
+            return
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=_loop,
+            args=(app, app.config.get('VOTE_FLUSH_INTERVAL_MS', 500) / 1000, stop),
+            name='vote-flush',
+            daemon=True
+        )
+        thread.start()
+        _state.update(thread=thread, stop=stop)
+
+
+def init_app(app):
+    """Start the flush thread lazily, in each worker on its first request"""
+
+    @app.before_request
+    def start_vote_flush():
+        ensure_started(app)
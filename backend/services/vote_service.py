@@ -0,0 +1,186 @@
+"""
+Vote Service - Atomic vote writes shared by the project and vote routes
+
+A vote change is a single statement: it locks the user's vote row, upserts or
+deletes it (INSERT ... ON CONFLICT (user_id, project_id) DO UPDATE) and moves
+the project's counters with one relative UPDATE, returning the new counts.
+Nothing is read into Python and written back, so concurrent votes on a hot
+project can't lose updates. The affected scores are then derived from the
+returned counts (no further reads) and written in the same transaction.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from extensions import db
+from models.project import Project
+from models.vote import Vote
+
+# :vote_type NULL removes the vote; with :toggle, voting the current type again removes it too.
+# A row inserted concurrently by the same user (a double submit) is taken to
+# have had the same type, so it isn't counted twice.
+_VOTE_SQL = text("""
+WITH old AS (
+    SELECT vote_type FROM votes
+    WHERE user_id = :user_id AND project_id = :project_id
+    FOR UPDATE
+),
+target AS (
+    SELECT CASE
+        WHEN CAST(:vote_type AS varchar) IS NULL THEN NULL
+        WHEN :toggle AND (SELECT vote_type FROM old) = :vote_type THEN NULL
+        ELSE CAST(:vote_type AS varchar)
+    END AS vote_type
+),
+deleted AS (
+    DELETE FROM votes
+    WHERE user_id = :user_id AND project_id = :project_id AND (SELECT vote_type FROM target) IS NULL
+    RETURNING vote_type
+),
+upserted AS (
+    INSERT INTO votes (id, user_id, project_id, vote_type, created_at, updated_at)
+    SELECT :id, :user_id, :project_id, vote_type, :now, :now FROM target WHERE vote_type IS NOT NULL
+    ON CONFLICT (user_id, project_id) DO UPDATE
+        SET vote_type = EXCLUDED.vote_type, updated_at = EXCLUDED.updated_at
+    RETURNING vote_type, (xmax = 0) AS inserted
+),
+change AS (
+    SELECT
+        COALESCE((SELECT vote_type FROM deleted), (SELECT vote_type FROM old),
+                 (SELECT vote_type FROM upserted WHERE NOT inserted)) AS previous,
+        (SELECT vote_type FROM upserted) AS current
+),
+counted AS (
+    UPDATE projects SET
+        upvotes = GREATEST(upvotes
+            + CAST(change.current IS NOT DISTINCT FROM 'up' AS int)
+            - CAST(change.previous IS NOT DISTINCT FROM 'up' AS int), 0),
+        downvotes = GREATEST(downvotes
+            + CAST(change.current IS NOT DISTINCT FROM 'down' AS int)
+            - CAST(change.previous IS NOT DISTINCT FROM 'down' AS int), 0)
+    FROM change
+    WHERE projects.id = :project_id
+    RETURNING projects.upvotes, projects.downvotes
+)
+SELECT change.previous, change.current, counted.upvotes, counted.downvotes
+FROM change, counted
+""")
+
+
+class VoteService:
+    """Record votes atomically and refresh everything that depends on them"""
+
+    @staticmethod
+    def apply(user_id: str, project_id: str, vote_type, toggle: bool = True) -> dict:
+        """Set a user's vote on a project in one statement, without committing
+
+        vote_type is 'up', 'down' or None to remove the vote. With toggle,
+        voting the type the user already has removes the vote.
+
+        Returns {'previous', 'current', 'upvotes', 'downvotes'} (vote types are None
+        for no vote), or None if the project doesn't exist.
+        """
+        if db.engine.dialect.name != 'postgresql':
+            return VoteService._apply_orm(user_id, project_id, vote_type, toggle)
+        now = datetime.utcnow()
+        row = db.session.execute(_VOTE_SQL, {
+            'id': str(uuid4()), 'user_id': user_id, 'project_id': project_id,
+            'vote_type': vote_type, 'toggle': toggle, 'now': now,
+        }).first()
+        return dict(row._mapping) if row else None
+
+    @staticmethod
+    def _apply_orm(user_id, project_id, vote_type, toggle):
+        """Same as apply() for databases without data-modifying CTEs (row locks where supported)"""
+        project = Project.query.filter_by(id=project_id).with_for_update().first()
+        if not project:
+            return None
+        vote = Vote.query.filter_by(user_id=user_id, project_id=project_id).with_for_update().first()
+        previous = vote.vote_type if vote else None
+        current = None if vote_type is None or (toggle and previous == vote_type) else vote_type
+
+        if current is None and vote:
+            db.session.delete(vote)
+        elif current and vote:
+            vote.vote_type = current
+        elif current:
+            db.session.add(Vote(user_id=user_id, project_id=project_id, vote_type=current))
+
+        project.upvotes = max(0, (project.upvotes or 0) + (current == 'up') - (previous == 'up'))
+        project.downvotes = max(0, (project.downvotes or 0) + (current == 'down') - (previous == 'down'))
+        db.session.flush()
+        return {'previous': previous, 'current': current,
+                'upvotes': project.upvotes, 'downvotes': project.downvotes}
+
+    @staticmethod
+    def vote(user_id: str, project_id: str, vote_type, toggle: bool = True):
+        """Record a vote, commit, then recompute scores and refresh caches and indexes
+
+        Returns (apply() result, refreshed project), or (None, None) if the
+        project doesn't exist. With VOTE_WRITE_BEHIND the vote is buffered in
+        Redis instead (result['buffered']) and the project keeps its database
+        counts; everything else is refreshed when the buffer is flushed.
+        """
+        from sqlalchemy.orm.attributes import set_committed_value
+        from utils.scores import ProofScoreCalculator
+        from utils.cache import CacheService
+        from utils.ranking_index import RankingIndex
+        from utils.facets import Facets
+        from services.vote_buffer import VoteBuffer
+
+        if VoteBuffer.enabled():
+            project = db.session.get(Project, project_id)
+            if project is None:
+                return None, None
+            result = VoteBuffer.record(user_id, project, vote_type, toggle)
+            if result is not None:
+                return result, project
+            # Redis unavailable: write through
+
+        try:
+            result = VoteService.apply(user_id, project_id, vote_type, toggle)
+            if result is None:
+                db.session.rollback()
+                return None, None
+
+            # Usually already loaded by the route; the statement moved its counters in the database
+            project = db.session.get(Project, project_id)
+            set_committed_value(project, 'upvotes', result['upvotes'])
+            set_committed_value(project, 'downvotes', result['downvotes'])
+            if result['previous'] == result['current']:
+                db.session.commit()
+                return result, project
+
+            ranking = project.feed_sort_values()
+            # Counters already moved; rank the "before" state on the old vote total
+            ranking['most-voted'] = result['upvotes'] + result['downvotes'] \
+                - (result['current'] is not None) + (result['previous'] is not None)
+            old_score = project.proof_score
+
+            ProofScoreCalculator.update_for_event(project, 'vote')
+            feed_sorts = Project.changed_feed_sorts(ranking, project.feed_sort_values())
+            new_score = project.proof_score
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        CacheService.invalidate_project(project_id, feed_sorts=feed_sorts)
+        CacheService.invalidate_leaderboard()  # Votes affect the leaderboard
+        RankingIndex.update_project(project)
+        Facets.update_score(project_id, old_score, new_score)
+        return result, project
+
+    @staticmethod
+    def broadcast(project_id: str, result: dict):
+        """Emit the real-time events for a vote (buffered votes are broadcast when flushed)"""
+        from services.socket_service import SocketService
+
+        if result.get('buffered') or result['previous'] == result['current']:
+            return
+        if result['current'] is None:
+            SocketService.emit_vote_removed(project_id)
+        else:
+            SocketService.emit_vote_cast(project_id, result['current'], result['upvotes'] - result['downvotes'])
+        SocketService.emit_leaderboard_updated()
@@ -0,0 +1,199 @@
+"""
+Tests for cache utilities
+"""
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from utils.local_cache import LocalCache, InvalidationBus
+from utils.cache_codec import CacheCodec
+from utils.redis_client import CircuitBreaker
+from utils.cache_batch import InvalidationBatch
+from utils.cache_metrics import CacheMetrics, key_family, summarize, to_prometheus
+from utils.ranking_index import RankingIndex
+from utils.facets import Facets
+
+
+def test_local_cache_lru_eviction():
+    """Test least recently used keys are evicted first"""
+    cache = LocalCache(max_entries=2, default_ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_local_cache_ttl_capped():
+    """Test per-key TTL never exceeds the L1 default"""
+    cache = LocalCache(max_entries=10, default_ttl=0.05)
+    cache.set('feed:trending:page:1', {'data': []}, ttl=3600)
+
+    assert cache.get('feed:trending:page:1') == {'data': []}
+    time.sleep(0.06)
+    assert cache.get('feed:trending:page:1') is None
+
+
+def test_local_cache_drops_fill_after_invalidation():
+    """Test a value fetched before an invalidation is not stored"""
+    cache = LocalCache()
+    generation = cache.generation
+    cache.delete_pattern('feed:*')
+    cache.set('feed:newest:page:1', {'stale': True}, generation=generation)
+
+    assert cache.get('feed:newest:page:1') is None
+
+
+def test_invalidation_bus_applies_remote_messages():
+    """Test invalidations from other workers clear matching keys"""
+    cache = LocalCache()
+    bus = InvalidationBus(cache, 'cache:invalidate')
+    cache.set('project:1', {'id': 1})
+    cache.set('feed:trending:page:1', {'data': []})
+    cache.set('leaderboard:month:10', {'data': []})
+
+    bus.apply(json.dumps({'origin': 'other-worker', 'keys': ['project:1'], 'patterns': ['feed:*']}))
+
+    assert cache.get('project:1') is None
+    assert cache.get('feed:trending:page:1') is None
+    assert cache.get('leaderboard:month:10') == {'data': []}
+
+
+def test_codec_compresses_large_values():
+    """Test payloads above the threshold are compressed and round-trip"""
+    codec = CacheCodec(compression='zlib', min_compress_bytes=64)
+    value = {'data': [{'id': str(i), 'description': 'x' * 200} for i in range(20)]}
+    raw = codec.encode('feed:swr:trending:page:1:20', value)
+
+    assert raw[3:4] == b'z'
+    assert len(raw) < len(json.dumps(value))
+    assert codec.decode(raw) == value
+    assert codec.encode('count:v1:projects:all', 42)[3:4] == b'-'
+
+
+def test_codec_reads_legacy_values():
+    """Test values written before the codec (plain JSON / text) still decode"""
+    codec = CacheCodec()
+
+    assert codec.decode(json.dumps({'id': 1}).encode()) == {'id': 1}
+    assert codec.decode('{"id": 1}') == {'id': 1}
+    assert codec.decode(b'plain text') == 'plain text'
+
+
+def test_codec_family_overrides():
+    """Test the longest matching key prefix picks the codec"""
+    codec = CacheCodec(compression='zlib', families={'fragment:': 'json+none', 'fragment:user:': 'json+zlib'})
+
+    assert codec.codec_for('fragment:project:1') == ('json', 'none')
+    assert codec.codec_for('fragment:user:1') == ('json', 'zlib')
+    assert codec.codec_for('project:1') == ('json', 'zlib')
+
+
+def test_circuit_breaker_trips_and_recovers():
+    """Test the breaker opens after repeated failures and closes after a good probe"""
+    breaker = CircuitBreaker(threshold=3, window=30, cooldown=0.05)
+    for _ in range(3):
+        assert breaker.before_call() == 'call'
+        breaker.record_failure(ConnectionError('refused'))
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.before_call() == 'skip'
+
+    time.sleep(0.06)
+    assert breaker.before_call() == 'probe'
+    assert breaker.before_call() == 'skip'  # Only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['trips'] == 1
+
+
+def test_circuit_breaker_failed_probe_reopens():
+    """Test a failed half-open probe starts another cooldown"""
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.before_call() == 'probe'
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['trips'] == 2
+
+
+def test_invalidation_batch_dedupes_and_drops_rolled_back():
+    """Test only committed invalidations are flushed, once each"""
+    batch = InvalidationBatch()
+    batch.record(False, keys=['project:1'], namespaces=['feed:newest'])
+    batch.record(False, keys=['project:1'], namespaces=['leaderboard'])
+    batch.record(True, keys=['project:2'])
+    batch.rollback()
+    batch.record(True, keys=['project:3'])
+    batch.commit()
+
+    drained = batch.drain()
+    assert drained['keys'] == ['project:1', 'project:3']
+    assert drained['namespaces'] == ['feed:newest', 'leaderboard']
+    assert batch.drain()['keys'] == []
+
+
+def test_metrics_report_per_family():
+    """Test counters roll up by key family with hit ratio and Prometheus output"""
+    metrics = CacheMetrics()
+    metrics.count('feed:swr:trending:page:1:20', 'hit')
+    metrics.count('feed:swr:newest:page:2:20', 'miss')
+    metrics.count('fragment:project:5f0c7a36-1c5e-4d36-9a53-3a8f0f5d2b11', 'l1_hit')
+    metrics.observe('feed:swr:trending:page:1:20', 'get', 0.002, size=3000)
+
+    report = summarize(metrics.snapshot())
+    assert key_family('leaderboard:v17:projects:10') == 'leaderboard'
+    assert report['feed']['hit_ratio'] == 0.5
+    assert report['fragment:project']['counters']['l1_hit'] == 1
+    assert report['feed']['size']['get']['count'] == 1
+
+    text = to_prometheus(report)
+    assert 'cache_requests_total{family="feed",result="hit"} 1' in text
+    assert 'cache_operation_seconds_bucket{family="feed",op="get",le="+Inf"} 1' in text
+
+
+def test_ranking_entries_cover_every_scope():
+    """Test a project is ranked overall, in its hackathon and categories, with creation-time tiebreaks"""
+    project = SimpleNamespace(
+        id='p1', created_at=datetime(2025, 1, 1), trending_score=12.5, proof_score=40,
+        upvotes=3, downvotes=1, hackathon_name='ETHGlobal', categories=['AI/ML'], is_deleted=False
+    )
+    older = SimpleNamespace(**dict(vars(project), id='p2', created_at=datetime(2024, 6, 1)))
+
+    entries = RankingIndex.entries(project)
+    assert len(entries) == 3 * len(RankingIndex.SORTS)
+    assert entries['rank:trending:hackathon:ETHGlobal'] == 12.5
+    assert 'rank:newest:category:AI/ML' in entries
+    assert entries['rank:top-rated'] > RankingIndex.entries(older)['rank:top-rated']
+    assert RankingIndex.entries(older)['rank:top-rated'] > RankingIndex.scores(SimpleNamespace(
+        **dict(vars(project), proof_score=39)))['top-rated']
+
+    project.is_deleted = True
+    assert RankingIndex.entries(project) == {}
+
+
+def test_facet_fields_and_format():
+    """Test a project's facet fields and the facet response shape"""
+    project = SimpleNamespace(
+        id='p1', tech_stack=['React', 'React', 'Solidity'], hackathon_name='ETHGlobal', categories=['AI/ML'],
+        proof_score=95, demo_url='https://demo', github_url='', is_featured=False, is_deleted=False
+    )
+    fields = Facets.fields(project, ['gold'])
+    assert sorted(fields) == sorted(['total', 'score:80', 'tech:React', 'tech:Solidity', 'hackathon:ETHGlobal',
+                                     'category:AI/ML', 'badge:gold', 'has_demo'])
+
+    facets = Facets.format({'total': 3, 'tech:React': 2, 'tech:Vue': 3, 'tech:Go': 0, 'score:20': 1,
+                            'score:0': 2, 'has_demo': 1})
+    assert facets['total'] == 3 and facets['has_demo'] == 1 and facets['featured'] == 0
+    assert [t['value'] for t in facets['tech']] == ['Vue', 'React']
+    assert facets['score'] == [{'value': 0, 'count': 2, 'label': '0-19'}, {'value': 20, 'count': 1, 'label': '20-39'}]
+
+    project.is_deleted = True
+    assert Facets.fields(project, ['gold']) == []
@@ -0,0 +1,55 @@
+"""
+Tests for the precomputed facet counts kept current after votes and comments
+"""
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+import models.event  # noqa: F401 - register every model the mappers refer to
+import models.saved_project  # noqa: F401
+from models.project import Project
+from utils.cache import CacheService
+from utils.facets import FACETS_KEY, MEMBER_PREFIX, Facets, score_bucket
+from utils.scores import ProofScoreCalculator
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(CacheService, 'get_redis_client', staticmethod(lambda: client))
+    return client
+
+
+def test_score_bucket_is_an_int():
+    """Test a float score (as computed before commit) gets the same bucket field as the stored integer"""
+    assert score_bucket(35.0) == 20 and isinstance(score_bucket(35.0), int)
+    assert score_bucket(39.5) == 40  # Stored as 40
+    assert score_bucket(None) == 0
+    assert score_bucket(97) == 80
+
+
+def test_vote_moves_score_bucket_and_facets_still_format(redis):
+    """Test a vote that moves the proof score into the next bucket updates the hash, which still formats"""
+    project = Project(id='p1', verification_score=15, validation_score=15, quality_score=0, community_score=0,
+                      proof_score=30, upvotes=2, downvotes=1, comment_count=1, created_at=datetime(2025, 6, 1))
+    redis.hset(FACETS_KEY, mapping={'total': 2, 'score:20': 2})
+    redis.sadd(MEMBER_PREFIX + 'p1', 'total', 'score:20')
+
+    old_score = project.proof_score
+    ProofScoreCalculator.update_for_event(project, 'vote')  # Community 2 / 3 * 20 + 0.5 rounds to 14
+    assert Facets.update_score(project.id, old_score, project.proof_score)
+
+    assert redis.hgetall(FACETS_KEY) == {b'total': b'2', b'score:20': b'1', b'score:40': b'1'}
+    assert redis.smembers(MEMBER_PREFIX + 'p1') == {b'total', b'score:40'}
+    assert Facets.get_all()['score'] == [
+        {'value': 20, 'count': 1, 'label': '20-39'},
+        {'value': 40, 'count': 1, 'label': '40-59'},
+    ]
+
+
+def test_format_merges_float_score_fields():
+    """Test 'score:20.0' fields left by older writes count towards bucket 20 instead of failing"""
+    facets = Facets.format({'total': 3, 'score:20': 2, 'score:20.0': 1})
+    assert facets['score'] == [{'value': 20, 'count': 3, 'label': '20-39'}]
@@ -0,0 +1,31 @@
+"""
+Tests for rendering feed cards from a (possibly stale) page of project IDs
+"""
+from extensions import db
+from models.project import Project
+from models.user import User
+from routes.projects import _render_project_cards
+from utils.cache import CacheService
+
+
+def test_cached_id_page_leaves_out_soft_deleted_projects(app):
+    """Test a cached ID page rendered after a soft delete doesn't bring the deleted project back"""
+    user = User(email='cards@example.com', username='cards')
+    user.set_password('TestPassword123')
+    db.session.add(user)
+    db.session.flush()
+    kept = Project(user_id=user.id, title='Kept', description='Still live')
+    deleted = Project(user_id=user.id, title='Deleted', description='Soft-deleted later')
+    db.session.add_all([kept, deleted])
+    db.session.commit()
+    page = [kept.id, deleted.id]  # The ID page as cached before the delete
+
+    assert [card['id'] for card in _render_project_cards(page)] == page
+
+    deleted.is_deleted = True
+    db.session.commit()
+    CacheService.invalidate_project(deleted.id)
+
+    cards = _render_project_cards(page)
+    assert [card['id'] for card in cards] == [kept.id]
+    assert cards[0]['creator']['id'] == user.id
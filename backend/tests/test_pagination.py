@@ -0,0 +1,101 @@
+"""
+Tests for pagination helpers: opaque cursors, feed cursors and count modes
+"""
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from extensions import db
+import models.event  # noqa: F401 - register every model the mappers refer to
+import models.saved_project  # noqa: F401
+from models.vote import Vote
+from routes.projects import _decode_feed_cursor, _encode_feed_cursor
+from utils.counters import count_query
+from utils.helpers import decode_cursor, encode_cursor, pagination_meta
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes to the payload it was made from and is URL-safe"""
+    payload = {'type': 'projects', 'after': [0.4172, 'a1b2c3d4-0000-4000-8000-000000000000'], 'note': 'ü/+?'}
+    cursor = encode_cursor(payload)
+
+    assert decode_cursor(cursor) == payload
+    assert not set(cursor) - set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor!',
+    encode_cursor({'sort': 'trending'})[:-3] + '@@@',  # Truncated / edited bytes
+    encode_cursor([1, 2, 3]),  # Valid JSON, not a payload
+])
+def test_malformed_cursor_rejected(cursor):
+    """Test cursors that aren't base64 JSON objects raise ValueError"""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_feed_cursor_round_trip():
+    """Test a feed cursor restores the sort key values, created_at as a datetime"""
+    row = (12.5, datetime(2025, 3, 1, 12, 30, 15, 250000), 'p1')
+    cursor = _encode_feed_cursor('trending', row)
+
+    assert _decode_feed_cursor(cursor, 'trending') == list(row)
+    assert _decode_feed_cursor(None, 'trending') is None
+    assert _decode_feed_cursor('', 'trending') is None
+
+
+def test_feed_cursor_rejects_other_sort_wrong_length_and_tampering():
+    """Test a feed cursor only works for its own sort, with the right keys and a real timestamp"""
+    created = datetime(2025, 3, 1).isoformat()
+    cursor = _encode_feed_cursor('trending', (12.5, datetime(2025, 3, 1), 'p1'))
+
+    invalid = [
+        (cursor, 'top-rated'),  # Same length, different sort
+        (cursor, 'newest'),  # Different sort and length
+        (encode_cursor({'sort': 'trending', 'after': [created, 'p1']}), 'trending'),  # Too short
+        (encode_cursor({'sort': 'trending', 'after': [1, 2, created, 'p1']}), 'trending'),  # Too long
+        (encode_cursor({'sort': 'trending', 'after': [12.5, 'yesterday', 'p1']}), 'trending'),  # Edited timestamp
+        (encode_cursor({'sort': 'trending', 'after': 'p1'}), 'trending'),
+        (encode_cursor({'after': [12.5, created, 'p1']}), 'trending'),
+    ]
+    for bad, sort in invalid:
+        with pytest.raises(ValueError):
+            _decode_feed_cursor(bad, sort)
+
+
+@pytest.fixture
+def votes():
+    """Five votes in an in-memory database (only the votes table is created)"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        Vote.__table__.create(db.engine)
+        db.session.add_all([Vote(user_id=f'u{i}', project_id='p1', vote_type='up') for i in range(5)])
+        db.session.commit()
+        yield Vote.query.filter_by(project_id='p1').order_by(Vote.created_at)
+        db.session.remove()
+
+
+def test_count_query_modes(votes):
+    """Test capped counts are exact up to the cap and report the cap beyond it"""
+    assert count_query(votes) == (5, 'exact')
+    assert count_query(votes, 'capped', cap=5) == (5, 'exact')  # Exactly cap rows
+    assert count_query(votes, 'capped', cap=4) == (4, 'capped')  # cap + 1 rows
+    assert count_query(votes, 'capped', cap=10) == (5, 'exact')
+    # No planner estimate on SQLite: falls back to a capped count
+    assert count_query(votes, 'estimated', cap=4) == (4, 'capped')
+
+
+def test_pagination_meta_per_count_mode():
+    """Test only inexact totals carry total_exact/total_display"""
+    assert pagination_meta(45, 2, 20) == {'total': 45, 'page': 2, 'per_page': 20, 'total_pages': 3}
+    assert pagination_meta(1000, 1, 20, 'capped') == {
+        'total': 1000, 'page': 1, 'per_page': 20, 'total_pages': 50,
+        'total_exact': False, 'total_display': '1000+',
+    }
+    assert pagination_meta(52340, 1, 20, 'estimated') == {
+        'total': 52340, 'page': 1, 'per_page': 20, 'total_pages': 2617,
+        'total_exact': False, 'total_display': '~52340',
+    }
@@ -0,0 +1,49 @@
+"""
+Tests for project serialization: bulk_to_dict must match to_dict
+"""
+from datetime import datetime
+
+from extensions import db
+from models.badge import ValidationBadge
+from models.project import Project, ProjectScreenshot
+from models.user import User
+from models.vote import Vote
+
+
+def _user(username):
+    user = User(email=f'{username}@example.com', username=username)
+    user.set_password('TestPassword123')
+    db.session.add(user)
+    return user
+
+
+def test_bulk_to_dict_matches_to_dict(app):
+    """Test bulk serialization gives the same dict as to_dict for a project with badges, screenshots and a vote"""
+    creator, validator, viewer = _user('creator'), _user('validator'), _user('viewer')
+    db.session.flush()
+
+    project = Project(user_id=creator.id, title='Serialized', description='A project',
+                      tech_stack=['python'], categories=['AI/ML'], upvotes=1)
+    db.session.add(project)
+    db.session.flush()
+
+    db.session.add_all([
+        ProjectScreenshot(project_id=project.id, url='https://example.com/2.png', order_index=1),
+        ProjectScreenshot(project_id=project.id, url='https://example.com/1.png', order_index=0),
+        ValidationBadge(project_id=project.id, validator_id=validator.id, badge_type='silver',
+                        rationale='Solid', points=10, created_at=datetime(2025, 1, 1)),
+        ValidationBadge(project_id=project.id, validator_id=validator.id, badge_type='demerit',
+                        rationale='Broken demo', points=-10, created_at=datetime(2025, 1, 2)),
+        Vote(user_id=viewer.id, project_id=project.id, vote_type='up'),
+    ])
+    db.session.commit()
+
+    for view in ('full', 'card'):
+        expected = project.to_dict(include_creator=True, user_id=viewer.id, view=view)
+        assert Project.bulk_to_dict([project], include_creator=True, user_id=viewer.id, view=view)[0] == expected
+
+    data = Project.bulk_to_dict([project], include_creator=True, user_id=viewer.id)[0]
+    assert [ss['order_index'] for ss in data['screenshots']] == [0, 1]
+    assert [b['badge_type'] for b in data['badges']] == ['silver', 'demerit']
+    assert data['user_vote'] == 'up'
+    assert data['creator']['id'] == creator.id
@@ -0,0 +1,46 @@
+"""
+Tests for the vectorized what-if scoring pipeline
+"""
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from utils.score_whatif import ScoreInputs, compare, score, verify
+
+
+def _inputs(n=500):
+    rng = np.random.default_rng(7)
+    created = np.datetime64(datetime(2024, 1, 1), 'us') + rng.integers(0, 10 ** 6 * 86400 * 400, n).astype('timedelta64[us]')
+    gold = rng.integers(0, 3, n)
+    demerit = rng.integers(0, 2, n)
+    return ScoreInputs(
+        [f'p{i:04d}' for i in range(n)], created,
+        rng.integers(0, 200, n), rng.integers(0, 50, n), rng.integers(0, 30, n),
+        rng.random(n) < .5, rng.random(n) < .5, rng.random(n) < .5, rng.random(n) < .5,
+        rng.random(n) < .5, rng.random(n) < .5, rng.random(n) < .5,
+        badge_types=['demerit', 'gold'],
+        badge_points=np.stack([demerit * -10, gold * 15], axis=1),
+        badge_counts=np.stack([demerit, gold], axis=1),
+    )
+
+
+def test_default_weights_match_scalar_calculator():
+    """Test vectorized scores are identical to ProofScoreCalculator for every project"""
+    assert verify(_inputs()) == []
+
+
+def test_compare_reports_rank_changes():
+    """Test unchanged weights move nothing and a new badge weight reorders top-rated"""
+    inputs = _inputs()
+    baseline = score(inputs)
+
+    same = compare(inputs, baseline, score(inputs))
+    assert same['top-rated']['rank_changed'] == 0
+    assert same['trending']['spearman'] == 1.0
+
+    changed = compare(inputs, baseline, score(inputs, {'BADGE_POINTS': {'gold': 5}}), top=(10,))
+    assert changed['top-rated']['score_changed'] > 0
+    assert changed['top-rated']['rank_changed'] > 0
+    assert changed['top-rated']['top_10_overlap'] + changed['top-rated']['top_10_entered'] == 10
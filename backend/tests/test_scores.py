@@ -0,0 +1,125 @@
+"""
+Tests for incremental proof score updates
+"""
+from datetime import datetime
+
+from extensions import db
+from models.project import Project
+from models.user import User
+from utils import scores
+from utils.scores import ProofScoreCalculator
+
+
+class _Project:
+    """Plain project stand-in; creator, badges and screenshots fail if touched"""
+
+    def __init__(self, **values):
+        self.id = 'p1'
+        self.created_at = datetime(2025, 6, 1)
+        self.verification_score = 15
+        self.validation_score = 25
+        self.quality_score = 10
+        self.community_score = 0
+        self.proof_score = 50
+        self.trending_score = 0.0
+        self.upvotes = 0
+        self.downvotes = 0
+        self.comment_count = 0
+        self.__dict__.update(values)
+
+    @property
+    def creator(self):
+        raise AssertionError('creator loaded')
+
+    @property
+    def badges(self):
+        raise AssertionError('badges loaded')
+
+    @property
+    def screenshots(self):
+        raise AssertionError('screenshots loaded')
+
+    def calculate_proof_score(self):
+        self.proof_score = self.verification_score + self.community_score + self.validation_score + self.quality_score
+        return self.proof_score
+
+
+def test_vote_event_scores_from_counters_only():
+    """Test a vote recomputes community, proof and trending scores without loading relations"""
+    project = _Project(upvotes=8, downvotes=2, comment_count=6)
+    ProofScoreCalculator.update_for_event(project, 'vote')
+
+    assert project.community_score == 19  # 8 / 10 * 20 + 3
+    assert project.proof_score == 15 + project.community_score + 25 + 10
+    assert project.trending_score == ProofScoreCalculator.calculate_trending_score(project)
+
+
+def test_fractional_community_score_is_stored_rounded():
+    """Test proof and trending scores are computed from the rounded community score that gets stored"""
+    project = _Project(upvotes=2, downvotes=1, comment_count=1)  # 2 / 3 * 20 + 0.5 = 13.83
+    ProofScoreCalculator.update_for_event(project, 'vote')
+
+    assert project.community_score == 14 and isinstance(project.community_score, int)
+    assert project.proof_score == 15 + 14 + 25 + 10
+    reloaded = _Project(upvotes=2, downvotes=1, comment_count=1, proof_score=project.proof_score)
+    assert project.trending_score == ProofScoreCalculator.calculate_trending_score(reloaded)
+
+    assert ProofScoreCalculator.stored_score(12.5) == 13
+    assert ProofScoreCalculator.stored_score(13.49) == 13
+
+
+def test_badge_event_adds_points_up_to_the_cap():
+    """Test awarding a badge adds its points to the validation score, capped at 30"""
+    project = _Project(validation_score=10)
+    ProofScoreCalculator.update_for_event(project, 'badge', badge_points=15)
+    assert project.validation_score == 25
+
+    ProofScoreCalculator.update_for_event(project, 'badge', badge_points=20)
+    assert project.validation_score == 30
+    assert project.proof_score == 15 + 30 + 10
+
+
+def test_demerit_on_capped_score_resums_points(monkeypatch):
+    """Test a demerit on a capped validation score re-sums the badges instead of subtracting from 30"""
+    summed = []
+
+    class _Session:
+        def query(self, *args):
+            return self
+
+        def filter(self, *args):
+            return self
+
+        def scalar(self):
+            summed.append(True)
+            return 50 - 10  # Badges worth 50, plus the new demerit
+
+    monkeypatch.setattr(scores.db, 'session', _Session())
+
+    project = _Project(validation_score=30)
+    ProofScoreCalculator.update_for_event(project, 'badge', badge_points=-10)
+    assert project.validation_score == 30
+    assert summed
+
+    project = _Project(validation_score=25)
+    ProofScoreCalculator.update_for_event(project, 'badge', badge_points=-10)
+    assert project.validation_score == 15
+    assert len(summed) == 1
+
+
+def test_bulk_recomputes_are_noops_after_event_updates(app):
+    """Test the trending job and the full recompute find nothing to change after an event update"""
+    user = User(email='scores@example.com', username='scores')
+    user.set_password('TestPassword123')
+    db.session.add(user)
+    db.session.flush()
+    project = Project(user_id=user.id, title='Scored', description='A project', upvotes=2, downvotes=1,
+                      comment_count=1)
+    db.session.add(project)
+    db.session.commit()
+
+    ProofScoreCalculator.update_for_event(project, 'vote')
+    db.session.commit()
+
+    assert ProofScoreCalculator.recompute_trending_scores() == []
+    assert ProofScoreCalculator.recompute_scores('', project.id, dry_run=True) == []
@@ -0,0 +1,156 @@
+"""
+Tests for the in-process BM25 search index
+"""
+import json
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+import models.event  # noqa: F401 - register every model the mappers refer to
+import models.saved_project  # noqa: F401
+from extensions import db
+from utils import search_index
+from utils.search_index import InvertedIndex, SearchIndex, highlight, tokenize
+
+
+def _index():
+    index = InvertedIndex()
+    index.add('p1', [('Solana wallet tracker', 3), ('Track every wallet on chain', 1)])
+    index.add('p2', [('NFT marketplace', 3), ('A marketplace for Solana NFTs with wallet login', 1)])
+    index.add('p3', [('Weather bot', 3), ('Telegram bot for forecasts', 1)])
+    return index
+
+
+def test_bm25_ranks_weighted_matches_and_prefixes():
+    """Test every word must match, title hits rank first and the last word matches as a prefix"""
+    index = _index()
+
+    scores = index.score(tokenize('solana wallet'))
+    assert set(scores) == {'p1', 'p2'}
+    assert scores['p1'] > scores['p2']
+
+    assert set(index.score(tokenize('market'))) == {'p2'}
+    assert index.score(tokenize('weather solana')) == {}
+    assert index.score(tokenize('the')) == {}
+
+
+def test_index_updates_and_snapshot_round_trip():
+    """Test re-adding and removing documents, and that a snapshot restores identical scores"""
+    index = _index()
+    index.add('p3', [('Solana weather oracle', 3)])
+    index.remove('p2')
+
+    assert set(index.score(tokenize('solana'))) == {'p1', 'p3'}
+    assert 'marketplace' not in index.postings
+
+    restored = InvertedIndex.from_snapshot(json.loads(json.dumps(index.to_snapshot())))
+    assert restored.score(tokenize('solana')) == index.score(tokenize('solana'))
+    assert len(restored) == 2
+
+    restored.remove('p1')
+    assert set(restored.score(tokenize('sol'))) == {'p3'}
+
+
+def test_highlight_escapes_and_marks_matches():
+    """Test highlights escape HTML and mark exact and prefix matches"""
+    assert highlight('<b>Solana</b> wallets', ['solana', 'wall']) == \
+        '&lt;b&gt;<mark>Solana</mark>&lt;/b&gt; <mark>wallets</mark>'
+
+
+def _row(pid, title, is_deleted=False):
+    return SimpleNamespace(id=pid, title=title, tagline=None, description='', tech_stack=[], categories=[],
+                           is_deleted=is_deleted)
+
+
+class _Session:
+    """Answers the catch-up queries in order, checking the index lock is free while it does"""
+
+    def __init__(self, changed, live, missing):
+        self.results = {'changed': changed, 'live': [(pid,) for pid in live], 'missing': missing}
+        self.asked = []
+
+    def query(self, *columns):
+        if len(columns) == 1:
+            self.asked.append('live')
+        else:
+            self.asked.append('missing' if 'changed' in self.asked else 'changed')
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        locked = []
+
+        def try_lock():
+            locked.append(search_index._state_lock.acquire(timeout=1))
+            if locked[0]:
+                search_index._state_lock.release()
+
+        other = threading.Thread(target=try_lock)
+        other.start()
+        other.join()
+        assert locked == [True], 'index lock held during a query'
+        return list(self.results[self.asked[-1]])
+
+    def __iter__(self):
+        return iter(self.all())
+
+
+@pytest.fixture
+def state(monkeypatch):
+    app = Flask(__name__)
+    app.config['SEARCH_INDEX_SNAPSHOT'] = None
+    index = InvertedIndex()
+    index.add('p1', [('Solana wallet', 3)])
+    index.add('p2', [('Weather bot', 3)])
+    index.add('p5', [('Hard deleted elsewhere', 3)])
+    monkeypatch.setattr(search_index, '_state', dict(
+        search_index._state, index=index, synced_at=datetime(2025, 1, 1), syncing=False))
+    with app.app_context():
+        yield index
+
+
+def test_catch_up_applies_changes_without_holding_the_lock(state, monkeypatch):
+    """Test changed rows are applied, and reconciling drops hard deletes and adds missed projects"""
+    session = _Session(changed=[_row('p2', 'Weather bot', is_deleted=True), _row('p3', 'NFT market')],
+                       live=['p1', 'p3', 'p4'], missing=[_row('p4', 'Solana oracle')])
+    monkeypatch.setattr(db, 'session', session)
+
+    SearchIndex._catch_up()
+    assert set(state.slots) == {'p1', 'p3', 'p5'}
+    assert session.asked == ['changed']
+
+    session.asked.clear()
+    SearchIndex._catch_up(reconcile=True)
+    assert set(state.slots) == {'p1', 'p3', 'p4'}
+    assert session.asked == ['changed', 'live', 'missing']
+    assert search_index._state['synced_at'] > datetime(2025, 1, 1)
+
+
+def test_get_catches_up_in_the_background(state, monkeypatch):
+    """Test a due catch-up doesn't block the search that triggered it, and only one runs at a time"""
+    started, release, reconciles = threading.Event(), threading.Event(), []
+
+    def slow_catch_up(reconcile=False):
+        reconciles.append(reconcile)
+        started.set()
+        assert release.wait(5)
+
+    monkeypatch.setattr(SearchIndex, '_catch_up', staticmethod(slow_catch_up))
+    monkeypatch.setattr(db, 'session', SimpleNamespace(remove=lambda: None))
+    search_index._state.update(pid=search_index.os.getpid(), checked_at=0.0, reconciled_at=0.0)
+
+    assert SearchIndex.get() is state
+    assert started.wait(5)
+    assert SearchIndex.get() is state  # Still syncing: no second thread
+    release.set()
+
+    for thread in threading.enumerate():
+        if thread.name == 'search-index-sync':
+            thread.join(5)
+    assert reconciles == [True]
+    assert search_index._state['syncing'] is False
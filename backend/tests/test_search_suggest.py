@@ -0,0 +1,57 @@
+"""
+Tests for typeahead suggestions without Postgres full-text search or pg_trgm
+"""
+import pytest
+
+from extensions import db
+from models.project import Project
+from models.user import User
+from utils import search_engine
+from utils.cache import CacheService
+from utils.search_engine import SearchEngine
+
+
+@pytest.fixture
+def uncached(monkeypatch):
+    monkeypatch.setattr(CacheService, 'get_suggestions', staticmethod(lambda suffix, compute, ttl=300: compute()))
+
+
+def _user(username, **values):
+    user = User(email=f'{username}@example.com', username=username, **values)
+    user.set_password('TestPassword123')
+    db.session.add(user)
+    return user
+
+
+def _labels(text, suggest_type):
+    return [s['label'] for s in SearchEngine.suggest(text, [suggest_type])]
+
+
+def test_suggestions_on_memory_backend(app, uncached):
+    """Test project, user, hackathon and tech suggestions with SEARCH_BACKEND=memory"""
+    app.config['SEARCH_BACKEND'] = 'memory'
+    user = _user('alicebuilds')
+    _user('malice'), _user('alibaba'), _user('alicia_gone', is_active=False)
+    db.session.flush()
+    db.session.add_all([
+        Project(user_id=user.id, title='Solana Wallet', description='A wallet', hackathon_name='ETHGlobal',
+                tech_stack=['Solana', 'Rust']),
+        Project(user_id=user.id, title='Wallet Watcher', description='Watches', tech_stack=['Rust']),
+    ])
+    db.session.commit()
+
+    assert _labels('wall', 'project') == ['Wallet Watcher', 'Solana Wallet']
+    assert _labels('alic', 'user') == ['alicebuilds', 'malice']
+    assert _labels('Al', 'user') == ['alibaba', 'alicebuilds']
+    assert _labels('eth', 'hackathon') == ['ETHGlobal']
+    assert _labels('r', 'tech') == ['Rust']
+
+
+def test_suggestions_without_pg_trgm(app, uncached, monkeypatch):
+    """Test the Postgres backend falls back to ILIKE when pg_trgm isn't installed"""
+    app.config['SEARCH_BACKEND'] = 'postgres'
+    monkeypatch.setattr(search_engine, '_has_trigram', lambda: False)
+    _user('alicebuilds'), _user('malice')
+    db.session.commit()
+
+    assert _labels('alic', 'user') == ['alicebuilds', 'malice']
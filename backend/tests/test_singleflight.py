@@ -0,0 +1,100 @@
+"""
+Tests for in-process request coalescing (SingleFlight)
+"""
+import threading
+
+import pytest
+
+from utils import singleflight
+from utils.singleflight import SingleFlight
+
+WAITERS = 5
+
+
+class _WatchedEvent(threading.Event):
+    """Event that records how many threads are waiting on it"""
+
+    waiting = threading.Semaphore(0)
+
+    def wait(self, timeout=None):
+        _WatchedEvent.waiting.release()
+        return super().wait(timeout)
+
+
+@pytest.fixture
+def watched(monkeypatch):
+    class _Call(singleflight._Call):
+        def __init__(self):
+            super().__init__()
+            self.event = _WatchedEvent()
+
+    _WatchedEvent.waiting = threading.Semaphore(0)
+    monkeypatch.setattr(singleflight, '_Call', _Call)
+
+
+def _run_concurrently(flight, fn):
+    """Start a leader, then WAITERS callers once it is running; return what each caller got"""
+    started, release = threading.Event(), threading.Event()
+    outcomes = []
+
+    def leader_fn():
+        started.set()
+        assert release.wait(5)
+        return fn()
+
+    def call(f):
+        try:
+            outcomes.append(('result', flight.do('feed', f)))
+        except Exception as e:
+            outcomes.append(('error', e))
+
+    threads = [threading.Thread(target=call, args=(leader_fn,))]
+    threads[0].start()
+    assert started.wait(5)
+    threads += [threading.Thread(target=call, args=(fn,)) for _ in range(WAITERS)]
+    for thread in threads[1:]:
+        thread.start()
+    for _ in range(WAITERS):
+        assert _WatchedEvent.waiting.acquire(timeout=5)  # Every caller is waiting on the leader
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert flight.in_flight() == 0
+    return outcomes
+
+
+def test_concurrent_callers_share_one_call(watched):
+    """Test callers arriving while a key is in flight get the leader's result without running fn"""
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        return {'items': [1, 2, 3]}
+
+    outcomes = _run_concurrently(SingleFlight(), compute)
+
+    assert len(calls) == 1
+    assert len(outcomes) == WAITERS + 1
+    assert all(kind == 'result' and value is outcomes[0][1] for kind, value in outcomes)
+
+
+def test_error_reaches_every_waiter(watched):
+    """Test an exception raised by the leader's call is raised to every waiting caller"""
+    error = RuntimeError('database unavailable')
+
+    def fail():
+        raise error
+
+    outcomes = _run_concurrently(SingleFlight(), fail)
+
+    assert outcomes == [('error', error)] * (WAITERS + 1)
+
+
+def test_later_calls_run_again():
+    """Test a finished call isn't cached: the next caller for the key runs fn again"""
+    flight = SingleFlight()
+    results = iter([1, 2])
+
+    assert flight.do('feed', lambda: next(results)) == 1
+    assert flight.do('feed', lambda: next(results)) == 2
@@ -0,0 +1,83 @@
+"""
+Tests for write-behind vote buffering (VoteBuffer), running its Lua scripts on fakeredis
+"""
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')  # Lua scripting support
+
+from services import vote_buffer
+from services.vote_buffer import VoteBuffer
+from utils.cache import CacheService
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(CacheService, 'get_redis_client', staticmethod(lambda: client))
+    app = Flask(__name__)
+    app.config['VOTE_WRITE_BEHIND'] = True
+    with app.app_context():
+        yield client
+
+
+def test_overlay_applies_buffered_counts_and_viewer_vote(redis):
+    """Test pending and in-flight deltas add to the counts, and the viewer's buffered vote wins"""
+    redis.hset('vwb:delta:p1', mapping={'up': 2, 'down': 1})
+    redis.hset('vwb:flushing_delta:p1', 'up', 1)
+    redis.hset('vwb:pending:p1', 'u1', 'down')
+    redis.hset('vwb:flushing:p2', 'u1', '')
+    cached = {'id': 'p1', 'upvotes': 10, 'downvotes': 3, 'upvote_ratio': 76.92, 'user_vote': None}
+    other = {'id': 'p2', 'upvotes': 4, 'downvotes': 0, 'upvote_ratio': 100.0, 'user_vote': 'up'}
+
+    first, second = VoteBuffer.overlay([cached, other], 'u1')
+
+    assert (first['upvotes'], first['downvotes'], first['upvote_ratio']) == (13, 4, 76.47)
+    assert first['user_vote'] == 'down'
+    assert second['user_vote'] is None  # Removed, not yet flushed
+    assert (second['upvotes'], second['upvote_ratio']) == (4, 100.0)
+    # Inputs may be shared cache entries - they must not change
+    assert cached['upvotes'] == 10 and cached['user_vote'] is None
+
+    assert VoteBuffer.overlay([cached], None)[0]['user_vote'] is None
+
+
+def test_record_then_flush_writes_votes_and_clears_buffer(redis, monkeypatch):
+    """Test buffered votes toggle against the database vote, flush once and leave no buffered state"""
+    monkeypatch.setattr(VoteBuffer, '_stored_vote', staticmethod(lambda user_id, project_id: 'up' if user_id == 'u2' else ''))
+    written, refreshed = {}, []
+    monkeypatch.setattr(VoteBuffer, '_write', staticmethod(lambda votes, project_ids: written.update(votes)))
+    monkeypatch.setattr(VoteBuffer, '_after_flush', staticmethod(refreshed.extend))
+    project = SimpleNamespace(id='p1', upvotes=5, downvotes=1)  # Database counts, u2's upvote included
+
+    assert VoteBuffer.record('u1', project, 'up') == \
+        {'previous': None, 'current': 'up', 'upvotes': 6, 'downvotes': 1, 'buffered': True}
+    result = VoteBuffer.record('u2', project, 'up')  # Toggles off u2's stored upvote
+    assert (result['previous'], result['current'], result['upvotes']) == ('up', None, 5)
+    assert VoteBuffer.record('u3', project, 'down')['downvotes'] == 2
+
+    assert VoteBuffer.flush() == 1
+    assert written == {('u1', 'p1'): 'up', ('u2', 'p1'): '', ('u3', 'p1'): 'down'}
+    assert refreshed == ['p1']
+    assert redis.keys('vwb:*') == [b'vwb:gen:p1']
+    assert VoteBuffer.flush() == 0
+
+
+def test_failed_finalize_requeues_project(redis, monkeypatch):
+    """Test votes already written are re-flushed (and then dropped) if finalizing fails"""
+    monkeypatch.setattr(VoteBuffer, '_stored_vote', staticmethod(lambda user_id, project_id: ''))
+    monkeypatch.setattr(VoteBuffer, '_write', staticmethod(lambda votes, project_ids: None))
+    monkeypatch.setattr(VoteBuffer, '_after_flush', staticmethod(lambda project_ids: None))
+    VoteBuffer.record('u1', SimpleNamespace(id='p1', upvotes=0, downvotes=0), 'up')
+
+    finalize = vote_buffer._FINALIZE_SCRIPT
+    monkeypatch.setattr(vote_buffer, '_FINALIZE_SCRIPT', "return redis.error_reply('finalize failed')")
+    VoteBuffer.flush()
+    assert redis.smembers(vote_buffer.DIRTY_KEY) == {b'p1'}
+
+    monkeypatch.setattr(vote_buffer, '_FINALIZE_SCRIPT', finalize)
+    VoteBuffer.flush()
+    assert redis.keys('vwb:*') == [b'vwb:gen:p1']
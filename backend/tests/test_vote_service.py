@@ -0,0 +1,119 @@
+"""
+Tests for VoteService vote semantics (the ORM path) and its broadcasts
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from services import vote_service
+from services.socket_service import SocketService
+from services.vote_service import VoteService
+
+
+class _Query:
+    def __init__(self, rows, key):
+        self.rows = rows
+        self.key = key
+        self.criteria = {}
+
+    def filter_by(self, **criteria):
+        self.criteria = criteria
+        return self
+
+    def with_for_update(self):
+        return self
+
+    def first(self):
+        return self.rows.get(tuple(self.criteria[name] for name in self.key))
+
+
+class _Store:
+    """In-memory projects and votes behind the Project/Vote/db names vote_service uses"""
+
+    def __init__(self):
+        self.projects = {}
+        self.votes = {}
+
+        class Vote(SimpleNamespace):
+            query = _Query(self.votes, ('user_id', 'project_id'))
+
+        self.Vote = Vote
+        self.Project = SimpleNamespace(query=_Query(self.projects, ('id',)))
+        self.db = SimpleNamespace(session=SimpleNamespace(add=self.add, delete=self.delete, flush=lambda: None))
+
+    def add(self, vote):
+        self.votes[(vote.user_id, vote.project_id)] = vote
+
+    def delete(self, vote):
+        del self.votes[(vote.user_id, vote.project_id)]
+
+    def project(self, project_id, upvotes=0, downvotes=0):
+        project = SimpleNamespace(id=project_id, upvotes=upvotes, downvotes=downvotes)
+        self.projects[(project_id,)] = project
+        return project
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = _Store()
+    monkeypatch.setattr(vote_service, 'Project', store.Project)
+    monkeypatch.setattr(vote_service, 'Vote', store.Vote)
+    monkeypatch.setattr(vote_service, 'db', store.db)
+    return store
+
+
+def _vote(user_id, project_id, vote_type, toggle=True):
+    return VoteService._apply_orm(user_id, project_id, vote_type, toggle)
+
+
+def test_new_vote_switch_and_toggle(store):
+    """Test casting, switching and re-casting (toggle off) a vote move the counters by one"""
+    project = store.project('p1', upvotes=3, downvotes=1)
+
+    assert _vote('u1', 'p1', 'up') == {'previous': None, 'current': 'up', 'upvotes': 4, 'downvotes': 1}
+    assert _vote('u1', 'p1', 'down') == {'previous': 'up', 'current': 'down', 'upvotes': 3, 'downvotes': 2}
+    assert store.votes[('u1', 'p1')].vote_type == 'down'
+
+    assert _vote('u1', 'p1', 'down') == {'previous': 'down', 'current': None, 'upvotes': 3, 'downvotes': 1}
+    assert ('u1', 'p1') not in store.votes
+    assert (project.upvotes, project.downvotes) == (3, 1)
+
+    # Without toggle, voting the same type again keeps it
+    _vote('u1', 'p1', 'up', toggle=False)
+    assert _vote('u1', 'p1', 'up', toggle=False) == {'previous': 'up', 'current': 'up', 'upvotes': 4, 'downvotes': 1}
+
+
+def test_explicit_removal_and_missing_project(store):
+    """Test removing a vote (or no vote) and voting on a missing project"""
+    store.project('p1')
+    _vote('u1', 'p1', 'up')
+
+    assert _vote('u1', 'p1', None) == {'previous': 'up', 'current': None, 'upvotes': 0, 'downvotes': 0}
+    assert _vote('u1', 'p1', None) == {'previous': None, 'current': None, 'upvotes': 0, 'downvotes': 0}
+    assert _vote('u1', 'missing', 'up') is None
+
+
+def test_counts_never_go_below_zero(store):
+    """Test removing a vote from counters that already read zero leaves them at zero"""
+    store.project('p1', upvotes=0, downvotes=0)
+    store.add(store.Vote(user_id='u1', project_id='p1', vote_type='up'))  # Counters out of sync
+
+    assert _vote('u1', 'p1', 'down') == {'previous': 'up', 'current': 'down', 'upvotes': 0, 'downvotes': 1}
+    assert _vote('u1', 'p1', None)['downvotes'] == 0
+
+
+def test_broadcast_skips_unchanged_and_buffered_votes(monkeypatch):
+    """Test only real vote changes are broadcast, as a cast or a removal plus a leaderboard update"""
+    events = []
+    monkeypatch.setattr(SocketService, 'emit_vote_cast', staticmethod(lambda *args: events.append(('cast',) + args)))
+    monkeypatch.setattr(SocketService, 'emit_vote_removed', staticmethod(lambda *args: events.append(('removed',) + args)))
+    monkeypatch.setattr(SocketService, 'emit_leaderboard_updated', staticmethod(lambda: events.append(('leaderboard',))))
+
+    VoteService.broadcast('p1', {'previous': 'up', 'current': 'up', 'upvotes': 4, 'downvotes': 1})
+    VoteService.broadcast('p1', {'previous': None, 'current': None, 'upvotes': 4, 'downvotes': 1})
+    VoteService.broadcast('p1', {'previous': None, 'current': 'up', 'upvotes': 4, 'downvotes': 1, 'buffered': True})
+    assert events == []
+
+    VoteService.broadcast('p1', {'previous': None, 'current': 'up', 'upvotes': 4, 'downvotes': 1})
+    VoteService.broadcast('p1', {'previous': 'up', 'current': None, 'upvotes': 3, 'downvotes': 1})
+    assert events == [('cast', 'p1', 'up', 3), ('leaderboard',), ('removed', 'p1'), ('leaderboard',)]
@@ -1,104 +1,711 @@
 """
-Caching utilities using Redis
+Caching utilities using Redis, with an optional in-process L1 layer
 """
-import json
-import redis
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
 from flask import current_app
 
+from extensions import db
+from utils import cache_batch
+from utils.redis_client import RedisPool
+from utils.cache_codec import CacheCodec
+from utils.cache_metrics import METRICS_KEY, get_metrics, summarize, to_prometheus
+from utils.local_cache import LocalCache, get_local_cache
+from utils.singleflight import flights
+
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Background refreshes for stale-while-revalidate, one executor per worker process
+_refresh_state = {'pid': None, 'executor': None, 'keys': set()}
+_refresh_lock = threading.Lock()
+
+# Degraded mode: a short-lived per-worker cache used while Redis is unavailable,
+# plus the invalidations Redis missed meanwhile (replayed once it's back)
+_degraded_state = {'pid': None, 'cache': None, 'keys': set(), 'namespaces': set(), 'patterns': set()}
+_degraded_lock = threading.Lock()
+
 
 class CacheService:
     """Redis caching service"""
 
+    # Canonical feed orderings - each has its own namespace so a change that
+    # can't reorder one sort doesn't throw its pages away
+    FEED_SORTS = ('trending', 'newest', 'top-rated', 'most-voted')
+
     @staticmethod
     def get_redis_client():
-        """Get Redis client instance"""
+        """Get the pooled Redis client for this worker process
+
+        Returns None while Redis is unavailable (circuit breaker open); callers
+        then use the degraded in-process cache or go to the database.
+        """
         try:
-            redis_url = current_app.config.get('REDIS_URL', 'redis://localhost:6379/0')
-            # Handle both redis:// and rediss:// (TLS) connections
-            # Upstash uses rediss:// for TLS
-            return redis.from_url(
-                redis_url,
-                decode_responses=True,
-                ssl_cert_reqs=None  # For Upstash TLS compatibility
-            )
+            client = RedisPool.get_client()
         except Exception as e:
             print(f"Redis connection failed: {e}")
             return None
+        if client is not None and (_degraded_state['keys'] or _degraded_state['namespaces'] or _degraded_state['patterns']):
+            CacheService._replay_missed_invalidations()
+        return client
+
+    @staticmethod
+    def _redis_error(action: str, e: Exception):
+        """Log a failed Redis call; connection failures count towards tripping the breaker"""
+        RedisPool.record_failure(e)
+        print(f"Cache {action} error: {e}")
+
+    @staticmethod
+    def get_breaker_stats():
+        """Get Redis circuit breaker state for this worker process"""
+        return RedisPool.get_breaker().stats()
+
+    @staticmethod
+    def _degraded():
+        """Get this worker's degraded-mode cache"""
+        pid = os.getpid()
+        if _degraded_state['pid'] != pid:
+            config = current_app.config
+            with _degraded_lock:
+                if _degraded_state['pid'] != pid:
+                    _degraded_state.update(
+                        pid=pid,
+                        cache=LocalCache(
+                            max_entries=config.get('CACHE_DEGRADED_MAX_ENTRIES', 500),
+                            default_ttl=config.get('CACHE_DEGRADED_TTL', 10)
+                        ),
+                        keys=set(), namespaces=set(), patterns=set()
+                    )
+        return _degraded_state['cache']
+
+    @staticmethod
+    def _record_missed(keys=(), namespaces=(), patterns=()):
+        """Apply an invalidation to the degraded cache and remember it for Redis"""
+        degraded = CacheService._degraded()
+        if keys:
+            degraded.delete(*keys)
+        for pattern in patterns:
+            degraded.delete_pattern(pattern)
+        if namespaces:
+            degraded.clear()  # Versioned keys aren't used while degraded - drop everything
+        with _degraded_lock:
+            _degraded_state['keys'].update(keys)
+            _degraded_state['namespaces'].update(namespaces)
+            _degraded_state['patterns'].update(patterns)
+
+    @staticmethod
+    def _replay_missed_invalidations():
+        """Apply invalidations that happened while Redis was down, once it's reachable again"""
+        with _degraded_lock:
+            keys, _degraded_state['keys'] = _degraded_state['keys'], set()
+            namespaces, _degraded_state['namespaces'] = _degraded_state['namespaces'], set()
+            patterns, _degraded_state['patterns'] = _degraded_state['patterns'], set()
+            if _degraded_state['cache'] is not None:
+                _degraded_state['cache'].clear()
+        if keys or namespaces or patterns:
+            CacheService._apply_invalidations(keys, namespaces, patterns)
+
+    @staticmethod
+    def get_pool_stats():
+        """Get connection pool statistics for this worker process"""
+        return RedisPool.get_stats()
+
+    @staticmethod
+    def get_local_stats():
+        """Get L1 cache statistics for this worker process"""
+        local, bus = CacheService._get_local()
+        if local is None:
+            return {'enabled': False}
+        return dict(local.stats(), enabled=True, listening=bus.listening)
+
+    @staticmethod
+    def _get_local():
+        """Get (l1_cache, invalidation_bus) for this worker, or (None, None) when L1 is off"""
+        config = current_app.config
+        if not config.get('CACHE_L1_ENABLED'):
+            return None, None
+        app = current_app._get_current_object()
+
+        def client_factory():
+            with app.app_context():
+                return CacheService.get_redis_client()
+
+        return get_local_cache(config, client_factory)
+
+    @staticmethod
+    def _codec() -> CacheCodec:
+        """Get the value codec for this app (built once from CACHE_* config)"""
+        codec = current_app.extensions.get('cache_codec')
+        if codec is None:
+            codec = CacheCodec.from_config(current_app.config)
+            current_app.extensions['cache_codec'] = codec
+        return codec
+
+    @staticmethod
+    def _l1_eligible(key: str) -> bool:
+        """Only hot key families are kept in-process"""
+        prefixes = current_app.config.get('CACHE_L1_PREFIXES', ())
+        return key.startswith(tuple(prefixes))
+
+    @staticmethod
+    def _publish_invalidation(client, keys=(), patterns=(), local=True):
+        """Drop keys/patterns from this worker's L1 and tell every other worker to do the same
+
+        Pass local=False to only notify the other workers (e.g. after writing a
+        fresh value this worker already holds).
+        """
+        local_cache, bus = CacheService._get_local()
+        if local_cache is None:
+            return
+        if local:
+            if keys:
+                local_cache.delete(*keys)
+            for pattern in patterns:
+                local_cache.delete_pattern(pattern)
+        try:
+            bus.publish(client, keys=keys, patterns=patterns)
+        except Exception as e:
+            CacheService._redis_error('invalidation publish', e)
 
     @staticmethod
     def set(key: str, value, ttl: int = 3600):
         """Set cache value with TTL (default 1 hour)"""
+        if key is None:
+            return False
+        metrics = CacheService._metrics()
         try:
             client = CacheService.get_redis_client()
             if client:
-                # Serialize if not string
-                if not isinstance(value, str):
-                    value = json.dumps(value)
-                client.setex(key, ttl, value)
+                raw = CacheService._codec().encode(key, value)
+                started = time.perf_counter()
+                client.setex(key, ttl, raw)
+                if metrics:
+                    metrics.observe(key, 'set', time.perf_counter() - started, len(raw))
+                    metrics.count(key, 'set')
+
+                local, bus = CacheService._get_local()
+                if local is not None and bus.listening and CacheService._l1_eligible(key):
+                    local.set(key, value, ttl)
                 return True
+            CacheService._degraded().set(key, value, ttl)
         except Exception as e:
-            print(f"Cache set error: {e}")
+            if metrics:
+                metrics.count(key, 'error')
+            CacheService._redis_error('set', e)
         return False
 
     @staticmethod
     def get(key: str):
-        """Get cache value"""
+        """Get cache value (in-process L1 first, then Redis)"""
+        if key is None:
+            return None
+        metrics = CacheService._metrics()
         try:
+            local, bus = CacheService._get_local()
+            use_local = local is not None and bus.listening and CacheService._l1_eligible(key)
+            if use_local:
+                value = local.get(key)
+                if value is not None:
+                    if metrics:
+                        metrics.count(key, 'l1_hit')
+                    return value
+                generation = local.generation
+
             client = CacheService.get_redis_client()
             if client:
-                value = client.get(key)
-                if value:
-                    # Try to deserialize
-                    try:
-                        return json.loads(value)
-                    except:
-                        return value
+                started = time.perf_counter()
+                raw = client.get(key)
+                if metrics:
+                    metrics.observe(key, 'get', time.perf_counter() - started, len(raw) if raw else None)
+                    metrics.count(key, 'hit' if raw else 'miss')
+                if raw:
+                    value = CacheService._codec().decode(raw)
+                    if use_local:
+                        local.set(key, value, generation=generation)
+                    return value
+            else:
+                value = CacheService._degraded().get(key)
+                if metrics:
+                    metrics.count(key, 'miss' if value is None else 'hit')
+                return value
         except Exception as e:
-            print(f"Cache get error: {e}")
+            if metrics:
+                metrics.count(key, 'error')
+            CacheService._redis_error('get', e)
         return None
 
     @staticmethod
-    def delete(key: str):
-        """Delete cache key"""
+    def _metrics():
+        """Get this worker's cache metrics, or None when instrumentation is off"""
+        if not current_app.config.get('CACHE_METRICS_ENABLED', True):
+            return None
+        return get_metrics(os.getpid())
+
+    @staticmethod
+    def flush_metrics(interval: float = 0):
+        """Add this worker's metric deltas to the shared Redis hash (at most once per interval)"""
+        metrics = CacheService._metrics()
+        if metrics is None or time.monotonic() - metrics.last_flush < interval:
+            return False
+        client = CacheService.get_redis_client()
+        if not client:
+            return False
+        try:
+            return metrics.flush(client)
+        except Exception as e:
+            CacheService._redis_error('metrics flush', e)
+        return False
+
+    @staticmethod
+    def get_metrics_report() -> dict:
+        """Per key family hit ratios, counters and histograms across all workers
+
+        Falls back to this worker's unflushed numbers when Redis is unavailable.
+        """
+        CacheService.flush_metrics()
+        client = CacheService.get_redis_client()
+        if client:
+            try:
+                return {'scope': 'cluster', 'families': summarize(client.hgetall(METRICS_KEY))}
+            except Exception as e:
+                CacheService._redis_error('metrics read', e)
+        metrics = CacheService._metrics()
+        return {'scope': 'worker', 'families': summarize(metrics.snapshot() if metrics else {})}
+
+    @staticmethod
+    def get_prometheus_metrics() -> str:
+        """Cache metrics in the Prometheus text exposition format"""
+        return to_prometheus(CacheService.get_metrics_report()['families'])
+
+    @staticmethod
+    def reset_metrics():
+        """Drop the shared metric totals (e.g. after changing TTLs)"""
+        client = CacheService.get_redis_client()
+        if client:
+            client.delete(METRICS_KEY)
+            return True
+        return False
+
+    @staticmethod
+    def init_app(app):
+        """Batch each request's invalidations and flush them once at teardown; flush metrics periodically"""
+        cache_batch.init_app(app, CacheService._apply_invalidations)
+
+        @app.teardown_request
+        def flush_cache_metrics(exc):
+            CacheService.flush_metrics(interval=app.config.get('CACHE_METRICS_FLUSH_INTERVAL', 10))
+
+    @staticmethod
+    def _invalidate(keys=(), namespaces=(), patterns=()):
+        """Record invalidations on the request (flushed at teardown), or apply them now outside one"""
+        batch = cache_batch.current_batch()
+        if batch is None:
+            return CacheService._apply_invalidations(keys, namespaces, patterns)
+        session = db.session
+        batch.record(
+            bool(session.new or session.dirty or session.deleted),
+            keys=keys, namespaces=namespaces, patterns=patterns
+        )
+        return True
+
+    @staticmethod
+    def _apply_invalidations(keys=(), namespaces=(), patterns=()):
+        """Delete keys and bump namespaces in one pipelined round-trip, then clear patterns
+
+        Namespace keys are bumped with SET NX (seeded from the clock) + INCR;
+        keys from older generations are never read again and expire via their TTLs.
+        """
+        keys, namespaces, patterns = list(keys), list(namespaces), list(patterns)
+        ns_keys = [f"ns:{namespace}" for namespace in namespaces]
         try:
             client = CacheService.get_redis_client()
-            if client:
-                client.delete(key)
-                return True
+            if not client:
+                CacheService._record_missed(keys=keys, namespaces=namespaces, patterns=patterns)
+                return False
+
+            if keys or ns_keys:
+                seed = int(time.time() * 1000)
+                pipe = client.pipeline(transaction=False)
+                if keys:
+                    pipe.delete(*keys)
+                for ns_key in ns_keys:
+                    pipe.set(ns_key, seed, nx=True)
+                    pipe.incr(ns_key)
+                pipe.execute()
+
+            for pattern in patterns:
+                # SCAN is still O(N) - prefer namespaces for anything on a request path
+                batch = []
+                for key in client.scan_iter(match=pattern, count=500):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        client.delete(*batch)
+                        batch = []
+                if batch:
+                    client.delete(*batch)
+
+            CacheService._publish_invalidation(client, keys=keys + ns_keys, patterns=patterns)
+            metrics = CacheService._metrics()
+            if metrics:
+                for item in keys + namespaces + patterns:
+                    metrics.count(item, 'invalidation')
+            return True
         except Exception as e:
-            print(f"Cache delete error: {e}")
+            CacheService._redis_error('invalidation', e)
+            CacheService._record_missed(keys=keys, namespaces=namespaces, patterns=patterns)
         return False
 
+    @staticmethod
+    def delete(*keys: str):
+        """Delete cache key(s) (batched until the end of the request)"""
+        return CacheService._invalidate(keys=keys)
+
     @staticmethod
     def clear_pattern(pattern: str):
-        """Delete all keys matching pattern"""
+        """Delete all keys matching pattern (batched until the end of the request)
+
+        Walks the keyspace with SCAN, so it's still O(N) - prefer versioned
+        namespaces (bump_namespace) for anything on a request path.
+        """
+        return CacheService._invalidate(patterns=[pattern])
+
+    @staticmethod
+    def get_or_compute(key: str, compute, ttl: int = 3600):
+        """Get a cached value, or compute it once across all workers on a miss
+
+        Within a process, concurrent callers share one in-flight computation.
+        Across processes, a per-key Redis lock elects a single winner; the
+        others poll the cache and reuse its result. If the winner dies or the
+        wait times out, the waiter computes the value itself.
+
+        compute() must not depend on the caller (e.g. the viewer's votes) since
+        its result is shared.
+        """
+        if key is None:
+            return compute()
+        value = CacheService.get(key)
+        if value is not None:
+            return value
+
+        return flights.do(key, lambda: CacheService._compute_with_lock(key, compute, ttl))
+
+    @staticmethod
+    def _compute_with_lock(key: str, compute, ttl: int):
+        """Compute and cache key while holding its distributed lock"""
+        config = current_app.config
+        lock_key = f"lock:{key}"
+        lock_ttl_ms = int(config.get('CACHE_LOCK_TTL', 30) * 1000)
+        deadline = time.monotonic() + config.get('CACHE_LOCK_WAIT', 5)
+        token = uuid4().hex
+        delay = 0.025
+
+        try:
+            client = CacheService.get_redis_client()
+            while client is not None:
+                if client.set(lock_key, token, nx=True, px=lock_ttl_ms):
+                    try:
+                        # Another worker may have finished between our miss and the lock
+                        value = CacheService.get(key)
+                        if value is None:
+                            value = compute()
+                            if value is not None:
+                                CacheService.set(key, value, ttl)
+                        return value
+                    finally:
+                        try:
+                            client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                        except Exception as e:
+                            CacheService._redis_error('lock release', e)
+
+                # Someone else is computing - wait for their result
+                time.sleep(delay)
+                delay = min(delay * 2, 0.2)
+                value = CacheService.get(key)
+                if value is not None:
+                    return value
+                if time.monotonic() >= deadline:
+                    break
+        except Exception as e:
+            CacheService._redis_error('lock', e)
+
+        value = compute()
+        if value is not None:
+            CacheService.set(key, value, ttl)
+        return value
+
+    @staticmethod
+    def get_or_refresh(key: str, compute, ttl: int = 3600, namespace: str = None):
+        """Stale-while-revalidate read
+
+        Entries are stored with a soft TTL (ttl) and a hard TTL (ttl plus
+        CACHE_SWR_GRACE). Once the soft TTL passes - or the namespace is bumped
+        by an invalidation - the stale payload is still returned immediately and
+        a background refresh is scheduled. Only a cold key makes the caller wait,
+        and then only one worker computes it (see get_or_compute).
+
+        compute() runs outside the request on refresh, so it must only use its
+        closed-over arguments. Returning None means "doesn't exist": nothing is
+        cached and any stale entry is dropped.
+        """
+        version = CacheService.namespace_version(namespace) if namespace else None
+        envelope = CacheService.get(key)
+        if isinstance(envelope, dict) and envelope.get('swr') == 1:
+            if envelope.get('generation') != version or time.time() >= envelope.get('fresh_until', 0):
+                CacheService._schedule_refresh(key, compute, ttl, namespace)
+            return envelope['data']
+
+        def compute_envelope():
+            data = compute()
+            if data is None:
+                return None
+            return CacheService._swr_envelope(data, ttl, version)
+
+        hard_ttl = ttl + current_app.config.get('CACHE_SWR_GRACE', 3600)
+        if key is None:
+            envelope = compute_envelope()
+        else:
+            envelope = flights.do(key, lambda: CacheService._compute_with_lock(key, compute_envelope, hard_ttl))
+        return envelope['data'] if envelope else None
+
+    @staticmethod
+    def _swr_envelope(data, ttl: int, generation):
+        """Wrap a payload with its freshness metadata"""
+        return {
+            'swr': 1,
+            'generation': generation,
+            'fresh_until': time.time() + ttl,
+            'data': data,
+        }
+
+    @staticmethod
+    def _schedule_refresh(key: str, compute, ttl: int, namespace: str = None):
+        """Recompute a stale entry in the background (at most once at a time per key)"""
+        config = current_app.config
+        pid = os.getpid()
+        with _refresh_lock:
+            if _refresh_state['pid'] != pid:
+                _refresh_state.update(
+                    pid=pid,
+                    executor=ThreadPoolExecutor(
+                        max_workers=config.get('CACHE_REFRESH_WORKERS', 2),
+                        thread_name_prefix='cache-refresh'
+                    ),
+                    keys=set()
+                )
+            if key in _refresh_state['keys']:
+                return
+            _refresh_state['keys'].add(key)
+
+        app = current_app._get_current_object()
+        lock_key = f"refresh:{key}"
+        token = uuid4().hex
+        lock_ttl_ms = int(config.get('CACHE_LOCK_TTL', 30) * 1000)
+        hard_ttl = ttl + config.get('CACHE_SWR_GRACE', 3600)
+
+        def refresh():
+            with app.app_context():
+                client = None
+                try:
+                    client = CacheService.get_redis_client()
+                    # Another worker is already refreshing this key
+                    if client is None or not client.set(lock_key, token, nx=True, px=lock_ttl_ms):
+                        return
+                    version = CacheService.namespace_version(namespace) if namespace else None
+                    data = compute()
+                    if data is None:
+                        CacheService.delete(key)
+                    else:
+                        CacheService.set(key, CacheService._swr_envelope(data, ttl, version), hard_ttl)
+                        # Other workers may hold the stale envelope in L1
+                        CacheService._publish_invalidation(client, keys=[key], local=False)
+                except Exception as e:
+                    CacheService._redis_error(f'refresh ({key})', e)
+                finally:
+                    if client is not None:
+                        try:
+                            client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                        except Exception:
+                            pass
+                    with _refresh_lock:
+                        _refresh_state['keys'].discard(key)
+
+        try:
+            _refresh_state['executor'].submit(refresh)
+        except Exception as e:
+            print(f"Cache refresh scheduling error: {e}")
+            with _refresh_lock:
+                _refresh_state['keys'].discard(key)
+
+    @staticmethod
+    def namespace_version(namespace: str):
+        """Get the current generation of a key family (None if Redis is unavailable)"""
+        ns_key = f"ns:{namespace}"
+        try:
+            local, bus = CacheService._get_local()
+            use_local = local is not None and bus.listening
+            if use_local:
+                version = local.get(ns_key)
+                if version is not None:
+                    return version
+                generation = local.generation
+
+            client = CacheService.get_redis_client()
+            if not client:
+                return None
+            version = client.get(ns_key)
+            if version is None:
+                # Seed from the clock so a lost counter can never fall back to a
+                # generation whose keys are still alive
+                pipe = client.pipeline(transaction=False)
+                pipe.set(ns_key, int(time.time() * 1000), nx=True)
+                pipe.get(ns_key)
+                version = pipe.execute()[1]
+            version = int(version)
+            if use_local:
+                local.set(ns_key, version, generation=generation)
+            return version
+        except Exception as e:
+            CacheService._redis_error('namespace', e)
+        return None
+
+    @staticmethod
+    def versioned_key(namespace: str, suffix: str):
+        """Build a key inside a versioned namespace, e.g. feed:v42:trending:page:1
+
+        Returns None if the namespace version can't be read; get/set treat that
+        as a cache miss.
+        """
+        version = CacheService.namespace_version(namespace)
+        if version is None:
+            return None
+        return f"{namespace}:v{version}:{suffix}"
+
+    @staticmethod
+    def bump_namespace(*namespaces: str):
+        """Invalidate whole key families with a single INCR each (batched until the end of the request)"""
+        if not namespaces:
+            return True
+        return CacheService._invalidate(namespaces=namespaces)
+
+    @staticmethod
+    def get_many(keys) -> list:
+        """Get several values in one round-trip (L1 first); missing keys come back as None"""
+        keys = list(keys)
+        values = [None] * len(keys)
+        if not keys:
+            return values
+        metrics = CacheService._metrics()
+        try:
+            local, bus = CacheService._get_local()
+            use_local = local is not None and bus.listening
+            if use_local:
+                generation = local.generation
+                for i, key in enumerate(keys):
+                    if CacheService._l1_eligible(key):
+                        values[i] = local.get(key)
+                        if metrics and values[i] is not None:
+                            metrics.count(key, 'l1_hit')
+
+            pending = [i for i, value in enumerate(values) if value is None]
+            client = CacheService.get_redis_client() if pending else None
+            if client:
+                codec = CacheService._codec()
+                started = time.perf_counter()
+                raw_values = client.mget([keys[i] for i in pending])
+                if metrics:
+                    size = sum(len(raw) for raw in raw_values if raw)
+                    metrics.observe(keys[pending[0]], 'mget', time.perf_counter() - started, size)
+                for i, raw in zip(pending, raw_values):
+                    if metrics:
+                        metrics.count(keys[i], 'hit' if raw else 'miss')
+                    if not raw:
+                        continue
+                    value = codec.decode(raw)
+                    values[i] = value
+                    if use_local and CacheService._l1_eligible(keys[i]):
+                        local.set(keys[i], value, generation=generation)
+            elif pending:
+                degraded = CacheService._degraded()
+                for i in pending:
+                    values[i] = degraded.get(keys[i])
+                    if metrics:
+                        metrics.count(keys[i], 'miss' if values[i] is None else 'hit')
+        except Exception as e:
+            if metrics:
+                metrics.count(keys[0], 'error')
+            CacheService._redis_error('get_many', e)
+        return values
+
+    @staticmethod
+    def set_many(mapping: dict, ttl: int = 3600):
+        """Set several values with the same TTL in one pipelined round-trip"""
+        if not mapping:
+            return True
+        metrics = CacheService._metrics()
         try:
             client = CacheService.get_redis_client()
             if client:
-                keys = client.keys(pattern)
-                if keys:
-                    client.delete(*keys)
+                codec = CacheService._codec()
+                encoded = {key: codec.encode(key, value) for key, value in mapping.items()}
+                started = time.perf_counter()
+                pipe = client.pipeline(transaction=False)
+                for key, raw in encoded.items():
+                    pipe.setex(key, ttl, raw)
+                pipe.execute()
+                if metrics:
+                    first = next(iter(encoded))
+                    metrics.observe(first, 'mset', time.perf_counter() - started, sum(map(len, encoded.values())))
+                    for key in encoded:
+                        metrics.count(key, 'set')
+
+                local, bus = CacheService._get_local()
+                if local is not None and bus.listening:
+                    for key, value in mapping.items():
+                        if CacheService._l1_eligible(key):
+                            local.set(key, value, ttl)
                 return True
+            degraded = CacheService._degraded()
+            for key, value in mapping.items():
+                degraded.set(key, value, ttl)
         except Exception as e:
-            print(f"Cache clear error: {e}")
+            if metrics:
+                metrics.count(next(iter(mapping)), 'error')
+            CacheService._redis_error('set_many', e)
         return False
 
     @staticmethod
     def cache_feed(page: int, sort: str, data: list, ttl: int = 600):
         """Cache project feed (10 minutes)"""
-        key = f"feed:{sort}:page:{page}"
+        key = CacheService.versioned_key(f"feed:{sort}", f"page:{page}")
         return CacheService.set(key, data, ttl)
 
     @staticmethod
     def get_cached_feed(page: int, sort: str):
         """Get cached project feed"""
-        key = f"feed:{sort}:page:{page}"
+        key = CacheService.versioned_key(f"feed:{sort}", f"page:{page}")
         return CacheService.get(key)
 
     @staticmethod
-    def invalidate_project_feed():
-        """Invalidate all feed caches when project changes"""
-        CacheService.clear_pattern("feed:*")
+    def get_feed_page(page: int, per_page: int, sort: str, compute, ttl: int = 3600):
+        """Get a feed page's ordered project IDs, served stale while it refreshes after a reorder"""
+        return CacheService.get_or_refresh(
+            f"feed:swr:{sort}:page:{page}:{per_page}", compute, ttl, namespace=f"feed:{sort}"
+        )
+
+    @staticmethod
+    def invalidate_project_feed(sorts=None):
+        """Invalidate feed orderings when projects change (all sorts unless given)"""
+        sorts = CacheService.FEED_SORTS if sorts is None else sorts
+        CacheService.bump_namespace(*[f"feed:{sort}" for sort in sorts])
 
     @staticmethod
     def cache_project(project_id: str, data: dict, ttl: int = 3600):
@@ -113,10 +720,40 @@ class CacheService:
         return CacheService.get(key)
 
     @staticmethod
-    def invalidate_project(project_id: str):
-        """Invalidate project cache and related feeds"""
-        CacheService.delete(f"project:{project_id}")
-        CacheService.invalidate_project_feed()
+    def invalidate_project(project_id: str, feed_sorts=None):
+        """Invalidate project cache, its feed card and related feed orderings
+
+        Feed pages only hold project IDs, so a change that can't reorder a feed
+        (see Project.changed_feed_sorts) only needs the card dropped: pass the
+        sorts that changed, or [] for none. By default every feed is reordered.
+        """
+        CacheService.delete(f"project:{project_id}", f"fragment:project:{project_id}")
+        if feed_sorts is None or feed_sorts:
+            CacheService.invalidate_project_feed(feed_sorts)
+
+    @staticmethod
+    def get_project_fragments(project_ids) -> dict:
+        """Get rendered project cards by ID with one MGET (missing IDs are left out)"""
+        project_ids = list(project_ids)
+        values = CacheService.get_many(f"fragment:project:{pid}" for pid in project_ids)
+        return {pid: value for pid, value in zip(project_ids, values) if value is not None}
+
+    @staticmethod
+    def cache_project_fragments(fragments: dict, ttl: int = 3600):
+        """Cache rendered project cards keyed by project ID"""
+        return CacheService.set_many({f"fragment:project:{pid}": data for pid, data in fragments.items()}, ttl)
+
+    @staticmethod
+    def get_user_fragments(user_ids) -> dict:
+        """Get rendered creator cards by user ID with one MGET (missing IDs are left out)"""
+        user_ids = list(user_ids)
+        values = CacheService.get_many(f"fragment:user:{uid}" for uid in user_ids)
+        return {uid: value for uid, value in zip(user_ids, values) if value is not None}
+
+    @staticmethod
+    def cache_user_fragments(fragments: dict, ttl: int = 3600):
+        """Cache rendered creator cards keyed by user ID"""
+        return CacheService.set_many({f"fragment:user:{uid}": data for uid, data in fragments.items()}, ttl)
 
     @staticmethod
     def cache_user(user_id: str, data: dict, ttl: int = 3600):
@@ -130,35 +767,54 @@ class CacheService:
         key = f"user:{user_id}"
         return CacheService.get(key)
 
+    @staticmethod
+    def get_user_profile(username: str, compute, ttl: int = 300):
+        """Get a public user profile, serving it stale while it refreshes after an update"""
+        return CacheService.get_or_refresh(
+            f"user_profile:{username}", compute, ttl, namespace=f"user_profile:{username}"
+        )
+
+    @staticmethod
+    def invalidate_user_profile(username: str):
+        """Mark a user profile stale (served once more while it refreshes)"""
+        CacheService.bump_namespace(f"user_profile:{username}")
+
     @staticmethod
     def invalidate_user(user_id: str):
-        """Invalidate user cache"""
-        CacheService.delete(f"user:{user_id}")
+        """Invalidate user cache and their creator card"""
+        CacheService.delete(f"user:{user_id}", f"fragment:user:{user_id}")
 
     @staticmethod
     def invalidate_leaderboard():
         """Invalidate all leaderboard caches when rankings change"""
-        CacheService.clear_pattern("leaderboard_*")
-        CacheService.clear_pattern("leaderboard:*")  # Also clear projects.py leaderboard pattern
+        CacheService.bump_namespace('leaderboard')
 
     @staticmethod
-    def invalidate_user_projects(user_id: str):
-        """Invalidate user's projects list cache"""
-        CacheService.clear_pattern(f"user_projects:{user_id}:*")
+    def leaderboard_key(suffix: str):
+        """Key for a leaderboard variant (projects.py and users.py leaderboards share one namespace)"""
+        return CacheService.versioned_key('leaderboard', suffix)
 
     @staticmethod
-    def get_projects_count(sort: str = 'all'):
-        """Get cached project count (for pagination)"""
-        key = f"count:projects:{sort}"
-        return CacheService.get(key)
+    def get_leaderboard(suffix: str, compute, ttl: int = 300):
+        """Get a leaderboard, serving it stale while it refreshes after a ranking change"""
+        return CacheService.get_or_refresh(f"leaderboard:swr:{suffix}", compute, ttl, namespace='leaderboard')
+
+    @staticmethod
+    def get_suggestions(suffix: str, compute, ttl: int = 300):
+        """Get typeahead suggestions for a prefix, computed once across workers on a miss"""
+        return CacheService.get_or_compute(CacheService.versioned_key('suggest', suffix), compute, ttl)
 
     @staticmethod
-    def set_projects_count(count: int, sort: str = 'all', ttl: int = 3600):
-        """Cache project count (1 hour - invalidated on project create/delete)"""
-        key = f"count:projects:{sort}"
-        return CacheService.set(key, count, ttl)
+    def invalidate_suggestions():
+        """Invalidate every cached typeahead prefix (projects created, renamed or removed)"""
+        CacheService.bump_namespace('suggest')
+
+    @staticmethod
+    def invalidate_user_projects(user_id: str):
+        """Invalidate user's projects list cache"""
+        CacheService.bump_namespace(f"user_projects:{user_id}")
 
     @staticmethod
-    def invalidate_counts():
-        """Invalidate all count caches when projects change"""
-        CacheService.clear_pattern("count:*")
+    def user_projects_key(user_id: str, page: int):
+        """Key for a page of a user's projects list"""
+        return CacheService.versioned_key(f"user_projects:{user_id}", f"page:{page}")
@@ -0,0 +1,100 @@
+"""
+Per-request batching of cache invalidations
+
+Invalidations issued while handling a request are recorded on flask.g,
+deduplicated, and flushed once in teardown with a single Redis pipeline.
+Invalidations recorded while the session holds uncommitted writes only
+count once that transaction commits; a rollback discards them.
+"""
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class InvalidationBatch:
+    """Invalidations recorded during one request"""
+
+    def __init__(self):
+        # Safe to flush: recorded when no uncommitted writes were pending
+        self.confirmed = {'keys': {}, 'namespaces': {}, 'patterns': {}}
+        # Waiting for the current transaction to commit
+        self.pending = {'keys': {}, 'namespaces': {}, 'patterns': {}}
+        # The current transaction has flushed writes
+        self.uncommitted_writes = False
+
+    def record(self, session_dirty: bool, keys=(), namespaces=(), patterns=()):
+        """Add invalidations (dicts keep insertion order and dedupe)"""
+        target = self.pending if session_dirty or self.uncommitted_writes else self.confirmed
+        target['keys'].update(dict.fromkeys(keys))
+        target['namespaces'].update(dict.fromkeys(namespaces))
+        target['patterns'].update(dict.fromkeys(patterns))
+
+    def commit(self):
+        """The transaction committed - pending invalidations are now safe to flush"""
+        for kind, items in self.pending.items():
+            self.confirmed[kind].update(items)
+            items.clear()
+        self.uncommitted_writes = False
+
+    def rollback(self):
+        """The transaction rolled back - its invalidations no longer apply"""
+        for items in self.pending.values():
+            items.clear()
+        self.uncommitted_writes = False
+
+    def drain(self) -> dict:
+        """Confirmed invalidations as lists, emptying the batch"""
+        drained = {kind: list(items) for kind, items in self.confirmed.items()}
+        for items in self.confirmed.values():
+            items.clear()
+        return drained
+
+
+def current_batch(create: bool = True):
+    """Get the batch for the current request (None outside a request)"""
+    if not has_request_context():
+        return None
+    batch = g.get('_cache_invalidations')
+    if batch is None and create:
+        batch = InvalidationBatch()
+        g._cache_invalidations = batch
+    return batch
+
+
+def _after_flush(session, flush_context):
+    batch = current_batch()
+    if batch is not None:
+        batch.uncommitted_writes = True
+
+
+def _after_commit(session):
+    batch = current_batch(create=False)
+    if batch is not None:
+        batch.commit()
+
+
+def _after_soft_rollback(session, previous_transaction):
+    batch = current_batch(create=False)
+    if batch is not None:
+        batch.rollback()
+
+
+def init_app(app, flush):
+    """Flush each request's invalidations at teardown with flush(keys, namespaces, patterns)"""
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_soft_rollback', _after_soft_rollback)
+
+    @app.teardown_request
+    def flush_cache_invalidations(exc):
+        batch = g.pop('_cache_invalidations', None)
+        if batch is None:
+            return
+        # Anything still pending never committed
+        drained = batch.drain()
+        if drained['keys'] or drained['namespaces'] or drained['patterns']:
+            try:
+                flush(drained['keys'], drained['namespaces'], drained['patterns'])
+            except Exception as e:
+                print(f"Cache invalidation flush error: {e}")
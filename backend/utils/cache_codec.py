@@ -0,0 +1,167 @@
+"""
+Compact encoding for cached values
+
+Values are written as a 4-byte header (magic, serializer, compression) followed
+by the payload. Anything without the header is a value written before the codec
+existed (a plain JSON or text string) and is still decoded as such, so no cache
+flush is needed on deploy.
+
+orjson, msgpack, zstandard and lz4 are optional: a codec whose library isn't
+installed falls back to JSON / zlib.
+"""
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+# 0xFF never starts valid UTF-8, so legacy JSON/text values can't collide with it
+MAGIC = b'\xffC'
+
+SERIALIZERS = {'json': b'j', 'msgpack': b'm'}
+COMPRESSIONS = {'none': b'-', 'zlib': b'z', 'zstd': b's', 'lz4': b'l'}
+
+
+def _dumps_json(value) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass  # e.g. ints over 64 bits - the stdlib handles those
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _loads_json(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _compress(method: str, data: bytes) -> bytes:
+    if method == 'zlib':
+        return zlib.compress(data, 6)
+    if method == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if method == 'lz4':
+        return lz4_frame.compress(data)
+    return data
+
+
+def _decompress(flag: bytes, data: bytes) -> bytes:
+    if flag == COMPRESSIONS['zlib']:
+        return zlib.decompress(data)
+    if flag == COMPRESSIONS['zstd']:
+        if zstandard is None:
+            raise ValueError('zstd-compressed cache value but zstandard is not installed')
+        return zstandard.ZstdDecompressor().decompress(data)
+    if flag == COMPRESSIONS['lz4']:
+        if lz4_frame is None:
+            raise ValueError('lz4-compressed cache value but lz4 is not installed')
+        return lz4_frame.decompress(data)
+    return data
+
+
+def available(serializer: str, compression: str) -> tuple:
+    """Resolve a requested codec to one this process can actually use"""
+    if serializer not in SERIALIZERS or (serializer == 'msgpack' and msgpack is None):
+        serializer = 'json'
+    if (compression not in COMPRESSIONS
+            or (compression == 'zstd' and zstandard is None)
+            or (compression == 'lz4' and lz4_frame is None)):
+        compression = 'zlib' if compression in ('zstd', 'lz4') else 'none'
+    return serializer, compression
+
+
+class CacheCodec:
+    """Encode/decode cache values, configured per key family
+
+    families maps a key prefix to "serializer+compression" (e.g.
+    {'fragment:': 'msgpack+zstd'}); the longest matching prefix wins and other
+    keys use the defaults. Payloads smaller than min_compress_bytes are never
+    compressed.
+    """
+
+    def __init__(self, serializer: str = 'json', compression: str = 'zlib',
+                 min_compress_bytes: int = 1024, families: dict = None):
+        self.default = available(serializer, compression)
+        self.min_compress_bytes = min_compress_bytes
+        self.families = []
+        for prefix, spec in (families or {}).items():
+            family_serializer, _, family_compression = spec.partition('+')
+            self.families.append(
+                (prefix, available(family_serializer or serializer, family_compression or compression))
+            )
+        self.families.sort(key=lambda item: len(item[0]), reverse=True)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a codec from CACHE_CODEC_* settings"""
+        return cls(
+            serializer=config.get('CACHE_SERIALIZER', 'json'),
+            compression=config.get('CACHE_COMPRESSION', 'zlib'),
+            min_compress_bytes=config.get('CACHE_COMPRESS_MIN_BYTES', 1024),
+            families=config.get('CACHE_CODEC_FAMILIES', {})
+        )
+
+    def codec_for(self, key: str) -> tuple:
+        """(serializer, compression) used for a key"""
+        for prefix, codec in self.families:
+            if key.startswith(prefix):
+                return codec
+        return self.default
+
+    def encode(self, key: str, value) -> bytes:
+        """Serialize (and maybe compress) a value for the given key"""
+        serializer, compression = self.codec_for(key)
+        if serializer == 'msgpack':
+            payload = msgpack.packb(value, use_bin_type=True)
+        else:
+            payload = _dumps_json(value)
+
+        if compression == 'none' or len(payload) < self.min_compress_bytes:
+            compression = 'none'
+        else:
+            payload = _compress(compression, payload)
+
+        return MAGIC + SERIALIZERS[serializer] + COMPRESSIONS[compression] + payload
+
+    def decode(self, raw):
+        """Deserialize a stored value, including values written before the codec"""
+        if raw is None:
+            return None
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+
+        if not raw.startswith(MAGIC):
+            # Legacy value: JSON text, or a plain string stored as-is
+            text = raw.decode('utf-8', errors='replace')
+            try:
+                return json.loads(text)
+            except ValueError:
+                return text
+
+        serializer, compression, payload = raw[2:3], raw[3:4], raw[4:]
+        payload = _decompress(compression, payload)
+        if serializer == SERIALIZERS['msgpack']:
+            if msgpack is None:
+                raise ValueError('msgpack-encoded cache value but msgpack is not installed')
+            return msgpack.unpackb(payload, raw=False)
+        return _loads_json(payload)
@@ -0,0 +1,234 @@
+"""
+Cache instrumentation: per key family counters, latency and payload size histograms
+
+Each worker accumulates deltas in memory and periodically adds them to a Redis
+hash, so the totals cover every gunicorn worker rather than whichever one
+served the scrape.
+"""
+import re
+import time
+import threading
+from collections import defaultdict
+
+
+# Operation latency buckets (seconds) and payload size buckets (bytes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+RESULTS = ('l1_hit', 'hit', 'miss', 'error', 'set', 'invalidation')
+
+METRICS_KEY = 'metrics:cache'
+
+# Segments that identify a single entity or generation, never a family
+_VOLATILE = re.compile(r'^(v\d+|\d+|[0-9a-f]{8}-[0-9a-f-]{27})$')
+
+
+def key_family(key) -> str:
+    """Bounded-cardinality family for a key, e.g. fragment:project:<id> -> fragment:project"""
+    if isinstance(key, bytes):
+        key = key.decode('utf-8', errors='replace')
+    parts = key.split(':')
+    family = parts[0]
+    if family in ('fragment', 'lock', 'refresh') and len(parts) > 1 and not _VOLATILE.match(parts[1]):
+        family = f"{family}:{parts[1]}"
+    return family
+
+
+class _Histogram:
+    """Fixed-bucket histogram (per-bucket counts, rendered cumulatively)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+
+
+class CacheMetrics:
+    """Thread-safe cache counters for one worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.last_flush = time.monotonic()
+
+    def _reset(self):
+        self.counters = defaultdict(int)  # (family, result) -> count
+        self.latency = {}  # (family, op) -> _Histogram
+        self.sizes = {}  # (family, op) -> _Histogram
+
+    def count(self, key, result: str, n: int = 1):
+        """Count a hit/miss/error/set/invalidation for a key's family"""
+        with self._lock:
+            self.counters[(key_family(key), result)] += n
+
+    def observe(self, key, op: str, seconds: float, size: int = None):
+        """Record an operation's latency and (optionally) its payload size"""
+        family = key_family(key)
+        with self._lock:
+            hist = self.latency.get((family, op))
+            if hist is None:
+                hist = self.latency[(family, op)] = _Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            if size is not None:
+                hist = self.sizes.get((family, op))
+                if hist is None:
+                    hist = self.sizes[(family, op)] = _Histogram(SIZE_BUCKETS)
+                hist.observe(size)
+
+    def snapshot(self) -> dict:
+        """Metrics as Redis hash fields (all values are additive)"""
+        with self._lock:
+            return self._fields()
+
+    def _fields(self) -> dict:
+        fields = {}
+        for (family, result), n in self.counters.items():
+            fields[f"c|{family}|{result}"] = n
+        for name, histograms in (('latency', self.latency), ('size', self.sizes)):
+            for (family, op), hist in histograms.items():
+                for i, n in enumerate(hist.counts):
+                    if n:
+                        fields[f"h|{name}|{family}|{op}|{i}"] = n
+                fields[f"s|{name}|{family}|{op}"] = hist.total
+        return fields
+
+    def flush(self, client, interval: float = 0) -> bool:
+        """Add this worker's deltas to the shared Redis hash (at most once per interval)"""
+        now = time.monotonic()
+        if now - self.last_flush < interval:
+            return False
+        with self._lock:
+            fields = self._fields()
+            self._reset()
+            self.last_flush = now
+        if not fields:
+            return True
+        try:
+            pipe = client.pipeline(transaction=False)
+            for field, value in fields.items():
+                if isinstance(value, float):
+                    pipe.hincrbyfloat(METRICS_KEY, field, value)
+                else:
+                    pipe.hincrby(METRICS_KEY, field, value)
+            pipe.execute()
+            return True
+        except Exception:
+            # Put the deltas back so they go out with the next flush
+            with self._lock:
+                self._merge(fields)
+            raise
+
+    def _merge(self, fields: dict):
+        for field, value in fields.items():
+            kind, rest = field.split('|', 1)
+            if kind == 'c':
+                family, result = rest.rsplit('|', 1)
+                self.counters[(family, result)] += value
+            elif kind == 'h':
+                name, family, op, index = _split_histogram(rest, 4)
+                store = self.latency if name == 'latency' else self.sizes
+                buckets = LATENCY_BUCKETS if name == 'latency' else SIZE_BUCKETS
+                hist = store.setdefault((family, op), _Histogram(buckets))
+                hist.counts[int(index)] += value
+            elif kind == 's':
+                name, family, op = _split_histogram(rest, 3)
+                store = self.latency if name == 'latency' else self.sizes
+                buckets = LATENCY_BUCKETS if name == 'latency' else SIZE_BUCKETS
+                store.setdefault((family, op), _Histogram(buckets)).total += value
+
+
+def _split_histogram(rest: str, parts: int) -> list:
+    """Split 'name|family|op[|index]' - families may not contain '|', so this is exact"""
+    return rest.split('|', parts - 1)
+
+
+def summarize(fields: dict) -> dict:
+    """Turn hash fields into a per-family report (hit ratio, counters, histograms)"""
+    families = defaultdict(lambda: {'counters': {r: 0 for r in RESULTS}, 'latency': {}, 'size': {}})
+    for field, value in fields.items():
+        if isinstance(field, bytes):
+            field = field.decode('utf-8')
+        value = float(value)
+        kind, rest = field.split('|', 1)
+        if kind == 'c':
+            family, result = rest.rsplit('|', 1)
+            families[family]['counters'][result] = int(value)
+        elif kind in ('h', 's'):
+            if kind == 'h':
+                name, family, op, index = _split_histogram(rest, 4)
+            else:
+                name, family, op = _split_histogram(rest, 3)
+            buckets = LATENCY_BUCKETS if name == 'latency' else SIZE_BUCKETS
+            hist = families[family][name].setdefault(op, {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0})
+            if kind == 'h':
+                hist['buckets'][int(index)] += int(value)
+                hist['count'] += int(value)
+            else:
+                hist['sum'] += value
+
+    report = {}
+    for family, data in sorted(families.items()):
+        counters = data['counters']
+        lookups = counters['l1_hit'] + counters['hit'] + counters['miss']
+        hits = counters['l1_hit'] + counters['hit']
+        data['hit_ratio'] = round(hits / lookups, 4) if lookups else None
+        for name in ('latency', 'size'):
+            for hist in data[name].values():
+                hist['avg'] = hist['sum'] / hist['count'] if hist['count'] else None
+        report[family] = data
+    return report
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(report: dict) -> str:
+    """Render a summarize() report in the Prometheus text exposition format"""
+    lines = [
+        '# HELP cache_requests_total Cache operations by key family and result',
+        '# TYPE cache_requests_total counter',
+    ]
+    for family, data in report.items():
+        for result, n in data['counters'].items():
+            lines.append(f'cache_requests_total{{family="{_label(family)}",result="{result}"}} {n}')
+
+    histograms = (
+        ('latency', 'cache_operation_seconds', 'Cache operation latency', LATENCY_BUCKETS),
+        ('size', 'cache_payload_bytes', 'Encoded cache payload size', SIZE_BUCKETS),
+    )
+    for name, metric, help_text, buckets in histograms:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for family, data in report.items():
+            for op, hist in sorted(data[name].items()):
+                labels = f'family="{_label(family)}",op="{op}"'
+                cumulative = 0
+                for bound, n in zip(list(buckets) + ['+Inf'], hist['buckets']):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{labels}}} {hist["sum"]}')
+                lines.append(f'{metric}_count{{{labels}}} {hist["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+_state = {'pid': None, 'metrics': None}
+_state_lock = threading.Lock()
+
+
+def get_metrics(pid: int) -> CacheMetrics:
+    """Get this process's metrics (fresh after a fork)"""
+    if _state['pid'] != pid:
+        with _state_lock:
+            if _state['pid'] != pid:
+                _state.update(pid=pid, metrics=CacheMetrics())
+    return _state['metrics']
@@ -0,0 +1,162 @@
+"""
+Counters: delta-maintained global counts and cheaper counts for filtered queries
+
+Global counts (projects, featured projects, badges by type) live in one Redis
+hash. It is seeded from the database with one grouped query per table and
+then adjusted by deltas from the create/delete/feature/badge paths, so reading
+them never runs COUNT(*). Deltas are only applied while the hash exists; one
+that can't reach Redis drops the hash so the next read reseeds it. The hash
+also expires daily, which bounds any drift.
+
+Filtered counts go through count_query(), where each endpoint picks a mode:
+exact (COUNT(*)), estimated (the Postgres planner's row estimate) or capped
+(exact up to a cap, then "1000+").
+"""
+import json
+
+from flask import current_app
+from sqlalchemy import func
+
+from extensions import db
+from utils.cache import CacheService
+
+COUNTERS_KEY = 'counters'
+
+COUNT_MODES = ('exact', 'estimated', 'capped')
+
+# HINCRBY each field only if the hash is seeded - a delta on a missing hash
+# would create a field holding just the delta
+_ADJUST_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('hincrby', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+
+class Counters:
+    """Exact global counts kept as Redis deltas"""
+
+    BADGE_TYPES = ('stone', 'silver', 'gold', 'platinum', 'demerit', 'custom')
+
+    @staticmethod
+    def _from_database() -> dict:
+        """Every counter computed from scratch (two grouped queries)"""
+        from models.project import Project
+        from models.badge import ValidationBadge
+
+        total, live, featured = db.session.query(
+            func.count(Project.id),
+            func.count(Project.id).filter(Project.is_deleted == False),
+            func.count(Project.id).filter(Project.is_featured == True)
+        ).one()
+        counts = {'projects:total': total, 'projects:live': live, 'projects:featured': featured}
+
+        counts.update({f'badges:{badge_type}': 0 for badge_type in Counters.BADGE_TYPES})
+        for badge_type, count in db.session.query(
+                ValidationBadge.badge_type, func.count(ValidationBadge.id)).group_by(ValidationBadge.badge_type):
+            counts[f'badges:{badge_type}'] = count
+        counts['badges:total'] = sum(v for k, v in counts.items() if k.startswith('badges:'))
+        return counts
+
+    @staticmethod
+    def get_all() -> dict:
+        """All global counters, seeding them from the database if needed"""
+        client = CacheService.get_redis_client()
+        if client is not None:
+            try:
+                stored = client.hgetall(COUNTERS_KEY)
+                if stored:
+                    return {k.decode(): int(v) for k, v in stored.items()}
+            except Exception as e:
+                CacheService._redis_error('counters read', e)
+                client = None
+
+        counts = Counters._from_database()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=True)
+                pipe.hset(COUNTERS_KEY, mapping=counts)
+                pipe.expire(COUNTERS_KEY, current_app.config.get('COUNTERS_TTL', 86400))
+                pipe.execute()
+            except Exception as e:
+                CacheService._redis_error('counters seed', e)
+        return counts
+
+    @staticmethod
+    def get(name: str) -> int:
+        """One global counter, e.g. 'projects:live' or 'badges:gold'"""
+        return Counters.get_all().get(name, 0)
+
+    @staticmethod
+    def adjust(deltas: dict) -> bool:
+        """Apply counter deltas (call after commit); zero deltas are skipped"""
+        deltas = {name: int(delta) for name, delta in deltas.items() if delta}
+        if not deltas:
+            return True
+        client = CacheService.get_redis_client()
+        if client is not None:
+            try:
+                args = [item for pair in deltas.items() for item in pair]
+                client.eval(_ADJUST_SCRIPT, 1, COUNTERS_KEY, *args)
+                return True
+            except Exception as e:
+                CacheService._redis_error('counters adjust', e)
+        Counters.invalidate()
+        return False
+
+    @staticmethod
+    def invalidate():
+        """Drop the counters so the next read reseeds them (for bulk or cascading changes)"""
+        CacheService.delete(COUNTERS_KEY)
+
+    @staticmethod
+    def badge_deltas(badge_type: str, delta: int) -> dict:
+        """Counter deltas for adding (1) or removing (-1) a badge"""
+        return {'badges:total': delta, f'badges:{badge_type}': delta}
+
+
+def get_count_mode(request, default='exact'):
+    """Extract ?count=exact|estimated|capped from the request"""
+    mode = request.args.get('count', default)
+    return mode if mode in COUNT_MODES else default
+
+
+def count_query(query, mode='exact', cap=1000):
+    """Count a query's rows in the chosen mode; returns (total, mode actually used)
+
+    capped counts at most cap + 1 rows and reports cap when there are more.
+    estimated uses the planner's row estimate, but counts exactly (capped)
+    when the estimate is small or can't be produced.
+    """
+    query = query.order_by(None)
+    if mode == 'estimated':
+        estimate = _planner_estimate(query)
+        if estimate is not None and estimate > cap:
+            return estimate, 'estimated'
+        mode = 'capped'
+
+    if mode == 'capped':
+        total = db.session.query(func.count()).select_from(query.limit(cap + 1).subquery()).scalar()
+        return (cap, 'capped') if total > cap else (total, 'exact')
+
+    return query.count(), 'exact'
+
+
+def _planner_estimate(query):
+    """Postgres' estimated row count for a query, or None"""
+    try:
+        compiled = query.statement.compile(dialect=db.engine.dialect)
+        with db.session.begin_nested():
+            plan = db.session.connection().exec_driver_sql(
+                f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+            ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        print(f"Count estimate error: {e}")
+        return None
@@ -0,0 +1,289 @@
+"""
+Facet counts for the project explorer
+
+Facets are the values the feed can be filtered by - tech stack, hackathon,
+category, badge type, proof score bucket and the demo/GitHub/featured flags -
+with how many live projects have each.
+
+For a filtered feed they are computed by for_query() in a single statement
+over the filtered query. For the unfiltered feed they are precomputed in a
+Redis hash and kept current after each write by update_project() and
+remove_project(): every project's facet values are remembered in a set, so a
+write only applies the difference as HINCRBY deltas. The hash is reseeded from
+the database when missing, and at least every COUNTERS_TTL seconds.
+"""
+from flask import current_app
+from sqlalchemy import String, cast, distinct, func, literal, select, union_all
+
+from extensions import db
+from models.project import Project
+from models.badge import ValidationBadge
+from utils.cache import CacheService
+from utils.scores import ProofScoreCalculator
+
+FACETS_KEY = 'facets'
+MEMBER_PREFIX = 'facets:member:'  # Facet fields a project is counted under
+
+LIST_FACETS = ('tech', 'hackathon', 'category', 'badge', 'score')
+FLAG_FACETS = ('has_demo', 'has_github', 'featured')
+FACET_LIMIT = 30  # Values returned per facet, most common first
+
+SCORE_BUCKET = 20
+SCORE_BUCKET_MAX = 80  # Last bucket is 80+
+
+# Replace a project's facet set and, if the hash is seeded, apply the difference.
+# ARGV[1] is the set's TTL, the rest are the project's current facet fields.
+_UPDATE_SCRIPT = """
+local old = redis.call('smembers', KEYS[2])
+redis.call('del', KEYS[2])
+if #ARGV > 1 then
+    redis.call('sadd', KEYS[2], unpack(ARGV, 2))
+    redis.call('expire', KEYS[2], ARGV[1])
+end
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+local new = {}
+for i = 2, #ARGV do
+    new[ARGV[i]] = true
+end
+for _, field in ipairs(old) do
+    if new[field] then
+        new[field] = nil
+    else
+        redis.call('hincrby', KEYS[1], field, -1)
+    end
+end
+for field in pairs(new) do
+    redis.call('hincrby', KEYS[1], field, 1)
+end
+return 1
+"""
+
+# Move a project between score buckets. Without its member set there's no
+# telling what it was counted under, so the hash is dropped to be reseeded.
+_MOVE_SCORE_SCRIPT = """
+if redis.call('srem', KEYS[2], ARGV[1]) == 0 then
+    if redis.call('exists', KEYS[2]) == 0 then
+        redis.call('del', KEYS[1])
+    end
+    return 0
+end
+redis.call('sadd', KEYS[2], ARGV[2])
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('hincrby', KEYS[1], ARGV[1], -1)
+    redis.call('hincrby', KEYS[1], ARGV[2], 1)
+end
+return 1
+"""
+
+
+def score_bucket(score) -> int:
+    """Lower bound of the proof score bucket a score falls in (an int, however the score was given)"""
+    score = ProofScoreCalculator.stored_score(max(score or 0, 0))
+    return min(score, SCORE_BUCKET_MAX) // SCORE_BUCKET * SCORE_BUCKET
+
+
+class Facets:
+    """Facet value counts, precomputed for the unfiltered feed"""
+
+    @staticmethod
+    def fields(project, badge_types) -> list:
+        """Facet fields a project counts towards (none once deleted)"""
+        if project.is_deleted:
+            return []
+        fields = ['total', f'score:{score_bucket(project.proof_score)}']
+        fields += [f'tech:{tech}' for tech in set(project.tech_stack or [])]
+        if project.hackathon_name:
+            fields.append(f'hackathon:{project.hackathon_name}')
+        fields += [f'category:{category}' for category in set(project.categories or [])]
+        fields += [f'badge:{badge_type}' for badge_type in set(badge_types)]
+        if project.demo_url:
+            fields.append('has_demo')
+        if project.github_url:
+            fields.append('has_github')
+        if project.is_featured:
+            fields.append('featured')
+        return fields
+
+    @staticmethod
+    def _ttl() -> int:
+        return current_app.config.get('COUNTERS_TTL', 86400)
+
+    @staticmethod
+    def _lost_write():
+        """A delta didn't reach Redis - drop the hash once Redis is reachable so it's reseeded"""
+        CacheService._record_missed(keys=[FACETS_KEY])
+
+    @staticmethod
+    def update_project(project, badge_types=None) -> bool:
+        """Recount a project under its current facet values (call after commit)
+
+        badge_types are looked up when not given.
+        """
+        if badge_types is None and not project.is_deleted:
+            badge_types = [t for (t,) in db.session.query(ValidationBadge.badge_type).filter(
+                ValidationBadge.project_id == project.id).distinct()]
+        return Facets._write(project.id, Facets.fields(project, badge_types or []))
+
+    @staticmethod
+    def update_score(project_id: str, old_score, new_score) -> bool:
+        """Recount a project whose only facet change can be its score bucket (votes, comments)
+
+        Needs no queries or loaded project, and no Redis call unless the bucket changed.
+        """
+        old_field, new_field = f'score:{score_bucket(old_score)}', f'score:{score_bucket(new_score)}'
+        if old_field == new_field:
+            return True
+        client = CacheService.get_redis_client()
+        if client is None:
+            Facets._lost_write()
+            return False
+        try:
+            client.eval(_MOVE_SCORE_SCRIPT, 2, FACETS_KEY, MEMBER_PREFIX + project_id, old_field, new_field)
+            return True
+        except Exception as e:
+            CacheService._redis_error('facets update', e)
+            Facets._lost_write()
+            return False
+
+    @staticmethod
+    def remove_project(project_id: str) -> bool:
+        """Stop counting a hard-deleted project"""
+        return Facets._write(project_id, [])
+
+    @staticmethod
+    def _write(project_id: str, fields: list) -> bool:
+        client = CacheService.get_redis_client()
+        if client is None:
+            Facets._lost_write()
+            return False
+        try:
+            client.eval(_UPDATE_SCRIPT, 2, FACETS_KEY, MEMBER_PREFIX + project_id, 2 * Facets._ttl(), *fields)
+            return True
+        except Exception as e:
+            CacheService._redis_error('facets update', e)
+            Facets._lost_write()
+            return False
+
+    @staticmethod
+    def invalidate():
+        """Drop the precomputed counts so the next read reseeds them (for bulk or cascading changes)"""
+        CacheService.delete(FACETS_KEY)
+
+    @staticmethod
+    def _from_database():
+        """({field: count}, {project id: fields}) for every live project (two queries)"""
+        badge_types = {}
+        for project_id, badge_type in db.session.query(
+                ValidationBadge.project_id, ValidationBadge.badge_type).distinct():
+            badge_types.setdefault(project_id, []).append(badge_type)
+
+        counts, members = {}, {}
+        for row in db.session.query(
+                Project.id, Project.tech_stack, Project.hackathon_name, Project.categories, Project.proof_score,
+                Project.demo_url, Project.github_url, Project.is_featured, Project.is_deleted
+        ).filter(Project.is_deleted == False).yield_per(1000):
+            fields = Facets.fields(row, badge_types.get(row.id, []))
+            members[row.id] = fields
+            for field in fields:
+                counts[field] = counts.get(field, 0) + 1
+        return counts, members
+
+    @staticmethod
+    def get_all() -> dict:
+        """Facet counts over all live projects, seeding the hash if needed"""
+        client = CacheService.get_redis_client()
+        if client is not None:
+            try:
+                stored = client.hgetall(FACETS_KEY)
+                if stored:
+                    return Facets.format({k.decode(): int(v) for k, v in stored.items()})
+            except Exception as e:
+                CacheService._redis_error('facets read', e)
+                client = None
+
+        counts, members = Facets._from_database()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=True)
+                pipe.delete(FACETS_KEY)
+                pipe.hset(FACETS_KEY, mapping={'total': 0, **counts})
+                pipe.expire(FACETS_KEY, Facets._ttl())
+                for project_id, fields in members.items():
+                    pipe.delete(MEMBER_PREFIX + project_id)
+                    pipe.sadd(MEMBER_PREFIX + project_id, *fields)
+                    pipe.expire(MEMBER_PREFIX + project_id, 2 * Facets._ttl())
+                pipe.execute()
+            except Exception as e:
+                CacheService._redis_error('facets seed', e)
+        return Facets.format(counts)
+
+    @staticmethod
+    def for_query(query) -> dict:
+        """Facet counts over the projects a (filtered) feed query matches, in one statement"""
+        matched = query.with_entities(Project.id).order_by(None).distinct().subquery()
+        base = select(
+            Project.id, Project.tech_stack, Project.hackathon_name, Project.categories, Project.proof_score,
+            Project.demo_url, Project.github_url, Project.is_featured
+        ).where(Project.id.in_(select(matched.c.id))).cte('facet_base')
+
+        tech = select(func.unnest(base.c.tech_stack).label('value')).subquery()
+        category = select(func.json_array_elements_text(base.c.categories).label('value')).where(
+            func.json_typeof(base.c.categories) == 'array').subquery()
+        bucket = func.least(func.greatest(func.coalesce(base.c.proof_score, 0), 0), SCORE_BUCKET_MAX) \
+            / SCORE_BUCKET * SCORE_BUCKET
+
+        def flag(name, condition):
+            return select(literal(name), literal(''), func.count()).select_from(base).where(condition)
+
+        statement = union_all(
+            select(literal('total').label('facet'), literal('').label('value'),
+                   func.count().label('count')).select_from(base),
+            select(literal('tech'), tech.c.value, func.count()).group_by(tech.c.value),
+            select(literal('hackathon'), base.c.hackathon_name, func.count()).where(
+                base.c.hackathon_name.isnot(None), base.c.hackathon_name != '').group_by(base.c.hackathon_name),
+            select(literal('category'), category.c.value, func.count()).group_by(category.c.value),
+            select(literal('badge'), ValidationBadge.badge_type, func.count(distinct(ValidationBadge.project_id)))
+            .where(ValidationBadge.project_id.in_(select(base.c.id))).group_by(ValidationBadge.badge_type),
+            select(literal('score'), cast(bucket, String), func.count()).select_from(base).group_by(bucket),
+            flag('has_demo', (base.c.demo_url.isnot(None)) & (base.c.demo_url != '')),
+            flag('has_github', (base.c.github_url.isnot(None)) & (base.c.github_url != '')),
+            flag('featured', base.c.is_featured == True),
+        )
+        counts = {
+            f'{facet}:{value}' if value else facet: count
+            for facet, value, count in db.session.execute(statement)
+        }
+        return Facets.format(counts)
+
+    @staticmethod
+    def format(counts: dict) -> dict:
+        """Response shape: total, flag counts, and per-facet [{value, count}] lists, most common first
+
+        Score buckets are listed in order; their value is the min_score to filter by.
+        """
+        facets = {'total': counts.get('total', 0)}
+        facets.update({flag: counts.get(flag, 0) for flag in FLAG_FACETS})
+        lists = {facet: [] for facet in LIST_FACETS}
+        buckets = {}
+        for field, count in counts.items():
+            facet, _, value = field.partition(':')
+            if facet == 'score' and value:
+                # Fields written as '20.0' by older versions count towards bucket 20
+                low = int(float(value))
+                buckets[low] = buckets.get(low, 0) + count
+            elif facet in lists and value and count > 0:
+                lists[facet].append({'value': value, 'count': count})
+        lists['score'] = [
+            {'value': low, 'count': count,
+             'label': f'{low}+' if low >= SCORE_BUCKET_MAX else f'{low}-{low + SCORE_BUCKET - 1}'}
+            for low, count in sorted(buckets.items()) if count > 0
+        ]
+
+        for facet, values in lists.items():
+            if facet != 'score':
+                values.sort(key=lambda entry: (-entry['count'], entry['value']))
+                del values[FACET_LIMIT:]
+            facets[facet] = values
+        return facets
@@ -1,6 +1,8 @@
 """
 Helper utilities
 """
+import base64
+import json
 from datetime import datetime
 from flask import jsonify
 
@@ -24,22 +26,30 @@ def error_response(error, message=None, status_code=400):
     return jsonify(response), status_code
 
 
-def paginated_response(items, total, page, per_page, message='Success'):
+def paginated_response(items, total, page, per_page, message='Success', count_mode='exact'):
     """Create a paginated response"""
-    total_pages = (total + per_page - 1) // per_page
     return jsonify({
         'status': 'success',
         'message': message,
         'data': items,
-        'pagination': {
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': total_pages,
-        }
+        'pagination': pagination_meta(total, page, per_page, count_mode)
     }), 200
 
 
+def pagination_meta(total, page, per_page, count_mode='exact'):
+    """Pagination block for a response; inexact totals (see utils.counters) say so"""
+    meta = {
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'total_pages': (total + per_page - 1) // per_page,
+    }
+    if count_mode != 'exact':
+        meta['total_exact'] = False
+        meta['total_display'] = f'{total}+' if count_mode == 'capped' else f'~{total}'
+    return meta
+
+
 def get_pagination_params(request, default_per_page=20, max_per_page=100):
     """Extract and validate pagination params from request"""
     try:
@@ -58,6 +68,40 @@ def get_pagination_params(request, default_per_page=20, max_per_page=100):
         return 1, default_per_page
 
 
+def encode_cursor(payload: dict) -> str:
+    """Encode a pagination position as an opaque URL-safe cursor"""
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor from encode_cursor(); raises ValueError if it is malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(payload, dict):
+        raise ValueError('Invalid cursor')
+    return payload
+
+
+def get_view_params(request, default_view='full'):
+    """Extract ?view=card|full and the ?fields=a,b,c sparse fieldset from the request"""
+    view = request.args.get('view', default_view)
+    if view not in ('card', 'full'):
+        view = default_view
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    return view, fields or None
+
+
+def select_fields(items, fields, always=('id',)):
+    """Keep only the requested top-level fields of each item (plus the `always` fields)"""
+    if not fields:
+        return items
+    keep = set(fields) | set(always)
+    return [{k: v for k, v in item.items() if k in keep} for item in items]
+
+
 def format_datetime(dt):
     """Format datetime to ISO format string"""
     if isinstance(dt, datetime):
@@ -0,0 +1,204 @@
+"""
+In-process (L1) cache layered in front of Redis
+
+Each gunicorn worker keeps a small LRU of decoded cache values so hot keys skip
+the Redis round-trip and JSON parsing. Invalidations are fanned out to every
+worker on every node through Redis pub/sub.
+"""
+import os
+import json
+import time
+import socket
+import threading
+from uuid import uuid4
+from fnmatch import fnmatchcase
+from collections import OrderedDict
+
+
+class LocalCache:
+    """Thread-safe, size-bounded LRU with per-key TTL
+
+    Values are shared between callers - treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1000, default_ttl: int = 30):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped on every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        """Get value, or None if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value, ttl: int = None, generation: int = None):
+        """Store value, never longer than the L1 default TTL
+
+        Pass the generation read before fetching the value from Redis: if an
+        invalidation arrived in between, the (possibly stale) value is dropped.
+        """
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        """Drop keys"""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_pattern(self, pattern: str):
+        """Drop keys matching a Redis-style glob pattern"""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._data if fnmatchcase(k, pattern)]:
+                del self._data[key]
+
+    def clear(self):
+        """Drop everything"""
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss/size counters"""
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class InvalidationBus:
+    """Redis pub/sub fan-out of L1 invalidations across workers and nodes"""
+
+    def __init__(self, cache: LocalCache, channel: str):
+        self.cache = cache
+        self.channel = channel
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.listening = False
+        self._thread = None
+        self._stop = threading.Event()
+
+    def publish(self, client, keys=(), patterns=()):
+        """Broadcast an invalidation to the other workers"""
+        message = json.dumps({
+            'origin': self.origin,
+            'keys': list(keys),
+            'patterns': list(patterns),
+        })
+        client.publish(self.channel, message)
+
+    def apply(self, raw_message):
+        """Apply an invalidation message received from the channel"""
+        try:
+            message = json.loads(raw_message)
+        except (TypeError, ValueError):
+            return
+        if message.get('origin') == self.origin:
+            return
+        if message.get('keys'):
+            self.cache.delete(*message['keys'])
+        for pattern in message.get('patterns', []):
+            self.cache.delete_pattern(pattern)
+
+    def start(self, client_factory):
+        """Start the listener thread (once per process)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._listen, args=(client_factory,), name='cache-invalidation', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the listener thread"""
+        self._stop.set()
+
+    def _listen(self, client_factory):
+        backoff = 0.5
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                client = client_factory()
+                if client is None:
+                    raise ConnectionError('Redis unavailable')
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything published while we were disconnected is lost, so start clean
+                self.cache.clear()
+                self.listening = True
+                backoff = 0.5
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self.apply(message['data'])
+                self.listening = False
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                # Without the channel we can't trust local entries
+                self.listening = False
+                self.cache.clear()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+_state = {'pid': None, 'cache': None, 'bus': None}
+_state_lock = threading.Lock()
+
+
+def get_local_cache(config, client_factory):
+    """Get this process's L1 cache and invalidation bus, creating them on first use
+
+    Returns (cache, bus). The listener thread is (re)started after a fork since
+    threads don't survive into gunicorn workers. Callers must only serve from
+    the cache while bus.listening is True.
+    """
+    pid = os.getpid()
+    if _state['pid'] == pid:
+        return _state['cache'], _state['bus']
+
+    with _state_lock:
+        if _state['pid'] != pid:
+            cache = LocalCache(
+                max_entries=config.get('CACHE_L1_MAX_ENTRIES', 1000),
+                default_ttl=config.get('CACHE_L1_TTL', 30)
+            )
+            bus = InvalidationBus(cache, config.get('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate'))
+            bus.start(client_factory)
+            _state.update(pid=pid, cache=cache, bus=bus)
+        return _state['cache'], _state['bus']
@@ -0,0 +1,250 @@
+"""
+Redis sorted-set ranking index for the project feeds
+
+One ZSET per feed sort - overall, per hackathon and per category - with
+project IDs as members. Write paths update a project's entries right after
+commit, so feed pages can be read with ZREVRANGE (ZCARD for the total) and
+rendered from the fragment caches instead of sorting in Postgres.
+
+The index is only read while rank:ready is set. rebuild() sets it; a write
+that fails or happens while Redis is down drops it, so reads fall back to the
+database until the next rebuild (the scheduled job rebuilds a dropped index).
+"""
+import calendar
+
+from extensions import db
+from models.project import Project
+from utils.cache import CacheService
+
+READY_KEY = 'rank:ready'
+KEYS_KEY = 'rank:keys'  # Every ranking and membership key, so a rebuild can replace them all
+MEMBER_PREFIX = 'rank:member:'  # Ranking keys a project is in, so a scope change can remove it
+
+# Integer sorts fold creation time (seconds) into the score as the tiebreaker.
+# Stays exact in a double for values up to ~900k.
+_TIEBREAK = 10 ** 10
+
+# Columns entries() needs - rebuilds and checks load only these
+_COLUMNS = (Project.id, Project.created_at, Project.trending_score, Project.proof_score,
+            Project.upvotes, Project.downvotes, Project.hackathon_name, Project.categories,
+            Project.is_deleted)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RankingIndex:
+    """Feed rankings kept as Redis sorted sets"""
+
+    SORTS = CacheService.FEED_SORTS
+
+    @staticmethod
+    def key(sort: str, scope=None) -> str:
+        """Ranking key for a sort, overall or for a ('hackathon', name) / ('category', name) scope"""
+        if scope is None:
+            return f"rank:{sort}"
+        kind, name = scope
+        return f"rank:{sort}:{kind}:{name}"
+
+    @staticmethod
+    def scopes(project) -> list:
+        """Scopes a project is ranked in"""
+        scopes = [None]
+        if project.hackathon_name:
+            scopes.append(('hackathon', project.hackathon_name))
+        for category in project.categories or []:
+            scopes.append(('category', category))
+        return scopes
+
+    @staticmethod
+    def scores(project) -> dict:
+        """ZSET score per sort; higher ranks first"""
+        created = calendar.timegm(project.created_at.utctimetuple()) + project.created_at.microsecond / 1e6
+        votes = (project.upvotes or 0) + (project.downvotes or 0)
+        return {
+            'trending': float(project.trending_score or 0),
+            'newest': created,
+            'top-rated': float((project.proof_score or 0) * _TIEBREAK + int(created)),
+            'most-voted': float(votes * _TIEBREAK + int(created)),
+        }
+
+    @staticmethod
+    def entries(project) -> dict:
+        """{ranking key: score} for every ranking the project belongs to (none once deleted)"""
+        if project.is_deleted:
+            return {}
+        scores = RankingIndex.scores(project)
+        return {
+            RankingIndex.key(sort, scope): scores[sort]
+            for scope in RankingIndex.scopes(project)
+            for sort in RankingIndex.SORTS
+        }
+
+    @staticmethod
+    def _lost_write():
+        """A write didn't reach Redis - stop serving from the index once Redis is reachable"""
+        CacheService._record_missed(keys=[READY_KEY])
+
+    @staticmethod
+    def update_project(project) -> bool:
+        """Write a project's current scores into every ranking it belongs to (call after commit)"""
+        return RankingIndex._write({project.id: RankingIndex.entries(project)})
+
+    @staticmethod
+    def remove_project(project_id: str) -> bool:
+        """Remove a project from every ranking (call after a hard delete)"""
+        return RankingIndex._write({project_id: {}})
+
+    @staticmethod
+    def refresh_projects(project_ids) -> bool:
+        """Re-read projects from the database and rewrite their rankings in one pipeline"""
+        project_ids = list(project_ids)
+        if not project_ids:
+            return True
+        rows = {row.id: row for row in db.session.query(*_COLUMNS).filter(Project.id.in_(project_ids))}
+        return RankingIndex._write({
+            pid: RankingIndex.entries(rows[pid]) if pid in rows else {} for pid in project_ids
+        })
+
+    @staticmethod
+    def _write(entries_by_project: dict) -> bool:
+        """Replace projects' ranking entries, removing them from rankings they've left"""
+        client = CacheService.get_redis_client()
+        if client is None:
+            RankingIndex._lost_write()
+            return False
+        try:
+            pipe = client.pipeline(transaction=False)
+            for project_id in entries_by_project:
+                pipe.smembers(MEMBER_PREFIX + project_id)
+            previous = pipe.execute()
+
+            pipe = client.pipeline(transaction=True)
+            for (project_id, entries), old_keys in zip(entries_by_project.items(), previous):
+                member_key = MEMBER_PREFIX + project_id
+                for key in {_text(key) for key in old_keys} - set(entries):
+                    pipe.zrem(key, project_id)
+                for key, score in entries.items():
+                    pipe.zadd(key, {project_id: score})
+                pipe.delete(member_key)
+                if entries:
+                    pipe.sadd(member_key, *entries)
+                    pipe.sadd(KEYS_KEY, member_key, *entries)
+            pipe.execute()
+            return True
+        except Exception as e:
+            CacheService._redis_error('ranking index write', e)
+            RankingIndex._lost_write()
+            return False
+
+    @staticmethod
+    def get_page(sort: str, page: int, per_page: int, scope=None):
+        """(project IDs, total) for a feed page, or None when the index can't be used"""
+        client = CacheService.get_redis_client()
+        if client is None:
+            return None
+        key = RankingIndex.key(sort, scope)
+        start = (page - 1) * per_page
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.exists(READY_KEY)
+            pipe.zrevrange(key, start, start + per_page - 1)
+            pipe.zcard(key)
+            ready, ids, total = pipe.execute()
+        except Exception as e:
+            CacheService._redis_error('ranking index read', e)
+            return None
+        if not ready:
+            return None
+        return [_text(pid) for pid in ids], total
+
+    @staticmethod
+    def is_ready() -> bool:
+        """Whether the index is complete and being served from"""
+        client = CacheService.get_redis_client()
+        try:
+            return bool(client is not None and client.exists(READY_KEY))
+        except Exception as e:
+            CacheService._redis_error('ranking index ready check', e)
+            return False
+
+    @staticmethod
+    def _expected():
+        """Rankings as the database says they should be: ({key: {id: score}}, {id: [keys]})"""
+        rankings, members = {}, {}
+        for row in db.session.query(*_COLUMNS).filter(Project.is_deleted == False):
+            entries = RankingIndex.entries(row)
+            members[row.id] = list(entries)
+            for key, score in entries.items():
+                rankings.setdefault(key, {})[row.id] = score
+        return rankings, members
+
+    @staticmethod
+    def rebuild() -> dict:
+        """Replace the whole index from the database in one transaction and mark it ready"""
+        client = CacheService.get_redis_client()
+        if client is None:
+            raise ConnectionError('Redis unavailable')
+        rankings, members = RankingIndex._expected()
+
+        old_keys = [_text(key) for key in client.smembers(KEYS_KEY)]
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(READY_KEY, KEYS_KEY, *old_keys)
+        for key, mapping in rankings.items():
+            pipe.zadd(key, mapping)
+        for project_id, keys in members.items():
+            if keys:
+                pipe.sadd(MEMBER_PREFIX + project_id, *keys)
+        registry = list(rankings) + [MEMBER_PREFIX + pid for pid, keys in members.items() if keys]
+        if registry:
+            pipe.sadd(KEYS_KEY, *registry)
+        pipe.set(READY_KEY, 1)
+        pipe.execute()
+        return {'projects': len(members), 'rankings': len(rankings)}
+
+    @staticmethod
+    def ensure_built() -> bool:
+        """Rebuild the index if it isn't ready; True if a rebuild ran"""
+        if CacheService.get_redis_client() is None or RankingIndex.is_ready():
+            return False
+        RankingIndex.rebuild()
+        return True
+
+    @staticmethod
+    def check(sample: int = 10) -> dict:
+        """Compare the index with the database
+
+        Reports rankings that are missing projects, hold projects they
+        shouldn't, or hold wrong scores, with up to `sample` examples each.
+        """
+        client = CacheService.get_redis_client()
+        if client is None:
+            raise ConnectionError('Redis unavailable')
+        rankings, _ = RankingIndex._expected()
+        keys = sorted(set(rankings) | {
+            key for key in map(_text, client.smembers(KEYS_KEY)) if not key.startswith(MEMBER_PREFIX)
+        })
+
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrange(key, 0, -1, withscores=True)
+        actual = dict(zip(keys, pipe.execute()))
+
+        report = {'ready': RankingIndex.is_ready(), 'rankings': len(keys),
+                  'missing': 0, 'extra': 0, 'wrong_score': 0, 'examples': []}
+        for key in keys:
+            expected = rankings.get(key, {})
+            found = {_text(member): score for member, score in actual[key]}
+            problems = [('missing', pid) for pid in expected.keys() - found.keys()]
+            problems += [('extra', pid) for pid in found.keys() - expected.keys()]
+            problems += [
+                ('wrong_score', pid) for pid in expected.keys() & found.keys()
+                if abs(expected[pid] - found[pid]) > 1e-6 * max(1.0, abs(expected[pid]))
+            ]
+            for kind, pid in problems:
+                report[kind] += 1
+                if len(report['examples']) < sample:
+                    report['examples'].append({'ranking': key, 'project_id': pid, 'problem': kind})
+        report['consistent'] = not (report['missing'] or report['extra'] or report['wrong_score'])
+        return report
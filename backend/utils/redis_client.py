@@ -0,0 +1,244 @@
+"""
+Process-wide Redis connection pooling
+"""
+import os
+import time
+import threading
+from collections import deque
+import redis
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+from flask import current_app
+
+
+class CircuitBreaker:
+    """Stops calling Redis for a while after repeated connection failures
+
+    closed: calls go through; threshold failures within window seconds trip it.
+    open: calls are skipped until cooldown seconds have passed.
+    half_open: a single caller probes Redis; success closes the breaker and
+    failure re-opens it for another cooldown.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold: int = 5, window: float = 30, cooldown: float = 15):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.trips = 0
+        self.last_error = None
+        self._failures = deque()
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> str:
+        """Decide what a caller may do: 'call', 'probe' (half-open trial) or 'skip'"""
+        if self.state == self.CLOSED:
+            return 'call'
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 'call'
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return 'probe'
+            return 'skip'
+
+    def record_success(self):
+        """A probe (or call) succeeded - close the breaker"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                print('Redis circuit breaker closed - Redis is reachable again')
+            self.state = self.CLOSED
+            self._failures.clear()
+
+    def record_failure(self, error=None):
+        """A connection-level failure; trips the breaker once the threshold is reached"""
+        now = time.monotonic()
+        with self._lock:
+            self.last_error = str(error) if error is not None else None
+            if self.state == self.HALF_OPEN:
+                self._open(now)
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if self.state == self.CLOSED and len(self._failures) >= self.threshold:
+                self._open(now)
+
+    def _open(self, now: float):
+        self.state = self.OPEN
+        self._opened_at = now
+        self._failures.clear()
+        self.trips += 1
+        print(f"Redis circuit breaker open for {self.cooldown}s - serving without Redis")
+
+    def stats(self) -> dict:
+        """Breaker state for health checks"""
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+            return {
+                'state': self.state,
+                'recent_failures': len(self._failures),
+                'threshold': self.threshold,
+                'trips': self.trips,
+                'retry_in': round(retry_in, 1),
+                'last_error': self.last_error,
+            }
+
+
+class RedisPool:
+    """Long-lived Redis connection pool, one per worker process
+
+    Gunicorn forks workers after the app is imported, so sockets opened in the
+    master must never be shared. The pool remembers the pid that built it and is
+    rebuilt lazily on first use inside a new process.
+    """
+
+    _lock = threading.Lock()
+    _pool = None
+    _client = None
+    _pid = None
+    _url = None
+    _builds = 0
+    _breaker = None
+
+    @classmethod
+    def get_client(cls):
+        """Get the shared Redis client for this process
+
+        Returns None while the circuit breaker is open, so callers skip Redis
+        instead of waiting out socket timeouts.
+        """
+        breaker = cls.get_breaker()
+        decision = breaker.before_call()
+        if decision == 'skip':
+            return None
+
+        try:
+            client = cls._get_or_build()
+            if decision == 'probe':
+                client.ping()
+                breaker.record_success()
+            return client
+        except Exception as e:
+            breaker.record_failure(e)
+            if decision == 'probe':
+                return None
+            raise
+
+    @classmethod
+    def _get_or_build(cls):
+        redis_url = current_app.config.get('REDIS_URL', 'redis://localhost:6379/0')
+        pid = os.getpid()
+
+        client = cls._client
+        if client is not None and cls._pid == pid and cls._url == redis_url:
+            return client
+
+        with cls._lock:
+            if cls._client is None or cls._pid != pid or cls._url != redis_url:
+                cls._build(current_app.config, redis_url, pid)
+            return cls._client
+
+    @classmethod
+    def get_breaker(cls) -> CircuitBreaker:
+        """Get the circuit breaker guarding Redis calls in this process"""
+        if cls._breaker is None:
+            with cls._lock:
+                if cls._breaker is None:
+                    config = current_app.config
+                    cls._breaker = CircuitBreaker(
+                        threshold=config.get('REDIS_BREAKER_THRESHOLD', 5),
+                        window=config.get('REDIS_BREAKER_WINDOW', 30),
+                        cooldown=config.get('REDIS_BREAKER_COOLDOWN', 15)
+                    )
+        return cls._breaker
+
+    @classmethod
+    def record_failure(cls, error):
+        """Report a failed Redis call - only connection-level errors count towards tripping"""
+        if isinstance(error, (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)):
+            cls.get_breaker().record_failure(error)
+
+    @classmethod
+    def _build(cls, config, redis_url, pid):
+        """Create the connection pool and client for this process"""
+        # Only disconnect a pool created in this process - after a fork the
+        # parent's sockets belong to the parent.
+        if cls._pool is not None and cls._pid == pid:
+            try:
+                cls._pool.disconnect()
+            except Exception:
+                pass
+
+        retry = Retry(
+            ExponentialBackoff(
+                cap=config.get('REDIS_RETRY_BACKOFF_CAP', 1.0),
+                base=config.get('REDIS_RETRY_BACKOFF_BASE', 0.05)
+            ),
+            config.get('REDIS_RETRY_ATTEMPTS', 3)
+        )
+
+        pool_kwargs = {
+            'max_connections': config.get('REDIS_MAX_CONNECTIONS', 20),
+            'socket_timeout': config.get('REDIS_SOCKET_TIMEOUT', 2.0),
+            'socket_connect_timeout': config.get('REDIS_SOCKET_CONNECT_TIMEOUT', 2.0),
+            'socket_keepalive': True,
+            'health_check_interval': config.get('REDIS_HEALTH_CHECK_INTERVAL', 30),
+            'retry': retry,
+            'retry_on_timeout': True,
+            # Cache values are binary (see utils/cache_codec.py); decode per call
+            'decode_responses': False,
+        }
+        # Upstash uses rediss:// for TLS
+        if redis_url.startswith('rediss://'):
+            pool_kwargs['ssl_cert_reqs'] = None
+
+        cls._pool = redis.ConnectionPool.from_url(redis_url, **pool_kwargs)
+        cls._client = redis.Redis(connection_pool=cls._pool)
+        cls._pid = pid
+        cls._url = redis_url
+        cls._builds += 1
+
+    @classmethod
+    def reset(cls):
+        """Drop the pool so the next call reconnects (used after config changes)"""
+        with cls._lock:
+            if cls._pool is not None and cls._pid == os.getpid():
+                try:
+                    cls._pool.disconnect()
+                except Exception:
+                    pass
+            cls._pool = None
+            cls._client = None
+            cls._pid = None
+            cls._url = None
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Connection pool statistics for the current worker"""
+        pool = cls._pool
+        stats = {
+            'pid': os.getpid(),
+            'initialized': pool is not None and cls._pid == os.getpid(),
+            'pool_builds': cls._builds,
+            'max_connections': None,
+            'created_connections': 0,
+            'in_use_connections': 0,
+            'available_connections': 0,
+        }
+        if not stats['initialized']:
+            return stats
+
+        stats['max_connections'] = pool.max_connections
+        stats['created_connections'] = getattr(pool, '_created_connections', 0)
+        stats['in_use_connections'] = len(getattr(pool, '_in_use_connections', ()))
+        stats['available_connections'] = len(getattr(pool, '_available_connections', ()))
+        stats['health_check_interval'] = pool.connection_kwargs.get('health_check_interval')
+        return stats
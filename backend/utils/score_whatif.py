@@ -0,0 +1,258 @@
+"""
+What-if proof score recalibration
+
+Loads every live project's scoring inputs once into NumPy columns and
+evaluates the ProofScoreCalculator rules vectorized, so alternative weight
+sets (comment multiplier, badge points, trending decay, ...) can be scored
+across the whole corpus in seconds and their effect on the top-rated and
+trending rankings compared.
+
+With the default weights the results are identical to the scalar calculator:
+the float operations run in the same order, vote magnitudes use math.log10
+per distinct value, and round(x, 2) ties are settled by Python's round().
+
+NumPy is only needed for this offline tool, not by the API (it is still
+installed from requirements.txt).
+"""
+import math
+
+import numpy as np
+from sqlalchemy import and_, exists, func, select
+
+from extensions import db
+from models.badge import ValidationBadge
+from models.project import Project, ProjectScreenshot
+from models.user import User
+from utils.scores import ProofScoreCalculator
+
+WEIGHT_NAMES = (
+    'VERIFICATION_EMAIL', 'VERIFICATION_OXCERT', 'VERIFICATION_GITHUB',
+    'COMMUNITY_MAX_UPVOTE_RATIO', 'COMMUNITY_COMMENT_MULTIPLIER', 'COMMUNITY_COMMENT_MAX',
+    'QUALITY_DEMO_LINK', 'QUALITY_GITHUB_LINK', 'QUALITY_SCREENSHOTS', 'QUALITY_DESCRIPTION',
+    'TRENDING_EPOCH', 'TRENDING_DECAY_SECONDS', 'TRENDING_PROOF_BOOST',
+)
+
+_WHITESPACE = ' \t\r\n'
+
+
+def default_weights() -> dict:
+    """The calculator's current weights; BADGE_POINTS overrides stored badge points per type"""
+    weights = {name: getattr(ProofScoreCalculator, name) for name in WEIGHT_NAMES}
+    weights['BADGE_POINTS'] = {}
+    return weights
+
+
+def _nonblank(column):
+    return func.length(func.btrim(func.coalesce(column, ''), _WHITESPACE)) > 0
+
+
+class ScoreInputs:
+    """Scoring inputs for a set of projects, one NumPy array per column"""
+
+    def __init__(self, ids, created_at, upvotes, downvotes, comment_count, has_demo, has_github,
+                 has_screenshots, long_description, email_verified, has_oxcert, github_connected,
+                 badge_types=(), badge_points=None, badge_counts=None):
+        self.ids = np.asarray(ids, dtype=object)
+        self.created_at = np.asarray(created_at, dtype='datetime64[us]')
+        self.upvotes = np.asarray(upvotes, dtype=np.int64)
+        self.downvotes = np.asarray(downvotes, dtype=np.int64)
+        self.comment_count = np.asarray(comment_count, dtype=np.int64)
+        self.has_demo = np.asarray(has_demo, dtype=bool)
+        self.has_github = np.asarray(has_github, dtype=bool)
+        self.has_screenshots = np.asarray(has_screenshots, dtype=bool)
+        self.long_description = np.asarray(long_description, dtype=bool)
+        self.email_verified = np.asarray(email_verified, dtype=bool)
+        self.has_oxcert = np.asarray(has_oxcert, dtype=bool)
+        self.github_connected = np.asarray(github_connected, dtype=bool)
+        # Stored point sums and badge counts per project (rows) and badge type (columns)
+        self.badge_types = list(badge_types)
+        shape = (len(self.ids), len(self.badge_types))
+        self.badge_points = np.zeros(shape, np.int64) if badge_points is None else np.asarray(badge_points, np.int64)
+        self.badge_counts = np.zeros(shape, np.int64) if badge_counts is None else np.asarray(badge_counts, np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls):
+        """Inputs for every live project, in two queries"""
+        rows = db.session.execute(select(
+            Project.id, Project.created_at,
+            func.coalesce(Project.upvotes, 0), func.coalesce(Project.downvotes, 0),
+            func.coalesce(Project.comment_count, 0),
+            _nonblank(Project.demo_url), _nonblank(Project.github_url),
+            exists().where(ProjectScreenshot.project_id == Project.id),
+            func.length(func.btrim(func.coalesce(Project.description, ''), _WHITESPACE)) >= 200,
+            func.coalesce(User.email_verified, False), func.coalesce(User.has_oxcert, False),
+            func.coalesce(User.github_connected, False),
+        ).outerjoin(User, User.id == Project.user_id).where(Project.is_deleted == False)
+            .order_by(Project.id)).all()
+        columns = list(zip(*rows)) if rows else [()] * 12
+
+        position = {project_id: i for i, project_id in enumerate(columns[0])}
+        badges = db.session.execute(select(
+            ValidationBadge.project_id, ValidationBadge.badge_type,
+            func.sum(ValidationBadge.points), func.count()
+        ).join(Project, and_(Project.id == ValidationBadge.project_id, Project.is_deleted == False))
+            .group_by(ValidationBadge.project_id, ValidationBadge.badge_type)).all()
+        badge_types = sorted({badge_type for _, badge_type, _, _ in badges})
+        type_index = {badge_type: j for j, badge_type in enumerate(badge_types)}
+        points = np.zeros((len(rows), len(badge_types)), np.int64)
+        counts = np.zeros_like(points)
+        for project_id, badge_type, total, count in badges:
+            points[position[project_id], type_index[badge_type]] = total
+            counts[position[project_id], type_index[badge_type]] = count
+
+        return cls(*columns, badge_types=badge_types, badge_points=points, badge_counts=counts)
+
+
+def _round_half_away(values):
+    """Integer column rounding, as ProofScoreCalculator.stored_score()"""
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+def _round2(values):
+    """round(x, 2) for every value, exact: ties NumPy might settle differently use Python's round()"""
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def score(inputs: ScoreInputs, weights: dict = None) -> dict:
+    """Vectorized ProofScoreCalculator scores under a weight set
+
+    Returns arrays: verification, community, validation, quality, proof_score
+    (their sum, as stored and as trending sees it) and trending.
+    """
+    w = default_weights()
+    w.update(weights or {})
+
+    verification = np.minimum(
+        np.where(inputs.email_verified, w['VERIFICATION_EMAIL'], 0)
+        + np.where(inputs.has_oxcert, w['VERIFICATION_OXCERT'], 0)
+        + np.where(inputs.github_connected, w['VERIFICATION_GITHUB'], 0), 20)
+
+    total_votes = inputs.upvotes + inputs.downvotes
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = inputs.upvotes / total_votes * 100
+    upvote_score = np.where(
+        total_votes > 0,
+        np.minimum(ratio / 100 * w['COMMUNITY_MAX_UPVOTE_RATIO'], w['COMMUNITY_MAX_UPVOTE_RATIO']), 0)
+    comment_score = np.minimum(inputs.comment_count * w['COMMUNITY_COMMENT_MULTIPLIER'], w['COMMUNITY_COMMENT_MAX'])
+    community = _round_half_away(np.minimum(upvote_score + comment_score, 30))
+
+    badge_points = inputs.badge_points.copy()
+    for badge_type, points in w['BADGE_POINTS'].items():
+        if badge_type in inputs.badge_types:
+            j = inputs.badge_types.index(badge_type)
+            badge_points[:, j] = inputs.badge_counts[:, j] * points
+    validation = np.minimum(badge_points.sum(axis=1), 30)
+
+    quality = np.minimum(
+        np.where(inputs.has_demo, w['QUALITY_DEMO_LINK'], 0)
+        + np.where(inputs.has_github, w['QUALITY_GITHUB_LINK'], 0)
+        + np.where(inputs.has_screenshots, w['QUALITY_SCREENSHOTS'], 0)
+        + np.where(inputs.long_description, w['QUALITY_DESCRIPTION'], 0), 20)
+
+    proof_score = verification + community + validation + quality
+
+    vote_score = inputs.upvotes - inputs.downvotes
+    # math.log10 per distinct magnitude, so results match the scalar path bit for bit
+    magnitudes, inverse = np.unique(np.maximum(np.abs(vote_score), 1), return_inverse=True)
+    vote_magnitude = np.array([math.log10(m) for m in magnitudes.tolist()], dtype=np.float64)[inverse.reshape(-1)]
+    epoch = np.datetime64(w['TRENDING_EPOCH'], 'us')
+    time_score = (inputs.created_at - epoch).astype(np.int64) / 1e6 / w['TRENDING_DECAY_SECONDS']
+    proof_boost = proof_score / 100 * w['TRENDING_PROOF_BOOST']
+    trending = _round2((np.sign(vote_score) * vote_magnitude + time_score) * (1 + proof_boost))
+
+    return {
+        'verification': verification,
+        'community': community,
+        'validation': validation,
+        'quality': quality,
+        'proof_score': proof_score,
+        'trending': trending,
+    }
+
+
+def tiebreak_order(inputs: ScoreInputs):
+    """Position of each project when ordered by (created_at, id) descending, the feeds' tiebreaker"""
+    order = np.lexsort((inputs.ids.astype(str), inputs.created_at))[::-1]
+    positions = np.empty(len(order), np.int64)
+    positions[order] = np.arange(len(order))
+    return positions
+
+
+def ranks(values, tiebreak):
+    """0-based feed rank of each project for a descending sort on values"""
+    order = np.lexsort((tiebreak, -values))
+    positions = np.empty(len(order), np.int64)
+    positions[order] = np.arange(len(order))
+    return positions
+
+
+def compare(inputs: ScoreInputs, baseline: dict, candidate: dict, top=(10, 100)) -> dict:
+    """Rank-change statistics between two score() results, for the top-rated and trending feeds"""
+    tiebreak = tiebreak_order(inputs)
+    n = len(inputs)
+    report = {}
+    for feed, column in (('top-rated', 'proof_score'), ('trending', 'trending')):
+        before = ranks(baseline[column], tiebreak)
+        after = ranks(candidate[column], tiebreak)
+        moved = np.abs(after - before)
+        stats = {
+            'projects': n,
+            'score_changed': int(np.count_nonzero(baseline[column] != candidate[column])),
+            'rank_changed': int(np.count_nonzero(moved)),
+            'mean_rank_change': float(moved.mean()) if n else 0.0,
+            'median_rank_change': float(np.median(moved)) if n else 0.0,
+            'p90_rank_change': float(np.percentile(moved, 90)) if n else 0.0,
+            'max_rank_change': int(moved.max()) if n else 0,
+            # Spearman's rho: ranks are a permutation, so there are no ties
+            'spearman': 1 - 6 * float(np.sum(moved.astype(np.float64) ** 2)) / (n * (n * n - 1)) if n > 1 else 1.0,
+        }
+        for k in top:
+            overlap = np.count_nonzero((before < k) & (after < k))
+            stats[f'top_{k}_overlap'] = int(overlap)
+            stats[f'top_{k}_entered'] = int(min(k, n) - overlap)
+        biggest = np.argsort(-moved, kind='stable')[:5]
+        stats['biggest_moves'] = [
+            {'id': inputs.ids[i], 'before': int(before[i]) + 1, 'after': int(after[i]) + 1}
+            for i in biggest if moved[i]
+        ]
+        report[feed] = stats
+    return report
+
+
+def verify(inputs: ScoreInputs, sample: int = None, seed: int = 0) -> list:
+    """IDs whose default-weight vectorized scores differ from ProofScoreCalculator's (empty when identical)"""
+    from types import SimpleNamespace
+
+    vectorized = score(inputs)
+    indices = np.arange(len(inputs))
+    if sample is not None and sample < len(inputs):
+        indices = np.random.default_rng(seed).choice(indices, sample, replace=False)
+
+    calc = ProofScoreCalculator
+    mismatched = []
+    for i in indices.tolist():
+        project = SimpleNamespace(
+            upvotes=int(inputs.upvotes[i]), downvotes=int(inputs.downvotes[i]),
+            comment_count=int(inputs.comment_count[i]),
+            demo_url='x' if inputs.has_demo[i] else None, github_url='x' if inputs.has_github[i] else None,
+            description='x' * 200 if inputs.long_description[i] else '',
+            badges=[SimpleNamespace(points=int(points)) for points in inputs.badge_points[i] if points],
+            created_at=inputs.created_at[i].item(),
+        )
+        user = SimpleNamespace(email_verified=bool(inputs.email_verified[i]), has_oxcert=bool(inputs.has_oxcert[i]),
+                               github_connected=bool(inputs.github_connected[i]))
+        project.proof_score = (calc.calculate_verification_score(user) + calc.calculate_community_score(project)
+                               + calc.calculate_validation_score(project)
+                               + calc.calculate_quality_score(project, bool(inputs.has_screenshots[i])))
+        if project.proof_score != vectorized['proof_score'][i] \
+                or calc.calculate_trending_score(project) != vectorized['trending'][i]:
+            mismatched.append(inputs.ids[i])
+    return mismatched
@@ -3,6 +3,9 @@ Proof Score Calculation Utilities
 """
 import math
 from datetime import datetime
+from sqlalchemy import text
+
+from extensions import db
 
 
 class ProofScoreCalculator:
@@ -27,6 +30,11 @@ class ProofScoreCalculator:
     QUALITY_SCREENSHOTS = 5
     QUALITY_DESCRIPTION = 5
 
+    # Trending (hot) score
+    TRENDING_EPOCH = datetime(2024, 1, 1)  # Platform epoch
+    TRENDING_DECAY_SECONDS = 45000  # ~12.5 hours of recency is worth one order of magnitude of votes
+    TRENDING_PROOF_BOOST = 0.5  # Max 50% boost from proof score
+
     @staticmethod
     def calculate_verification_score(user) -> int:
         """Calculate verification score from user attributes"""
@@ -39,9 +47,18 @@ class ProofScoreCalculator:
             score += ProofScoreCalculator.VERIFICATION_GITHUB
         return min(score, 20)
 
+    @staticmethod
+    def stored_score(value) -> int:
+        """A non-negative score rounded the way its integer column stores it (half away from zero)"""
+        return int(math.floor(value + 0.5))
+
     @staticmethod
     def calculate_community_score(project) -> int:
-        """Calculate community signal score"""
+        """Calculate community signal score
+
+        Rounded to the integer that is stored, so the proof and trending scores
+        computed from it match what a later load or a bulk recompute sees.
+        """
         score = 0
 
         # Upvote ratio (max 20)
@@ -55,7 +72,7 @@ class ProofScoreCalculator:
         comment_score = project.comment_count * ProofScoreCalculator.COMMUNITY_COMMENT_MULTIPLIER
         score += min(comment_score, ProofScoreCalculator.COMMUNITY_COMMENT_MAX)
 
-        return min(score, 30)
+        return ProofScoreCalculator.stored_score(min(score, 30))
 
     @staticmethod
     def calculate_validation_score(project) -> int:
@@ -66,8 +83,8 @@ class ProofScoreCalculator:
         return min(score, 30)
 
     @staticmethod
-    def calculate_quality_score(project) -> int:
-        """Calculate project quality score"""
+    def calculate_quality_score(project, has_screenshots=None) -> int:
+        """Calculate project quality score (has_screenshots is looked up when not given)"""
         score = 0
 
         # Demo URL check
@@ -79,13 +96,14 @@ class ProofScoreCalculator:
             score += ProofScoreCalculator.QUALITY_GITHUB_LINK
 
         # Screenshots check - check if relationship has items
-        try:
-            if project.screenshots and project.screenshots.count() > 0:
-                score += ProofScoreCalculator.QUALITY_SCREENSHOTS
-        except:
-            # Fallback if screenshots is a list
-            if hasattr(project, 'screenshots') and len(project.screenshots) > 0:
-                score += ProofScoreCalculator.QUALITY_SCREENSHOTS
+        if has_screenshots is None:
+            try:
+                has_screenshots = bool(project.screenshots) and project.screenshots.count() > 0
+            except:
+                # Fallback if screenshots is a list
+                has_screenshots = hasattr(project, 'screenshots') and len(project.screenshots) > 0
+        if has_screenshots:
+            score += ProofScoreCalculator.QUALITY_SCREENSHOTS
 
         # Description length check
         if project.description and len(project.description.strip()) >= 200:
@@ -125,18 +143,222 @@ class ProofScoreCalculator:
 
         # Time decay (newer = higher score)
         # Using platform epoch as reference point
-        epoch = datetime(2024, 1, 1)
+        epoch = ProofScoreCalculator.TRENDING_EPOCH
         time_diff_seconds = (project.created_at - epoch).total_seconds()
-        time_score = time_diff_seconds / 45000  # ~12.5 hour decay period
+        time_score = time_diff_seconds / ProofScoreCalculator.TRENDING_DECAY_SECONDS
 
         # Proof score boost (0-1 multiplier based on quality)
-        proof_boost = (project.proof_score / 100) * 0.5  # Max 50% boost from proof score
+        proof_boost = (project.proof_score / 100) * ProofScoreCalculator.TRENDING_PROOF_BOOST
 
         # Combined trending score
         trending = (sign * vote_magnitude + time_score) * (1 + proof_boost)
 
         return round(trending, 2)
 
+    @staticmethod
+    def recompute_trending_scores() -> list:
+        """Recompute trending_score for every live project in one UPDATE
+
+        Same formula as calculate_trending_score(), evaluated set-based in SQL
+        from the stored (integer) proof_score, which is what the event path
+        computes from too. The score is anchored to the platform epoch, so it doesn't decay over
+        time (newer projects simply start higher) - this repairs scores that
+        drifted from their inputs, e.g. counters changed outside the event
+        hooks or an old formula. Only rows whose score actually changes are
+        written. Returns their IDs (the caller commits).
+        """
+        rows = db.session.execute(text("""
+            UPDATE projects
+            SET trending_score = scored.score
+            FROM (
+                SELECT id,
+                       CAST(ROUND(CAST(
+                           (SIGN(COALESCE(upvotes, 0) - COALESCE(downvotes, 0))
+                                * LOG(GREATEST(ABS(COALESCE(upvotes, 0) - COALESCE(downvotes, 0)), 1))
+                            + EXTRACT(EPOCH FROM created_at - :epoch) / :decay_seconds)
+                           * (1 + COALESCE(proof_score, 0) / 100.0 * :proof_boost)
+                       AS NUMERIC), 2) AS DOUBLE PRECISION) AS score
+                FROM projects
+                WHERE is_deleted = false
+            ) AS scored
+            WHERE projects.id = scored.id
+              AND projects.trending_score IS DISTINCT FROM scored.score
+            RETURNING projects.id
+        """), {
+            'epoch': ProofScoreCalculator.TRENDING_EPOCH,
+            'decay_seconds': ProofScoreCalculator.TRENDING_DECAY_SECONDS,
+            'proof_boost': ProofScoreCalculator.TRENDING_PROOF_BOOST,
+        })
+        return [row.id for row in rows]
+
+    @staticmethod
+    def recompute_scores(after_id: str, through_id: str, dry_run: bool = False) -> list:
+        """Recompute every score component for live projects with after_id < id <= through_id
+
+        Same rules as update_project_scores(), evaluated set-based: badge point
+        sums, screenshot presence and the creator's verification flags are
+        aggregated and joined in SQL, and changed rows are written with one
+        UPDATE ... FROM. With dry_run nothing is written.
+
+        Returns a row per project whose scores change, with id, old_/new_proof
+        and old_/new_trending (the caller commits).
+        """
+        score_columns = ('verification_score', 'community_score', 'validation_score', 'quality_score',
+                         'proof_score', 'trending_score')
+        scored = """
+            WITH chunk AS (
+                SELECT id, user_id, upvotes, downvotes, comment_count, demo_url, github_url, description,
+                       created_at, proof_score, trending_score,
+                       verification_score, community_score, validation_score, quality_score
+                FROM projects
+                WHERE is_deleted = false AND id > :after_id AND id <= :through_id
+            ),
+            badge_points AS (
+                SELECT project_id, SUM(points) AS points
+                FROM validation_badges
+                WHERE project_id IN (SELECT id FROM chunk)
+                GROUP BY project_id
+            ),
+            components AS (
+                SELECT chunk.*,
+                       LEAST(CASE WHEN u.email_verified THEN :email ELSE 0 END
+                             + CASE WHEN u.has_oxcert THEN :oxcert ELSE 0 END
+                             + CASE WHEN u.github_connected THEN :github ELSE 0 END, 20) AS new_verification,
+                       ROUND(CAST(LEAST(
+                           CASE WHEN COALESCE(chunk.upvotes, 0) + COALESCE(chunk.downvotes, 0) > 0
+                               THEN LEAST(CAST(chunk.upvotes AS DOUBLE PRECISION)
+                                          / (chunk.upvotes + chunk.downvotes) * 100 / 100 * :max_ratio, :max_ratio)
+                               ELSE 0 END
+                           + LEAST(COALESCE(chunk.comment_count, 0) * :comment_multiplier, :comment_max),
+                       30) AS NUMERIC)) AS new_community,
+                       LEAST(COALESCE(badge_points.points, 0), 30) AS new_validation,
+                       LEAST(CASE WHEN BTRIM(COALESCE(chunk.demo_url, ''), E' \\t\\r\\n') <> '' THEN :demo_link ELSE 0 END
+                             + CASE WHEN BTRIM(COALESCE(chunk.github_url, ''), E' \\t\\r\\n') <> '' THEN :github_link ELSE 0 END
+                             + CASE WHEN EXISTS (SELECT 1 FROM project_screenshots ps WHERE ps.project_id = chunk.id)
+                                 THEN :screenshots ELSE 0 END
+                             + CASE WHEN LENGTH(BTRIM(COALESCE(chunk.description, ''), E' \\t\\r\\n')) >= 200
+                                 THEN :description ELSE 0 END, 20) AS new_quality
+                FROM chunk
+                LEFT JOIN users u ON u.id = chunk.user_id
+                LEFT JOIN badge_points ON badge_points.project_id = chunk.id
+            ),
+            totals AS (
+                SELECT components.*,
+                       CAST(new_verification + new_community + new_validation + new_quality AS INTEGER) AS new_proof
+                FROM components
+            ),
+            scored AS (
+                SELECT id,
+                       proof_score AS old_proof, trending_score AS old_trending,
+                       verification_score AS old_verification, community_score AS old_community,
+                       validation_score AS old_validation, quality_score AS old_quality,
+                       new_verification, CAST(new_community AS INTEGER) AS new_community,
+                       new_validation, new_quality, new_proof,
+                       CAST(ROUND(CAST(
+                           (SIGN(COALESCE(upvotes, 0) - COALESCE(downvotes, 0))
+                                * LOG(GREATEST(ABS(COALESCE(upvotes, 0) - COALESCE(downvotes, 0)), 1))
+                            + EXTRACT(EPOCH FROM created_at - :epoch) / :decay_seconds)
+                           * (1 + new_proof / 100.0 * :proof_boost)
+                       AS NUMERIC), 2) AS DOUBLE PRECISION) AS new_trending
+                FROM totals
+            )
+        """
+        changed = """
+            (scored.old_verification IS DISTINCT FROM scored.new_verification
+             OR scored.old_community IS DISTINCT FROM scored.new_community
+             OR scored.old_validation IS DISTINCT FROM scored.new_validation
+             OR scored.old_quality IS DISTINCT FROM scored.new_quality
+             OR scored.old_proof IS DISTINCT FROM scored.new_proof
+             OR scored.old_trending IS DISTINCT FROM scored.new_trending)
+        """
+        if dry_run:
+            statement = scored + f"""
+                SELECT scored.id, old_proof, new_proof, old_trending, new_trending
+                FROM scored WHERE {changed} ORDER BY scored.id
+            """
+        else:
+            assignments = ', '.join(
+                f"{column} = scored.new_{column.replace('_score', '')}" for column in score_columns)
+            statement = scored + f"""
+                UPDATE projects SET {assignments}
+                FROM scored
+                WHERE projects.id = scored.id AND {changed}
+                RETURNING projects.id, scored.old_proof, scored.new_proof, scored.old_trending, scored.new_trending
+            """
+
+        calc = ProofScoreCalculator
+        return db.session.execute(text(statement), {
+            'after_id': after_id,
+            'through_id': through_id,
+            'email': calc.VERIFICATION_EMAIL,
+            'oxcert': calc.VERIFICATION_OXCERT,
+            'github': calc.VERIFICATION_GITHUB,
+            'max_ratio': calc.COMMUNITY_MAX_UPVOTE_RATIO,
+            'comment_multiplier': calc.COMMUNITY_COMMENT_MULTIPLIER,
+            'comment_max': calc.COMMUNITY_COMMENT_MAX,
+            'demo_link': calc.QUALITY_DEMO_LINK,
+            'github_link': calc.QUALITY_GITHUB_LINK,
+            'screenshots': calc.QUALITY_SCREENSHOTS,
+            'description': calc.QUALITY_DESCRIPTION,
+            'epoch': calc.TRENDING_EPOCH,
+            'decay_seconds': calc.TRENDING_DECAY_SECONDS,
+            'proof_boost': calc.TRENDING_PROOF_BOOST,
+        }).fetchall()
+
+    # Score components each event can change; update_for_event() recomputes only these
+    EVENT_COMPONENTS = {
+        'vote': ('community',),
+        'comment': ('community',),
+        'badge': ('validation',),
+        'screenshot': ('quality',),
+        'edit': ('quality',),
+        'user_verification': ('verification',),
+    }
+
+    @staticmethod
+    def update_for_event(project, event: str, user=None, badge_points=None, has_screenshots=None):
+        """Recompute only the components an event affects, then the proof and trending scores
+
+        Votes and comments are scored from the project's counters and never
+        query. Pass badge_points for a newly awarded badge (otherwise the points
+        are summed in one query), has_screenshots when known (otherwise one
+        query), and the verified user (otherwise project.creator is loaded).
+        """
+        components = ProofScoreCalculator.EVENT_COMPONENTS[event]
+        if 'community' in components:
+            project.community_score = ProofScoreCalculator.calculate_community_score(project)
+        if 'validation' in components:
+            project.validation_score = ProofScoreCalculator.validation_score_after(project, badge_points)
+        if 'quality' in components:
+            project.quality_score = ProofScoreCalculator.calculate_quality_score(project, has_screenshots)
+        if 'verification' in components:
+            project.verification_score = ProofScoreCalculator.calculate_verification_score(user or project.creator)
+        project.calculate_proof_score()
+
+        if hasattr(project, 'trending_score'):
+            project.trending_score = ProofScoreCalculator.calculate_trending_score(project)
+
+        return project
+
+    @staticmethod
+    def validation_score_after(project, badge_points=None) -> int:
+        """Validation score after a badge worth badge_points is added, or re-summed in SQL
+
+        Adding is exact when the points are positive, or when the stored score is
+        below the cap (then it is the full sum). A demerit on a capped score,
+        removals and badge changes need the sum, which is one aggregate query
+        instead of loading every badge.
+        """
+        if badge_points is not None and project.validation_score is not None \
+                and (badge_points >= 0 or project.validation_score < 30):
+            return min(project.validation_score + badge_points, 30)
+        from sqlalchemy import func
+        from models.badge import ValidationBadge
+
+        total = db.session.query(func.coalesce(func.sum(ValidationBadge.points), 0)).filter(
+            ValidationBadge.project_id == project.id).scalar()
+        return min(total, 30)
+
     @staticmethod
     def update_project_scores(project):
         """Update all score components for a project"""
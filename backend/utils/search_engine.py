@@ -0,0 +1,319 @@
+"""
+Full-text search over projects and users
+
+Both tables carry a generated, weighted search_vector column with a GIN index
+(see SEARCH_VECTOR_SQL in the models), so a search is an index lookup ordered
+by ts_rank instead of ILIKE scans over TEXT columns.
+
+Plain input is matched word by word with the last word as a prefix, so results
+show up while the user is still typing. Input using web-search syntax
+("quoted phrase", -exclude, or) goes through websearch_to_tsquery instead.
+
+Result pages are keyset-paged on (rank, id); the cursor carries the last
+row's rank, so deep pages cost the same as the first one.
+
+Typeahead suggestions (suggest()) are separate and much lighter: project titles
+and usernames are matched through pg_trgm and lower(...) prefix indexes,
+hackathon names and tech stack values against small cached vocabularies, and
+each prefix's result is cached.
+
+Where Postgres full-text search isn't available, SEARCH_BACKEND=memory (the
+default on other databases) serves project search from the in-process BM25
+index in utils/search_index.py and user search from ILIKE. Suggestions then
+(and on a database without pg_trgm) match names with ILIKE only.
+"""
+import html
+import re
+
+from flask import current_app
+from sqlalchemy import and_, cast, false, func, or_, tuple_
+from sqlalchemy.dialects.postgresql import REAL
+
+from extensions import db
+from models.project import Project
+from models.user import User
+from utils.cache import CacheService
+from utils.helpers import encode_cursor, decode_cursor
+from utils.search_index import SearchIndex, highlight, tokenize
+
+_WORD = re.compile(r'\w+')
+_WEBSEARCH_SYNTAX = re.compile(r'"|(^|\s)-\w|\sor\s', re.IGNORECASE)
+
+# ts_headline wraps matches in <mark>; everything else in the snippet is escaped
+_HEADLINE_OPTIONS = {
+    'title': 'StartSel=<mark>, StopSel=</mark>, HighlightAll=true',
+    'snippet': 'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=12, MaxFragments=2, '
+               'FragmentDelimiter=" ... "',
+}
+
+# Per searchable type: text search config, visibility filter, the columns
+# highlighted as (title, snippet) and the columns ILIKE searches without FTS
+_TARGETS = {
+    'projects': {
+        'model': Project,
+        'config': 'english',
+        'visible': lambda: Project.is_deleted == False,
+        'highlight': (Project.title, Project.description),
+        'like': (Project.title, Project.tagline, Project.description, Project.hackathon_name),
+    },
+    'users': {
+        'model': User,
+        'config': 'simple',
+        'visible': lambda: User.is_active == True,
+        'highlight': (User.display_name, User.bio),
+        'like': (User.username, User.display_name, User.bio),
+    },
+}
+
+_SNIPPET_WORDS = 30
+
+
+# Trigrams need at least 3 characters; shorter prefixes use the lower(...) prefix indexes
+_TRIGRAM_MIN_LENGTH = 3
+
+_trigram_support = {}  # Database URL -> whether pg_trgm is installed, checked once per process
+
+
+class SearchEngine:
+    """Ranked Postgres full-text search with highlights and keyset pages"""
+
+    TYPES = tuple(_TARGETS)
+    SUGGEST_TYPES = ('project', 'user', 'hackathon', 'tech')
+
+    @staticmethod
+    def backend() -> str:
+        """'postgres' or 'memory' (SEARCH_BACKEND; auto picks by database)"""
+        backend = current_app.config.get('SEARCH_BACKEND', 'auto')
+        if backend == 'auto':
+            return 'postgres' if db.engine.dialect.name == 'postgresql' else 'memory'
+        return backend
+
+    @staticmethod
+    def tsquery(config: str, text: str):
+        """tsquery expression for user input, or None if it has nothing searchable"""
+        if _WEBSEARCH_SYNTAX.search(text):
+            return func.websearch_to_tsquery(config, text)
+        words = _WORD.findall(text)
+        if not words:
+            return None
+        # \w+ words can't contain tsquery operators
+        return func.to_tsquery(config, ' & '.join(words[:-1] + [f'{words[-1]}:*']))
+
+    @staticmethod
+    def matches(search_type: str, text: str):
+        """WHERE clause matching rows of a type against user input (never true if nothing is searchable)"""
+        target = _TARGETS[search_type]
+        if SearchEngine.backend() == 'memory':
+            if search_type == 'projects':
+                return Project.id.in_(SearchIndex.matching_ids(text))
+            return _like_clause(target['like'], text)
+        query = SearchEngine.tsquery(target['config'], text)
+        if query is None:
+            return false()
+        return target['model'].search_vector.op('@@')(query)
+
+    @staticmethod
+    def search(search_type: str, text: str, limit: int = 20, cursor: str = None):
+        """One page of ranked hits: ([{'id', 'rank', 'title', 'snippet'}], next cursor or None)
+
+        title and snippet are HTML-escaped with matches wrapped in <mark>.
+        Raises ValueError for a cursor that doesn't belong to this search type.
+        """
+        after = SearchEngine._decode_cursor(cursor, search_type)
+        if SearchEngine.backend() == 'memory':
+            hits, has_more = SearchEngine._search_memory(search_type, text, limit, after)
+            return hits, SearchEngine._next_cursor(search_type, hits, has_more)
+
+        target = _TARGETS[search_type]
+        model, config = target['model'], target['config']
+        query = SearchEngine.tsquery(config, text)
+        if query is None:
+            return [], None
+
+        rank = func.ts_rank(model.search_vector, query)
+        title_column, snippet_column = target['highlight']
+        page = db.session.query(
+            model.id.label('id'), rank.label('rank'),
+            title_column.label('title'), snippet_column.label('snippet')
+        ).filter(target['visible'](), model.search_vector.op('@@')(query))
+        if after is not None:
+            page = page.filter(tuple_(rank, model.id) < tuple_(cast(after[0], REAL), after[1]))
+        page = page.order_by(rank.desc(), model.id.desc()).limit(limit + 1).subquery()
+
+        # Headlines are the expensive part - only build them for the page's rows
+        rows = db.session.query(
+            page.c.id, page.c.rank,
+            func.ts_headline(config, func.coalesce(page.c.title, ''), query, _HEADLINE_OPTIONS['title']),
+            func.ts_headline(config, func.coalesce(page.c.snippet, ''), query, _HEADLINE_OPTIONS['snippet'])
+        ).order_by(page.c.rank.desc(), page.c.id.desc()).all()
+
+        hits = [
+            {'id': hit_id, 'rank': rank_value, 'title': _escape_headline(title),
+             'snippet': _escape_headline(snippet)}
+            for hit_id, rank_value, title, snippet in rows[:limit]
+        ]
+        return hits, SearchEngine._next_cursor(search_type, hits, len(rows) > limit)
+
+    @staticmethod
+    def _search_memory(search_type, text, limit, after):
+        """(hits, has more) without Postgres FTS: BM25 index for projects, ILIKE for users"""
+        target = _TARGETS[search_type]
+        model = target['model']
+        title_column, snippet_column = target['highlight']
+        if search_type == 'projects':
+            page, has_more = SearchIndex.search(text, limit, after)
+            rows = {row.id: row for row in db.session.query(model.id, title_column, snippet_column).filter(
+                model.id.in_([pid for pid, _ in page]))} if page else {}
+            ranked = [(rows[pid], score) for pid, score in page if pid in rows]
+        else:
+            # Unranked: every hit gets rank 0, so pages follow id order
+            query = db.session.query(model.id, title_column, snippet_column).filter(
+                target['visible'](), _like_clause(target['like'], text))
+            if after is not None:
+                query = query.filter(model.id < after[1])
+            rows = query.order_by(model.id.desc()).limit(limit + 1).all()
+            has_more = len(rows) > limit
+            ranked = [(row, 0.0) for row in rows[:limit]]
+
+        words = tokenize(text)
+        hits = [
+            {'id': row[0], 'rank': score, 'title': highlight(row[1], words),
+             'snippet': highlight(row[2], words, snippet_words=_SNIPPET_WORDS)}
+            for row, score in ranked
+        ]
+        return hits, has_more
+
+    @staticmethod
+    def _next_cursor(search_type, hits, has_more):
+        if not has_more or not hits:
+            return None
+        last = hits[-1]
+        return encode_cursor({'type': search_type, 'after': [last['rank'], last['id']]})
+
+    @staticmethod
+    def suggest(text: str, types=SUGGEST_TYPES, limit: int = 5) -> list:
+        """Typeahead suggestions [{'id', 'label', 'type'}], up to `limit` per type
+
+        For hackathons and tech the id is the value itself (what the feed
+        filters take). Results are cached per prefix.
+        """
+        prefix = ' '.join(text.lower().split())[:50]
+        types = [t for t in SearchEngine.SUGGEST_TYPES if t in types]
+        if not prefix or not types:
+            return []
+
+        def compute():
+            trigram = SearchEngine.backend() == 'postgres' and _has_trigram()
+            suggestions = []
+            for suggest_type in types:
+                if suggest_type == 'project':
+                    rows = _name_matches(Project.id, Project.title, Project.is_deleted == False, prefix, limit,
+                                         trigram)
+                elif suggest_type == 'user':
+                    rows = _name_matches(User.id, User.username, User.is_active == True, prefix, limit, trigram)
+                else:
+                    rows = [(value, value) for value in _vocabulary_matches(suggest_type, prefix, limit)]
+                suggestions += [{'id': row_id, 'label': label, 'type': suggest_type} for row_id, label in rows]
+            return suggestions
+
+        return CacheService.get_suggestions(f"{','.join(types)}:{limit}:{prefix}", compute)
+
+    @staticmethod
+    def _decode_cursor(cursor, search_type):
+        """(rank, id) a cursor points past, or None for the first page"""
+        if not cursor:
+            return None
+        payload = decode_cursor(cursor)
+        after = payload.get('after')
+        if payload.get('type') != search_type or not isinstance(after, list) or len(after) != 2 \
+                or not isinstance(after[0], (int, float)) or not isinstance(after[1], str):
+            raise ValueError('Invalid cursor')
+        return after
+
+
+def _escape_headline(headline: str) -> str:
+    """Escape a ts_headline result, keeping only its <mark> tags"""
+    return html.escape(headline).replace('&lt;mark&gt;', '<mark>').replace('&lt;/mark&gt;', '</mark>')
+
+
+def _like_clause(columns, text):
+    """Every word of the input appears in one of the columns (ILIKE)"""
+    words = _WORD.findall(text)
+    if not words:
+        return false()
+    return and_(*[
+        or_(*[column.ilike(f'%{_escape_like(word)}%', escape='\\') for column in columns]) for word in words
+    ])
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _has_trigram() -> bool:
+    """Whether the Postgres database has the pg_trgm extension"""
+    url = str(db.engine.url)
+    if url not in _trigram_support:
+        _trigram_support[url] = db.session.execute(
+            db.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")).scalar()
+    return _trigram_support[url]
+
+
+def _name_matches(id_column, column, visible, prefix, limit, trigram=True) -> list:
+    """(id, name) rows whose name contains the prefix, names starting with it first
+
+    From 3 characters on, near misses (pg_trgm similarity) are included too
+    when trigram is set; otherwise matching is ILIKE only.
+    """
+    pattern = _escape_like(prefix)
+    starts = func.lower(column).like(f'{pattern}%', escape='\\')
+    query = db.session.query(id_column, column).filter(visible)
+    if len(prefix) < _TRIGRAM_MIN_LENGTH:
+        query = query.filter(starts).order_by(func.length(column), column)
+    elif not trigram:
+        query = query.filter(column.ilike(f'%{pattern}%', escape='\\')).order_by(
+            starts.desc(), func.length(column), column)
+    else:
+        query = query.filter(or_(column.ilike(f'%{pattern}%', escape='\\'), column.op('%')(prefix))).order_by(
+            starts.desc(), func.similarity(column, prefix).desc(), func.length(column), column
+        )
+    return query.limit(limit).all()
+
+
+def _vocabulary(kind: str) -> list:
+    """Distinct hackathon names or tech stack values of live projects, most used first (cached)"""
+    def compute():
+        if kind == 'hackathon':
+            value = Project.hackathon_name
+            values = db.session.query(value.label('value')).filter(
+                Project.is_deleted == False, value.isnot(None), value != '').subquery()
+        elif db.engine.dialect.name != 'postgresql':
+            counts = {}
+            for (stack,) in db.session.query(Project.tech_stack).filter(Project.is_deleted == False):
+                for value in stack or []:
+                    counts[value] = counts.get(value, 0) + 1
+            return sorted(counts, key=lambda value: (-counts[value], value))
+        else:
+            values = db.session.query(func.unnest(Project.tech_stack).label('value')).filter(
+                Project.is_deleted == False).subquery()
+        rows = db.session.query(values.c.value, func.count()).group_by(values.c.value).order_by(
+            func.count().desc(), values.c.value)
+        return [value for value, _ in rows]
+
+    return CacheService.get_suggestions(f'vocab:{kind}', compute, ttl=600)
+
+
+def _vocabulary_matches(kind: str, prefix: str, limit: int) -> list:
+    """Vocabulary values starting with the prefix, then with a word starting with it, then containing it"""
+    tiers = ([], [], [])
+    for value in _vocabulary(kind):
+        lowered = value.lower()
+        if lowered.startswith(prefix):
+            tiers[0].append(value)
+        elif any(word.startswith(prefix) for word in lowered.split()):
+            tiers[1].append(value)
+        elif prefix in lowered:
+            tiers[2].append(value)
+        if len(tiers[0]) >= limit:
+            break
+    return (tiers[0] + tiers[1] + tiers[2])[:limit]
@@ -0,0 +1,456 @@
+"""
+In-process BM25 search index over projects
+
+The search backend for deployments without Postgres full-text search (SQLite
+test runs, single-node installs without the search_vector migration). Each
+worker process keeps its own index, which is:
+
+- loaded from the on-disk snapshot (or built from the database) on first use,
+  then caught up with the projects changed since the snapshot was written
+- updated in place by the create/update/delete routes of the worker that
+  handled the write
+- caught up from the database every SEARCH_INDEX_SYNC_INTERVAL seconds, for
+  writes other workers handled: a background thread applies the rows whose
+  updated_at is past the last sync, and every SEARCH_INDEX_RECONCILE_INTERVAL
+  seconds also compares the live project IDs to catch hard deletes. Queries
+  run without the index lock; it is only held to apply the results.
+
+Postings are two parallel arrays per term (document slots in ascending order,
+field-weighted term frequencies), a few bytes per posting.
+"""
+import base64
+import heapq
+import html
+import json
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+_WORD = re.compile(r'\w+')
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is', 'it', 'its',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'we', 'with',
+))
+
+# Term frequency multiplier per field (a simple BM25F)
+FIELD_WEIGHTS = (('title', 3), ('tagline', 2), ('tech_stack', 2), ('categories', 2), ('description', 1))
+
+SNAPSHOT_VERSION = 1
+
+_state = {'pid': None, 'index': None, 'synced_at': None, 'checked_at': 0.0, 'saved_at': 0.0,
+          'reconciled_at': 0.0, 'syncing': False}
+_state_lock = threading.RLock()
+
+
+def tokenize(text) -> list:
+    """Lowercased word tokens without stopwords"""
+    if not text:
+        return []
+    return [token for token in _WORD.findall(text.lower()) if token not in STOPWORDS]
+
+
+def highlight(text, words, snippet_words=None) -> str:
+    """HTML-escaped text with query word matches wrapped in <mark>
+
+    The last query word also matches as a prefix. With snippet_words, only a
+    window of that many words around the first match is returned.
+    """
+    if not text:
+        return ''
+    if not words:
+        return html.escape(text)
+    exact, prefix = set(words[:-1]), words[-1]
+    matches = [m for m in _WORD.finditer(text)
+               if m.group().lower() in exact or m.group().lower().startswith(prefix)]
+
+    start, end, tokens = 0, len(text), None
+    if snippet_words:
+        tokens = list(_WORD.finditer(text))
+        first = next((i for i, m in enumerate(tokens) if m.start() == matches[0].start()), 0) if matches else 0
+        lo = max(0, first - snippet_words // 3)
+        hi = min(len(tokens), lo + snippet_words)
+        if tokens:
+            start = tokens[lo].start()
+            end = tokens[hi - 1].end() if hi < len(tokens) else len(text)
+
+    parts, cursor = [], start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:m.start()]))
+        parts.append(f'<mark>{html.escape(m.group())}</mark>')
+        cursor = m.end()
+    parts.append(html.escape(text[cursor:end]))
+    result = ''.join(parts)
+    if tokens:
+        result = ('... ' if start > 0 else '') + result + (' ...' if end < len(text) else '')
+    return result
+
+
+class InvertedIndex:
+    """BM25 inverted index over documents made of weighted text fields"""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.doc_ids = []          # slot -> document id (None once removed)
+        self.lengths = array('I')  # slot -> weighted token count
+        self.slots = {}            # document id -> slot
+        self.postings = {}         # term -> (array of slots, array of term frequencies)
+        self.doc_terms = {}        # slot -> terms, so a removal only touches its own postings
+        self.total_length = 0
+        self._vocabulary = None    # Sorted terms for prefix lookups, rebuilt when terms come or go
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, doc_id: str, fields):
+        """Index (or re-index) a document from [(text, weight), ...]"""
+        self.remove(doc_id)
+        counts = Counter()
+        for text, weight in fields:
+            for token in tokenize(text):
+                counts[token] += weight
+        if not counts:
+            return
+
+        slot = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.slots[doc_id] = slot
+        length = sum(counts.values())
+        self.lengths.append(length)
+        self.total_length += length
+        for term, tf in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array('I'), array('I'))
+                self._vocabulary = None
+            # New slots are always the highest, so postings stay sorted
+            entry[0].append(slot)
+            entry[1].append(tf)
+        self.doc_terms[slot] = tuple(counts)
+
+        if len(self.doc_ids) > 2 * len(self.slots) + 1000:
+            self.compact()
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document; False if it wasn't indexed"""
+        slot = self.slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        for term in self.doc_terms.pop(slot):
+            slots, tfs = self.postings[term]
+            i = bisect_left(slots, slot)
+            del slots[i]
+            del tfs[i]
+            if not slots:
+                del self.postings[term]
+                self._vocabulary = None
+        self.doc_ids[slot] = None
+        self.total_length -= self.lengths[slot]
+        self.lengths[slot] = 0
+        return True
+
+    def compact(self):
+        """Renumber slots so removed documents stop taking space"""
+        remap = {}
+        doc_ids, lengths = [], array('I')
+        for slot, doc_id in enumerate(self.doc_ids):
+            if doc_id is not None:
+                remap[slot] = len(doc_ids)
+                doc_ids.append(doc_id)
+                lengths.append(self.lengths[slot])
+        # Renumbering keeps the order, so postings stay sorted
+        self.postings = {
+            term: (array('I', (remap[s] for s in slots)), tfs) for term, (slots, tfs) in self.postings.items()
+        }
+        self.doc_terms = {remap[slot]: terms for slot, terms in self.doc_terms.items()}
+        self.doc_ids, self.lengths = doc_ids, lengths
+        self.slots = {doc_id: slot for slot, doc_id in enumerate(doc_ids)}
+
+    def _expand(self, prefix: str, limit: int = 50) -> list:
+        """Indexed terms starting with a prefix"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        terms, i = [], bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and len(terms) < limit and self._vocabulary[i].startswith(prefix):
+            terms.append(self._vocabulary[i])
+            i += 1
+        return terms
+
+    def score(self, words) -> dict:
+        """{document id: BM25 score} for documents matching every word (the last as a prefix)"""
+        if not words or not self.slots:
+            return {}
+        n = len(self.slots)
+        avg_length = self.total_length / n
+        totals = None
+        for i, word in enumerate(words):
+            terms = self._expand(word) if i == len(words) - 1 else [word] if word in self.postings else []
+            scores = {}
+            for term in terms:
+                slots, tfs = self.postings[term]
+                idf = math.log(1 + (n - len(slots) + 0.5) / (len(slots) + 0.5))
+                for slot, tf in zip(slots, tfs):
+                    norm = self.K1 * (1 - self.B + self.B * self.lengths[slot] / avg_length)
+                    scores[slot] = scores.get(slot, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {slot: total + scores[slot] for slot, total in totals.items() if slot in scores}
+            if not totals:
+                return {}
+        return {self.doc_ids[slot]: score for slot, score in totals.items()}
+
+    def to_snapshot(self) -> dict:
+        """JSON-serializable copy of the index; postings are packed into two flat arrays"""
+        self.compact()
+        terms = sorted(self.postings)
+        offsets, slots, tfs = array('I', [0]), array('I'), array('I')
+        for term in terms:
+            term_slots, term_tfs = self.postings[term]
+            slots.extend(term_slots)
+            tfs.extend(term_tfs)
+            offsets.append(len(slots))
+        return {
+            'doc_ids': self.doc_ids,
+            'lengths': _pack(self.lengths),
+            'terms': terms,
+            'offsets': _pack(offsets),
+            'slots': _pack(slots),
+            'tfs': _pack(tfs),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict):
+        """Rebuild an index from to_snapshot() output"""
+        index = cls()
+        index.doc_ids = list(data['doc_ids'])
+        index.lengths = _unpack(data['lengths'])
+        index.slots = {doc_id: slot for slot, doc_id in enumerate(index.doc_ids)}
+        index.total_length = sum(index.lengths)
+        offsets, slots, tfs = _unpack(data['offsets']), _unpack(data['slots']), _unpack(data['tfs'])
+        doc_terms = {}
+        for i, term in enumerate(data['terms']):
+            term_slots = slots[offsets[i]:offsets[i + 1]]
+            index.postings[term] = (term_slots, tfs[offsets[i]:offsets[i + 1]])
+            for slot in term_slots:
+                doc_terms.setdefault(slot, []).append(term)
+        index.doc_terms = {slot: tuple(terms) for slot, terms in doc_terms.items()}
+        return index
+
+
+def _pack(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode()
+
+
+def _unpack(data: str) -> array:
+    values = array('I')
+    values.frombytes(base64.b64decode(data))
+    return values
+
+
+class SearchIndex:
+    """This worker's project search index and its lifecycle"""
+
+    @staticmethod
+    def fields(project) -> list:
+        """[(text, weight)] a project is indexed from (a Project or a row with the same attributes)"""
+        values = {
+            'title': project.title,
+            'tagline': project.tagline,
+            'tech_stack': ' '.join(project.tech_stack or []),
+            'categories': ' '.join(project.categories or []),
+            'description': project.description,
+        }
+        return [(values[name], weight) for name, weight in FIELD_WEIGHTS]
+
+    @staticmethod
+    def _columns():
+        from models.project import Project
+        return (Project.id, Project.title, Project.tagline, Project.description, Project.tech_stack,
+                Project.categories, Project.is_deleted)
+
+    @staticmethod
+    def get() -> InvertedIndex:
+        """This worker's index, loading or building it on first use and catching it up in the background"""
+        pid = os.getpid()
+        with _state_lock:
+            if _state['pid'] != pid or _state['index'] is None:
+                _state.update(pid=pid, index=None, checked_at=time.monotonic(), saved_at=0.0,
+                              reconciled_at=time.monotonic(), syncing=False)
+                index, synced_at = SearchIndex._load_snapshot()
+                if index is None:
+                    index, synced_at = SearchIndex._build()
+                    _state.update(index=index, synced_at=synced_at)
+                    SearchIndex._save(index, synced_at)
+                else:
+                    # Once per process, so searches don't miss what changed since the snapshot
+                    _state.update(index=index, synced_at=synced_at)
+                    SearchIndex._catch_up(reconcile=True)
+
+            now = time.monotonic()
+            if not _state['syncing'] and \
+                    now - _state['checked_at'] >= current_app.config.get('SEARCH_INDEX_SYNC_INTERVAL', 30):
+                reconcile = now - _state['reconciled_at'] >= \
+                    current_app.config.get('SEARCH_INDEX_RECONCILE_INTERVAL', 600)
+                _state.update(checked_at=now, syncing=True)
+                threading.Thread(
+                    target=SearchIndex._sync_in_background,
+                    args=(current_app._get_current_object(), reconcile),
+                    name='search-index-sync',
+                    daemon=True
+                ).start()
+            return _state['index']
+
+    @staticmethod
+    def _sync_in_background(app, reconcile: bool):
+        with app.app_context():
+            try:
+                SearchIndex._catch_up(reconcile)
+            except Exception as e:
+                print(f"Search index sync error: {e}")
+            finally:
+                _state['syncing'] = False
+                from extensions import db
+                db.session.remove()
+
+    @staticmethod
+    def _build():
+        """(index of every live project, time it reflects)"""
+        from extensions import db
+        from models.project import Project
+
+        synced_at = datetime.utcnow()
+        index = InvertedIndex()
+        for row in db.session.query(*SearchIndex._columns()).filter(Project.is_deleted == False).yield_per(500):
+            index.add(row.id, SearchIndex.fields(row))
+        return index, synced_at
+
+    @staticmethod
+    def _catch_up(reconcile: bool = False):
+        """Apply projects changed since the last sync; with reconcile, also drop ones deleted from the database
+
+        The updated_at watermark query only reads changed rows. Reconciling
+        compares every live project ID, so it runs less often. Neither holds
+        the lock while querying.
+        """
+        from extensions import db
+        from models.project import Project
+
+        with _state_lock:
+            index, since = _state['index'], _state['synced_at']
+            indexed = set(index.slots) if reconcile else None
+        now = datetime.utcnow()
+        # A little overlap covers transactions that committed just after the last sync
+        rows = db.session.query(*SearchIndex._columns()).filter(
+            Project.updated_at >= since - timedelta(seconds=5)).all()
+
+        removed = set()
+        if reconcile:
+            live = {pid for (pid,) in db.session.query(Project.id).filter(Project.is_deleted == False)}
+            removed = indexed - live
+            missing = live - indexed - {row.id for row in rows}
+            if missing:
+                rows += db.session.query(*SearchIndex._columns()).filter(Project.id.in_(missing)).all()
+
+        with _state_lock:
+            if _state['index'] is not index:
+                return  # Replaced (e.g. after a fork) while querying
+            for row in rows:
+                if row.is_deleted:
+                    index.remove(row.id)
+                else:
+                    index.add(row.id, SearchIndex.fields(row))
+            for pid in removed:
+                index.remove(pid)
+            _state.update(synced_at=now)
+            if reconcile:
+                _state['reconciled_at'] = time.monotonic()
+
+        snapshot_interval = current_app.config.get('SEARCH_INDEX_SNAPSHOT_INTERVAL', 300)
+        if (rows or removed) and time.monotonic() - _state['saved_at'] >= snapshot_interval:
+            SearchIndex._save(index, now)
+
+    @staticmethod
+    def _load_snapshot():
+        """(index, time it reflects) from the snapshot file, or (None, None)"""
+        path = current_app.config.get('SEARCH_INDEX_SNAPSHOT')
+        if not path or not os.path.exists(path):
+            return None, None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('version') != SNAPSHOT_VERSION:
+                return None, None
+            return InvertedIndex.from_snapshot(data['index']), datetime.fromisoformat(data['synced_at'])
+        except Exception as e:
+            print(f"Search index snapshot load error: {e}")
+            return None, None
+
+    @staticmethod
+    def _save(index: InvertedIndex, synced_at: datetime):
+        """Write the snapshot atomically (other workers may be reading it)"""
+        path = current_app.config.get('SEARCH_INDEX_SNAPSHOT')
+        if not path:
+            return
+        try:
+            with _state_lock:
+                data = index.to_snapshot()
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': SNAPSHOT_VERSION, 'synced_at': synced_at.isoformat(),
+                           'index': data}, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            _state['saved_at'] = time.monotonic()
+        except Exception as e:
+            print(f"Search index snapshot save error: {e}")
+
+    @staticmethod
+    def update_project(project):
+        """Re-index a project after it was created or edited (removed if soft-deleted)"""
+        with _state_lock:
+            index = _state['index'] if _state['pid'] == os.getpid() else None
+            if index is None:
+                return  # Not loaded in this worker - built fresh on first search
+            if project.is_deleted:
+                index.remove(project.id)
+            else:
+                index.add(project.id, SearchIndex.fields(project))
+
+    @staticmethod
+    def remove_project(project_id: str):
+        """Remove a hard-deleted project"""
+        with _state_lock:
+            index = _state['index'] if _state['pid'] == os.getpid() else None
+            if index is not None:
+                index.remove(project_id)
+
+    @staticmethod
+    def search(text: str, limit: int = 20, after=None):
+        """(page of (project id, score), has more) in score order, keyset-paged after a (score, id)"""
+        words = tokenize(text)
+        with _state_lock:
+            scores = SearchIndex.get().score(words)
+        hits = scores.items()
+        if after is not None:
+            after = (after[0], after[1])
+            hits = [(pid, score) for pid, score in hits if (score, pid) < after]
+        page = heapq.nlargest(limit + 1, hits, key=lambda hit: (hit[1], hit[0]))
+        return page[:limit], len(page) > limit
+
+    @staticmethod
+    def matching_ids(text: str, limit: int = 1000) -> list:
+        """IDs of the best-matching projects (for filtering other queries)"""
+        page, _ = SearchIndex.search(text, limit)
+        return [pid for pid, _ in page]
@@ -0,0 +1,105 @@
+"""
+Scheduled trending score recompute
+
+trending_score is only refreshed when a project is touched, so a score can
+drift from its inputs (counters fixed by hand, a changed formula). Each worker
+process runs a small background thread that periodically recomputes it in bulk
+for every live project, writing only the rows that changed. The same run
+rebuilds the Redis ranking index if it was dropped. A Redis key shared by all workers makes
+sure only one of them runs per interval.
+"""
+import os
+import threading
+from uuid import uuid4
+
+_state = {'pid': None, 'thread': None, 'stop': None}
+_state_lock = threading.Lock()
+
+JOB_KEY = 'job:trending_recompute'
+
+
+def run_trending_recompute() -> int:
+    """Recompute trending scores now, refresh the trending feed and changed cards; returns rows updated"""
+    from extensions import db
+    from utils.cache import CacheService
+    from utils.ranking_index import RankingIndex
+    from utils.scores import ProofScoreCalculator
+
+    try:
+        changed = ProofScoreCalculator.recompute_trending_scores()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if changed:
+        # Cards and detail pages show trending_score; the trending feed may reorder
+        CacheService.delete(*[key for pid in changed for key in (f"project:{pid}", f"fragment:project:{pid}")])
+        CacheService.invalidate_project_feed(['trending'])
+        RankingIndex.refresh_projects(changed)
+    return len(changed)
+
+
+def _claim_interval(interval: float) -> bool:
+    """True if this worker should run this interval's recompute"""
+    from utils.cache import CacheService
+
+    client = CacheService.get_redis_client()
+    if client is None:
+        return True  # No coordination without Redis - the recompute is idempotent
+    try:
+        # Not released: the key expiring is what opens the next interval
+        return bool(client.set(JOB_KEY, uuid4().hex, nx=True, px=int(interval * 1000)))
+    except Exception as e:
+        CacheService._redis_error('trending job claim', e)
+        return True
+
+
+def _loop(app, interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        with app.app_context():
+            try:
+                if _claim_interval(interval):
+                    updated = run_trending_recompute()
+                    if updated:
+                        print(f"Trending recompute: updated {updated} projects")
+                    from utils.ranking_index import RankingIndex
+                    if RankingIndex.ensure_built():
+                        print("Ranking index rebuilt")
+            except Exception as e:
+                print(f"Trending recompute error: {e}")
+            finally:
+                from extensions import db
+                db.session.remove()
+
+
+def ensure_started(app):
+    """Start this process's recompute thread (restarted after a fork, off when the interval is 0)"""
+    pid = os.getpid()
+    if _state['pid'] == pid:
+        return
+
+    with _state_lock:
+        if _state['pid'] == pid:
+            return
+        _state['pid'] = pid
+        interval = app.config.get('TRENDING_RECOMPUTE_INTERVAL', 600)
+        if interval <= 0:
+            return
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=_loop,
+            args=(app, interval, stop),
+            name='trending-recompute',
+            daemon=True
+        )
+        thread.start()
+        _state.update(thread=thread, stop=stop)
+
+
+def init_app(app):
+    """Start the recompute thread lazily, in each worker on its first request"""
+
+    @app.before_request
+    def start_trending_job():
+        ensure_started(app)
@@ -0,0 +1,80 @@
+"""
+Script to preview how changed proof score weights would reorder the feeds
+Scores every live project under the current and the given weights (vectorized,
+see utils/score_whatif.py) and prints rank-change statistics. Nothing is written.
+
+Usage:
+    python whatif_scores.py NAME=VALUE [NAME=VALUE ...] [--top 10,100] [--verify [N]]
+
+    NAME is a ProofScoreCalculator weight (COMMUNITY_COMMENT_MULTIPLIER=1,
+    TRENDING_DECAY_SECONDS=30000, ...) or badge.<type> for a badge's points
+    (badge.gold=20).
+"""
+import argparse
+import sys
+import time
+
+from app import create_app
+
+
+def parse_weights(assignments) -> dict:
+    """{weight: value} from NAME=VALUE arguments"""
+    from utils.score_whatif import WEIGHT_NAMES
+
+    weights = {'BADGE_POINTS': {}}
+    for assignment in assignments:
+        name, _, value = assignment.partition('=')
+        if name.startswith('badge.'):
+            weights['BADGE_POINTS'][name[len('badge.'):]] = int(value)
+        elif name in WEIGHT_NAMES and name != 'TRENDING_EPOCH':
+            weights[name] = float(value) if '.' in value else int(value)
+        else:
+            raise ValueError(f"Unknown weight: {name}")
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Preview the ranking effect of new proof score weights')
+    parser.add_argument('weights', nargs='*', help='NAME=VALUE weight overrides')
+    parser.add_argument('--top', default='10,100', help='Top-k sizes to report overlap for')
+    parser.add_argument('--verify', nargs='?', const=10000, type=int,
+                        help='Check N sampled projects against the scalar calculator')
+    args = parser.parse_args()
+
+    try:
+        from utils import score_whatif
+    except ImportError as e:
+        print(f"Error: {e} (pip install numpy)")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    inputs = score_whatif.ScoreInputs.load()
+    print(f"Loaded {len(inputs)} projects in {time.perf_counter() - started:.2f}s")
+
+    if args.verify:
+        mismatched = score_whatif.verify(inputs, sample=args.verify)
+        print(f"Scalar check: {len(mismatched)} mismatches in {min(args.verify, len(inputs))} projects")
+        for project_id in mismatched[:10]:
+            print(f"  {project_id}")
+
+    started = time.perf_counter()
+    baseline = score_whatif.score(inputs)
+    candidate = score_whatif.score(inputs, parse_weights(args.weights))
+    report = score_whatif.compare(inputs, baseline, candidate, top=[int(k) for k in args.top.split(',')])
+    print(f"Scored and ranked twice in {time.perf_counter() - started:.2f}s\n")
+
+    for feed, stats in report.items():
+        print(f"{feed}:")
+        for name, value in stats.items():
+            if name == 'biggest_moves':
+                for move in value:
+                    print(f"  moved {move['id']}: #{move['before']} -> #{move['after']}")
+            else:
+                print(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+        print()
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        main()